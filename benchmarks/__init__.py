@@ -0,0 +1,7 @@
+"""Package that contains the benchmarks of the dispatcher
+
+Every benchmark is a module that can be run on its own, from the root of the
+repository and with the same environment variables the app needs:
+
+    $ python -m benchmarks.<module>
+"""
@@ -0,0 +1,131 @@
+"""Benchmark that compares how long a caller is kept waiting per message
+when POST /v1/messages responds once the message is sent and when it
+prefers to be responded asynchronously
+
+Requests are driven one after another straight through the ASGI app, as a
+single caller thread would send them, with the provider's send replaced by
+one that takes as long as Chat API's latency. The queue is drained after
+the asynchronous run, so the messages are all sent in both
+
+Usage:
+    $ python -m benchmarks.bench_async_jobs --messages 200 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+from src.schemas.message_dto import text_template
+from src.utils import fast_json
+
+
+async def post(app: Any, body: bytes, prefer: bytes) -> int:
+    """Coroutine that makes a POST request to /v1/messages through the ASGI
+    app and returns the status code of its response"""
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/v1/messages",
+        "raw_path": b"/v1/messages",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"prefer", prefer),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]):
+        messages.append(message)
+
+    await app(scope, receive, send)
+
+    return messages[0]["status"]
+
+
+async def submit(app: Any, count: int, prefer: bytes) -> float:
+    """Coroutine that sends count messages one after another, and returns
+    the seconds the caller waited in total"""
+
+    body = fast_json.dumps(text_template)
+    started = time.perf_counter()
+
+    for _ in range(count):
+        assert await post(app, body, prefer) in (200, 202)
+
+    return time.perf_counter() - started
+
+
+async def run(args: argparse.Namespace):
+    """Coroutine that sends the messages waiting for each one and then
+    preferring to be responded asynchronously, and prints how long the
+    caller waited in each"""
+
+    # pylint: disable-next=import-outside-toplevel
+    from src.apiv1.jobs import job_queue
+    # pylint: disable-next=import-outside-toplevel
+    from src.main import app
+    # pylint: disable-next=import-outside-toplevel
+    from src.whatsapp_provider import provider
+
+    assert job_queue is not None, "ASYNC_JOBS must be on"
+
+    async def send_slowly(*_: Any) -> Dict[str, Any]:
+        await asyncio.sleep(args.latency)
+
+        return {"success": True, "errorMessage": None, "id": "BENCHMARK"}
+
+    provider.send = send_slowly  # type: ignore
+
+    # The logger is configured when the app is imported
+    logging.getLogger("dispatcher").setLevel(logging.WARNING)
+
+    job_queue.start()
+
+    print(
+        f"{args.messages} text messages, {args.latency * 1000:.0f} ms of "
+        f"Chat API latency, {job_queue.workers} workers\n"
+    )
+    print(
+        f"{'mode':<16}{'caller waited':>16}{'per message':>14}"
+        f"{'all sent after':>17}"
+    )
+
+    for mode, prefer in (
+        ("synchronous", b""), ("respond-async", b"respond-async")
+    ):
+        started = time.perf_counter()
+        waited = await submit(app, args.messages, prefer)
+
+        # Waits for the queued messages to be sent
+        await job_queue.close(60)
+        job_queue.start()
+
+        print(
+            f"{mode:<16}"
+            f"{waited:>14.2f} s"
+            f"{waited / args.messages * 1000:>11.2f} ms"
+            f"{time.perf_counter() - started:>15.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,78 @@
+"""Benchmark that compares the base64 image pattern of type_aliases with
+the linear-time validator that replaced it
+
+It times matching valid, invalid and adversarial data URIs close to the
+150,000 characters Base64 allows, with the regex engine and with
+is_base64_data_uri
+
+Usage:
+    $ python -m benchmarks.bench_base64_validation --number 50
+"""
+
+import argparse
+import base64
+import os
+import re
+import timeit
+from functools import partial
+from typing import Any, Callable
+
+from src.utils.base64_validator import is_base64_data_uri
+from src.utils.type_aliases import base_64_pattern_image
+
+
+PATTERN = re.compile(base_64_pattern_image)
+
+DATA = base64.b64encode(os.urandom(110_000)).decode("ascii")
+
+INPUTS = {
+    "valid": f"data:image/png;base64,{DATA}",
+    # A character out of the alphabet close to the end
+    "invalid": f"data:image/png;base64,{DATA[:-10]}!{DATA[-9:]}",
+    # Every group can be split in several ways before the padding fails
+    "bad padding": f"data:image/png;base64,{'A' * 149_000}=",
+    # Separators all along for the greedy header to backtrack through
+    "separators": f"data:image/{'a;base64,AAAA' * 11_000}!",
+    # A header with no separator at all
+    "no separator": f"data:image/{'a' * 149_000}",
+}
+
+
+def time_per_call(func: Callable[[], Any], number: int) -> float:
+    """Function that returns the best time per call of a function out of
+    several runs, in milliseconds"""
+
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e3
+
+
+def main(args: argparse.Namespace):
+    """Function that runs every input of the benchmark"""
+
+    print(f"{args.number} calls per run\n")
+    print(f"{'input':<14}{'regex':>12}{'validator':>12}{'speedup':>10}")
+
+    for name, value in INPUTS.items():
+        assert (PATTERN.match(value) is not None) == is_base64_data_uri(
+            value, "image"
+        ), name
+
+        regex_time = time_per_call(
+            partial(PATTERN.match, value), args.number
+        )
+        validator_time = time_per_call(
+            partial(is_base64_data_uri, value, "image"), args.number
+        )
+
+        print(
+            f"{name:<14}"
+            f"{regex_time:>9.3f} ms"
+            f"{validator_time:>9.3f} ms"
+            f"{regex_time / validator_time:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=50)
+
+    main(parser.parse_args())
@@ -0,0 +1,116 @@
+"""Benchmark that compares the messages per second the dispatcher handles
+when they're sent one per request to POST /v1/messages and when they're
+sent in batches to POST /v1/messages:batch
+
+Requests are driven straight through the ASGI app, with the provider's send
+replaced by a successful response, so what's timed is the dispatcher's own
+work per message: routing, reading and validating the body, logging and
+making the response
+
+Usage:
+    $ python -m benchmarks.bench_batch --messages 20000 --sizes 10 100
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+from src.schemas.message_dto import text_template
+from src.utils import fast_json
+
+
+async def send_success(*_: Any) -> Dict[str, Any]:
+    """Coroutine that stands for the provider's send"""
+
+    return {"success": True, "errorMessage": None, "id": "BENCHMARK"}
+
+
+async def post(app: Any, path: str, body: bytes) -> int:
+    """Coroutine that makes a POST request to a path through the ASGI app
+    and returns the status code of its response"""
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]):
+        messages.append(message)
+
+    await app(scope, receive, send)
+
+    return messages[0]["status"]
+
+
+async def run(args: argparse.Namespace):
+    """Coroutine that sends the messages one per request and then in each
+    size of batch, and prints the throughput of each"""
+
+    # pylint: disable-next=import-outside-toplevel
+    from src.main import app
+    # pylint: disable-next=import-outside-toplevel
+    from src.whatsapp_provider import provider
+
+    provider.send = send_success  # type: ignore
+
+    # The logger is configured when the app is imported
+    logging.getLogger("dispatcher").setLevel(logging.WARNING)
+
+    print(f"{args.messages} text messages\n")
+    print(f"{'requests':<22}{'messages/s':>14}{'speedup':>10}")
+
+    body = fast_json.dumps(text_template)
+    started = time.perf_counter()
+
+    for _ in range(args.messages):
+        assert await post(app, "/v1/messages", body) == 200
+
+    single = args.messages / (time.perf_counter() - started)
+
+    print(f"{'one per request':<22}{single:>14.0f}{1:>9.1f}x")
+
+    for size in args.sizes:
+        body = fast_json.dumps({"messages": [text_template] * size})
+        started = time.perf_counter()
+
+        for _ in range(args.messages // size):
+            assert await post(app, "/v1/messages:batch", body) == 200
+
+        batched = args.messages // size * size / (
+            time.perf_counter() - started
+        )
+
+        print(
+            f"{f'batches of {size}':<22}{batched:>14.0f}"
+            f"{batched / single:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 100]
+    )
+
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,125 @@
+"""Benchmark that compares the CPU time it takes to work out the action and
+the URL a message is sent to, before and after the dispatch tables
+
+Before, the Chat API schema class of the message was picked and its action
+was looked up by the title of its JSON Schema. pydantic caches the JSON
+Schema of a class, so it wasn't generated again for each request, only
+looked up. Now the kind of the message is looked up in the dispatch table,
+which has the action and the template of the URL, so they take about as
+long, and the routing can be replaced by another provider's
+
+Usage:
+    $ python -m benchmarks.bench_dispatch --number 100000
+"""
+
+import argparse
+import timeit
+from typing import Any, Callable, Dict, Type, cast
+
+# pylint: disable-next=no-name-in-module
+from pydantic import BaseModel
+
+from src.schemas import message_dto
+from src.schemas.message_dto import MessageDTO
+from src.utils.dispatch import get_dispatch_table, get_message_kind
+from src.whatsapp_provider.chat_api_request_schemas import (
+    SendAudioSchema, SendFileSchema, SendMessageSchema
+)
+from src.whatsapp_provider.outbound import (
+    SEND_AUDIO, SEND_FILE, SEND_MESSAGE
+)
+
+
+API_URL = "https://api.chat-api.com"
+
+SCHEMA_ACTION_MAP = {
+    SendFileSchema.schema()["title"]: SEND_FILE,
+    SendMessageSchema.schema()["title"]: SEND_MESSAGE,
+    SendAudioSchema.schema()["title"]: SEND_AUDIO,
+}
+
+dispatch_table = get_dispatch_table("whatsapp")
+
+
+def get_schema_class(message: MessageDTO) -> Type[BaseModel]:
+    """Function that gets the Chat API schema class of a message, as its
+    schema used to be picked"""
+
+    if message.image or message.video or message.document:
+        return SendFileSchema
+
+    if message.text:
+        return SendMessageSchema
+
+    return SendAudioSchema
+
+
+def route_before(message: MessageDTO) -> Any:
+    """Function that gets the action and the URL of a message the way they
+    used to be worked out"""
+
+    schema = get_schema_class(message)
+    action = SCHEMA_ACTION_MAP[cast(str, schema.schema()["title"])]
+
+    return (
+        action, f"{API_URL}/{message.instance}/{action}?token={message.token}"
+    )
+
+
+def route_after(message: MessageDTO) -> Any:
+    """Function that gets the action and the URL of a message the way
+    they're worked out now"""
+
+    route = dispatch_table[get_message_kind(message)]
+
+    return route.action, route.make_url(
+        API_URL, message.instance, message.token
+    )
+
+
+def time_per_call(
+    func: Callable[[MessageDTO], Any], message: MessageDTO, number: int
+) -> float:
+    """Function that returns the best time per call of a function out of
+    several runs, in microseconds"""
+
+    return min(
+        timeit.repeat(lambda: func(message), number=number, repeat=5)
+    ) / number * 1e6
+
+
+def main(args: argparse.Namespace):
+    """Function that runs the benchmark for each kind of message"""
+
+    print(f"{args.number} calls per run\n")
+    print(f"{'message':<10}{'before':>12}{'after':>12}{'speedup':>10}")
+
+    templates: Dict[str, Any] = {
+        "text": message_dto.text_template,
+        "image": message_dto.image_template,
+        "video": message_dto.video_template,
+        "document": message_dto.document_template_pdf,
+        "audio": message_dto.audio_template,
+    }
+
+    for name, template in templates.items():
+        message = MessageDTO.parse_obj(template)
+
+        assert route_before(message) == route_after(message)
+
+        before_time = time_per_call(route_before, message, args.number)
+        after_time = time_per_call(route_after, message, args.number)
+
+        print(
+            f"{name:<10}"
+            f"{before_time:>9.2f} us"
+            f"{after_time:>9.2f} us"
+            f"{before_time / after_time:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100_000)
+
+    main(parser.parse_args())
@@ -0,0 +1,115 @@
+"""Benchmark that compares the HTTP/1.1 and HTTP/2 transport modes of
+WhatsappProvider against a local h2-capable Chat API stub
+
+It sends the same amount of text messages with the same concurrency through
+each mode and reports the throughput, the p50/p99 latency of every send and
+how many connections the pool had to open. The last run points an HTTP/2
+provider to a stub that only speaks HTTP/1.1, to show the fallback
+
+Usage:
+    $ python -m benchmarks.bench_http2 --requests 2000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import List
+
+import httpx
+
+from src.env_variables import env_variables
+from src.schemas.message_dto import MessageDTO, text_template
+from src.whatsapp_provider.whatsapp_provider import WhatsappProvider
+from benchmarks.chat_api_stub import ChatApiStub
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Function that returns the nearest-rank percentile of the values"""
+
+    ordered = sorted(values)
+    index = max(0, int(round(pct / 100 * len(ordered))) - 1)
+
+    return ordered[index]
+
+
+async def run_mode(
+    name: str,
+    http2_stub: bool,
+    http2_client: bool,
+    args: argparse.Namespace,
+):
+    """Coroutine that sends the messages through a provider in the given
+    mode and prints its results"""
+
+    message = MessageDTO(**text_template)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+
+    async with ChatApiStub(latency=args.latency, http2=http2_stub) as stub:
+        os.environ["SSL_CERT_FILE"] = str(stub.cert_path)
+
+        provider = WhatsappProvider(
+            api_url=stub.url,
+            limits=httpx.Limits(
+                max_connections=env_variables.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=(
+                    env_variables.HTTP_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                keepalive_expiry=env_variables.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            http2=http2_client,
+        )
+        provider.start()
+
+        async def send():
+            async with semaphore:
+                started = time.perf_counter()
+
+                await provider.send(message)
+
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+
+        await asyncio.gather(*(send() for _ in range(args.requests)))
+
+        elapsed = time.perf_counter() - started
+        stats = provider.get_pool_stats()
+
+        await provider.close()
+
+    print(
+        f"{name:<22}"
+        f"{args.requests / elapsed:>10.0f} msg/s"
+        f"{percentile(latencies, 50) * 1000:>10.1f} ms"
+        f"{percentile(latencies, 99) * 1000:>10.1f} ms"
+        f"{stats.connections_opened if stats else 0:>8}"
+        f"  {stats.http_versions if stats else {}}"
+    )
+
+
+async def main(args: argparse.Namespace):
+    """Coroutine that runs every mode of the benchmark"""
+
+    print(
+        f"{args.requests} sends, concurrency {args.concurrency}, "
+        f"stub latency {args.latency * 1000:.0f} ms\n"
+    )
+    print(f"{'mode':<22}{'throughput':>16}{'p50':>13}{'p99':>13}{'conns':>8}")
+
+    await run_mode("HTTP/1.1", True, False, args)
+    await run_mode("HTTP/2", True, True, args)
+    await run_mode("HTTP/2 (fallback)", False, True, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.005)
+
+    logging.getLogger("dispatcher").setLevel(logging.WARNING)
+
+    asyncio.run(main(parser.parse_args()))
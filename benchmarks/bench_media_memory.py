@@ -0,0 +1,125 @@
+"""Benchmark that compares the memory WhatsappProvider takes to send media
+messages with and without streaming their bodies to Chat API
+
+It sends the same amount of image messages with a large base64 body, with
+the same concurrency, through a provider with stream_media on and off, each
+mode in a process of its own, and reports how much the peak RSS of the
+process grew while sending, along with the throughput
+
+Usage:
+    $ python -m benchmarks.bench_media_memory --requests 1000 --size 140000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from src.schemas.message_dto import MessageDTO, required_template
+from src.whatsapp_provider.whatsapp_provider import WhatsappProvider
+from benchmarks.chat_api_stub import ChatApiStub
+
+
+MODES = {"buffered": False, "streamed": True}
+
+
+def get_peak_rss() -> int:
+    """Function that returns the peak RSS of the process, in KiB"""
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def run_mode(name: str, args: argparse.Namespace):
+    """Coroutine that sends the messages through a provider in the given
+    mode and prints its results as a single line"""
+
+    # The message is built once and only referenced by every send, so the
+    # memory that grows is the one the provider takes to send it
+    message = MessageDTO.construct(
+        **required_template,
+        image=f"data:image/png;base64,{'A' * args.size}",
+        filename="image.png",
+    )
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with ChatApiStub(latency=args.latency, http2=False) as stub:
+        os.environ["SSL_CERT_FILE"] = str(stub.cert_path)
+
+        provider = WhatsappProvider(
+            api_url=stub.url, stream_media=MODES[name]
+        )
+        provider.start()
+
+        async def send():
+            async with semaphore:
+                await provider.send(message)
+
+        rss_before = get_peak_rss()
+        started = time.perf_counter()
+
+        await asyncio.gather(*(send() for _ in range(args.requests)))
+
+        elapsed = time.perf_counter() - started
+        rss_growth = get_peak_rss() - rss_before
+
+        await provider.close()
+
+    print(f"{args.requests / elapsed} {rss_growth}")
+
+
+def main(args: argparse.Namespace):
+    """Function that runs every mode of the benchmark in a new process, so
+    the peak RSS of one doesn't hide the other's"""
+
+    print(
+        f"{args.requests} sends of {args.size / 1000:.0f} kB, "
+        f"concurrency {args.concurrency}, "
+        f"stub latency {args.latency * 1000:.0f} ms\n"
+    )
+    print(f"{'mode':<12}{'throughput':>16}{'peak RSS growth':>20}")
+
+    for name in MODES:
+        output = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.bench_media_memory",
+                "--mode", name,
+                "--requests", str(args.requests),
+                "--concurrency", str(args.concurrency),
+                "--latency", str(args.latency),
+                "--size", str(args.size),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+        throughput, rss_growth = output.split()
+
+        print(
+            f"{name:<12}"
+            f"{float(throughput):>10.0f} msg/s"
+            f"{int(rss_growth) / 1024:>17.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--size", type=int, default=140_000)
+    parser.add_argument("--mode", choices=MODES)
+
+    logging.getLogger("dispatcher").setLevel(logging.WARNING)
+
+    parsed_args = parser.parse_args()
+
+    if parsed_args.mode is None:
+        main(parsed_args)
+
+    else:
+        asyncio.run(run_mode(parsed_args.mode, parsed_args))
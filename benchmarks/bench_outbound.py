@@ -0,0 +1,125 @@
+"""Benchmark that compares the CPU time and the memory allocated to make the
+request sent to Chat API out of a validated message, before and after the
+outbound messages
+
+Before, the message was validated again as a Chat API schema, which ran the
+phone and base64 regexes over the whole media a second time, and the schema
+was turned into a dict and copied for the log. Now the outbound message
+only holds the values of the message
+
+Usage:
+    $ python -m benchmarks.bench_outbound --number 2000
+"""
+
+import argparse
+import timeit
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+# pylint: disable-next=no-name-in-module
+from pydantic import BaseModel
+
+from src.schemas import message_dto
+from src.schemas.message_dto import MessageDTO
+from src.whatsapp_provider.chat_api_request_schemas import (
+    SendAudioSchema, SendFileSchema, SendMessageSchema
+)
+from src.whatsapp_provider.outbound import get_outbound_message
+from src.whatsapp_provider.whatsapp_provider import shorten_values
+
+
+def get_chat_api_schema(message: MessageDTO) -> BaseModel:
+    """Function that gets the Chat API schema of a message, the way it used
+    to be made"""
+
+    media_source = message.image or message.video or message.document
+
+    if media_source:
+        return SendFileSchema.parse_obj({
+            "phone": message.phone,
+            "filename": message.filename,
+            "body": media_source,
+        })
+
+    if message.text:
+        return SendMessageSchema(phone=message.phone, body=message.text)
+
+    return SendAudioSchema.parse_obj(
+        {"phone": message.phone, "audio": message.audio}
+    )
+
+
+def build_before(message: MessageDTO) -> Any:
+    """Function that makes the body and its log the way they used to be
+    made"""
+
+    json_data = get_chat_api_schema(message).dict()
+
+    return json_data, shorten_values({**json_data}, ("body", "audio"))
+
+
+def build_after(message: MessageDTO) -> Any:
+    """Function that makes the body and its log the way they're made now"""
+
+    json_data = get_outbound_message(message).to_json()
+
+    return json_data, shorten_values({**json_data}, ("body", "audio"))
+
+
+def measure(
+    func: Callable[[MessageDTO], Any], message: MessageDTO, number: int
+) -> Tuple[float, int]:
+    """Function that returns the best time per call of a function out of
+    several runs, in microseconds, and the bytes allocated in a call"""
+
+    elapsed = min(
+        timeit.repeat(lambda: func(message), number=number, repeat=5)
+    ) / number * 1e6
+
+    tracemalloc.start()
+
+    func(message)
+
+    _, peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main(args: argparse.Namespace):
+    """Function that runs the benchmark for each kind of message"""
+
+    print(f"{args.number} calls per run\n")
+    print(
+        f"{'message':<14}{'before':>12}{'after':>12}{'speedup':>10}"
+        f"{'allocated before':>20}{'after':>10}"
+    )
+
+    for name, template in (
+        ("text", message_dto.text_template),
+        ("image url", message_dto.image_template),
+        ("image base64", message_dto.image_template_base64),
+        ("pdf base64", message_dto.document_template_base64_pdf),
+        ("audio base64", message_dto.audio_template_base64),
+    ):
+        message = MessageDTO.parse_obj(template)
+
+        before_time, before_peak = measure(build_before, message, args.number)
+        after_time, after_peak = measure(build_after, message, args.number)
+
+        print(
+            f"{name:<14}"
+            f"{before_time:>9.2f} us"
+            f"{after_time:>9.2f} us"
+            f"{before_time / after_time:>9.1f}x"
+            f"{before_peak / 1024:>17.1f} KiB"
+            f"{after_peak / 1024:>6.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+
+    main(parser.parse_args())
@@ -0,0 +1,151 @@
+"""Benchmark that compares the request throughput of POST /v1/messages with
+each route and validation engine
+
+Every combination runs in a process of its own, as both are chosen from
+the environment at import. Requests are driven straight through the ASGI
+app, with the provider's send replaced by a successful response, so what's
+timed is the dispatcher's own work: routing, reading and validating the
+body and making the response
+
+Usage:
+    $ python -m benchmarks.bench_request_throughput --requests 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from src.schemas.message_dto import image_template, text_template
+from src.utils import fast_json
+
+
+MODES = {
+    "fastapi/pydantic": ("fastapi", "pydantic"),
+    "fastapi/compiled": ("fastapi", "compiled"),
+    "raw/pydantic": ("raw", "pydantic"),
+    "raw/compiled": ("raw", "compiled"),
+}
+
+MESSAGES = {"text": text_template, "image url": image_template}
+
+
+async def send_success(*_: Any) -> Dict[str, Any]:
+    """Coroutine that stands for the provider's send"""
+
+    return {"success": True, "errorMessage": None, "id": "BENCHMARK"}
+
+
+async def post(app: Any, body: bytes) -> int:
+    """Coroutine that makes a POST request to /v1/messages through the ASGI
+    app and returns the status code of its response"""
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/v1/messages",
+        "raw_path": b"/v1/messages",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]):
+        messages.append(message)
+
+    await app(scope, receive, send)
+
+    return messages[0]["status"]
+
+
+async def run_mode(args: argparse.Namespace):
+    """Coroutine that makes the requests of every message through the app
+    and prints the throughput of each in a single line"""
+
+    # pylint: disable-next=import-outside-toplevel
+    from src.main import app
+    # pylint: disable-next=import-outside-toplevel
+    from src.whatsapp_provider import provider
+
+    provider.send = send_success  # type: ignore
+
+    throughputs = []
+
+    for data in MESSAGES.values():
+        body = fast_json.dumps(data)
+
+        for _ in range(args.requests // 10):
+            assert await post(app, body) == 200
+
+        started = time.perf_counter()
+
+        for _ in range(args.requests):
+            await post(app, body)
+
+        throughputs.append(args.requests / (time.perf_counter() - started))
+
+    print(*throughputs)
+
+
+def main(args: argparse.Namespace):
+    """Function that runs every mode of the benchmark in a new process"""
+
+    print(f"{args.requests} sequential requests per message\n")
+    print(f"{'mode':<18}" + "".join(f"{name:>16}" for name in MESSAGES))
+
+    for name, (route, engine) in MODES.items():
+        output = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.bench_request_throughput",
+                "--mode", name,
+                "--requests", str(args.requests),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+            env={
+                **os.environ,
+                "MESSAGES_ROUTE": route,
+                "VALIDATION_ENGINE": engine,
+            },
+        ).stdout
+
+        print(
+            f"{name:<18}" + "".join(
+                f"{float(throughput):>12.0f} r/s"
+                for throughput in output.split()
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--mode", choices=MODES)
+
+    logging.getLogger("dispatcher").setLevel(logging.WARNING)
+
+    parsed_args = parser.parse_args()
+
+    if parsed_args.mode is None:
+        main(parsed_args)
+
+    else:
+        asyncio.run(run_mode(parsed_args))
@@ -0,0 +1,118 @@
+"""Benchmark that compares the per-request JSON overhead of the dispatcher
+before and after the fast_json layer
+
+For a typical Chat API response, it times parsing it, checking it against
+SentMessageResponseSchema and making the dispatcher's response, the way
+apiv1.messages used to (httpx's Response.json(), a second pydantic
+validation and Starlette's JSONResponse) and the way it does now
+(fast_json.loads() and FastJSONResponse, without validating again)
+
+Usage:
+    $ python -m benchmarks.bench_serialization --number 100000
+"""
+
+import argparse
+import timeit
+from typing import Any, Callable, Dict
+
+import httpx
+from fastapi.responses import JSONResponse
+
+from src.schemas.dispatcher_responses import SentMessageResponseSchema
+from src.utils import fast_json
+from src.utils.fast_json import FastJSONResponse
+
+
+CHAT_API_RESPONSE = httpx.Response(
+    status_code=200,
+    json={
+        "sent": True,
+        "message": "Sent to 5492914141794@c.us",
+        "id": "true_5492914141794@c.us_3EB0C1B2A5A1D2E3F4A5",
+        "queueNumber": 1,
+    },
+)
+
+DISPATCHER_RESPONSE: Dict[str, Any] = {
+    "success": True,
+    "errorMessage": None,
+    "id": "true_5492914141794@c.us_3EB0C1B2A5A1D2E3F4A5",
+}
+
+
+def parse_before() -> Any:
+    """Function that parses the response the way it used to be parsed"""
+
+    return CHAT_API_RESPONSE.json()
+
+
+def parse_after() -> Any:
+    """Function that parses the response the way it's parsed now"""
+
+    return fast_json.loads(CHAT_API_RESPONSE.content)
+
+
+def respond_before() -> bytes:
+    """Function that makes the dispatcher's response the way it used to be
+    made"""
+
+    SentMessageResponseSchema(**DISPATCHER_RESPONSE)
+
+    return JSONResponse(DISPATCHER_RESPONSE).body
+
+
+def respond_after() -> bytes:
+    """Function that makes the dispatcher's response the way it's made
+    now"""
+
+    return FastJSONResponse(DISPATCHER_RESPONSE).body
+
+
+def time_per_call(func: Callable[[], Any], number: int) -> float:
+    """Function that returns the best time per call of a function out of
+    several runs, in microseconds"""
+
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main(args: argparse.Namespace):
+    """Function that runs every stage of the benchmark"""
+
+    print(
+        f"{args.number} calls per run, orjson "
+        f"{'on' if fast_json.is_orjson_available() else 'off'}\n"
+    )
+    print(f"{'stage':<10}{'before':>12}{'after':>12}{'speedup':>10}")
+
+    results: Dict[str, float] = {}
+
+    for stage, before, after in (
+        ("parse", parse_before, parse_after),
+        ("respond", respond_before, respond_after),
+    ):
+        before_time = time_per_call(before, args.number)
+        after_time = time_per_call(after, args.number)
+
+        results["before"] = results.get("before", 0) + before_time
+        results["after"] = results.get("after", 0) + after_time
+
+        print(
+            f"{stage:<10}"
+            f"{before_time:>9.2f} us"
+            f"{after_time:>9.2f} us"
+            f"{before_time / after_time:>9.1f}x"
+        )
+
+    print(
+        f"{'total':<10}"
+        f"{results['before']:>9.2f} us"
+        f"{results['after']:>9.2f} us"
+        f"{results['before'] / results['after']:>9.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100_000)
+
+    main(parser.parse_args())
@@ -0,0 +1,136 @@
+"""Benchmark that measures the peak memory allocated while streaming
+bodies of growing numbers of messages to POST /v1/messages:stream
+
+The body is received in chunks, the way a server hands it to the app, and
+the response is discarded as it's sent, with the provider's send replaced
+by a successful response. The peak should stay flat whatever the number of
+messages, as only the records in flight are held
+
+Usage:
+    $ python -m benchmarks.bench_stream_memory --counts 1000 10000 50000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import tracemalloc
+from typing import Any, Dict, Tuple
+
+from src.schemas.message_dto import text_template
+from src.utils import fast_json
+
+
+CHUNK_SIZE = 65536
+
+
+async def send_success(message: Any, _: Any) -> Dict[str, Any]:
+    """Coroutine that stands for the provider's send"""
+
+    await asyncio.sleep(0)
+
+    return {"success": True, "errorMessage": None, "id": message.text}
+
+
+async def stream(app: Any, count: int) -> Tuple[int, int]:
+    """Coroutine that streams count messages through the ASGI app, and
+    returns the bytes sent and the lines of the response"""
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/v1/messages:stream",
+        "raw_path": b"/v1/messages:stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", b"application/x-ndjson"),
+            (b"transfer-encoding", b"chunked"),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    line = fast_json.dumps(text_template) + b"\n"
+    per_chunk = CHUNK_SIZE // len(line)
+    remaining = count
+    lines = 0
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal remaining
+
+        # Each chunk is made as it's received, as a socket would read it
+        lines_in_chunk = min(per_chunk, remaining)
+        remaining -= lines_in_chunk
+
+        return {
+            "type": "http.request",
+            "body": line * lines_in_chunk,
+            "more_body": remaining > 0,
+        }
+
+    async def send(message: Dict[str, Any]):
+        nonlocal lines
+
+        if message["type"] == "http.response.body":
+            lines += message["body"].count(b"\n")
+
+    await app(scope, receive, send)
+
+    return count * len(line), lines
+
+
+async def run(args: argparse.Namespace):
+    """Coroutine that streams each number of messages and prints the peak
+    memory allocated and the throughput of each"""
+
+    # pylint: disable-next=import-outside-toplevel
+    from src.main import app
+    # pylint: disable-next=import-outside-toplevel
+    from src.whatsapp_provider import provider
+
+    provider.send = send_success  # type: ignore
+
+    # The logger is configured when the app is imported
+    logging.getLogger("dispatcher").setLevel(logging.WARNING)
+
+    # The first stream warms up the app, so its imports and caches aren't
+    # counted
+    await stream(app, 100)
+
+    print(
+        f"{'messages':>10}{'body':>12}{'peak allocated':>18}"
+        f"{'messages/s':>14}"
+    )
+
+    for count in args.counts:
+        tracemalloc.start()
+        started = time.perf_counter()
+
+        body_size, lines = await stream(app, count)
+
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+
+        tracemalloc.stop()
+
+        assert lines == count
+
+        print(
+            f"{count:>10}"
+            f"{body_size / 1048576:>8.1f} MiB"
+            f"{peak / 1024:>14.1f} KiB"
+            f"{count / elapsed:>14.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--counts", type=int, nargs="+", default=[1000, 10000, 50000]
+    )
+
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,181 @@
+"""Benchmark that measures the memory POST /v1/messages takes to send media
+uploaded as multipart/form-data, by the size of the file
+
+Each file is uploaded through the ASGI app a chunk at a time, as a server
+would receive it, and sent to a transport that drains the body without
+keeping it, so the memory that's traced is the dispatcher's own: parsing
+the form, spooling the file and encoding it to base64 for Chat API. The
+body limits are lifted, as the largest files are over them
+
+Each file is uploaded twice, as tracing the memory slows everything down:
+once to time it and once to trace it
+
+Usage:
+    $ python -m benchmarks.bench_upload_memory --sizes 1 4 16 64
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, List
+
+import httpx
+
+
+BOUNDARY = "benchmarkboundary"
+
+CHUNK_SIZE = 64 * 1024
+
+# Enough of a PNG for its mimetype to be detected
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+class DrainingTransport(httpx.AsyncBaseTransport):
+    """Class that acts as Chat API, reading every request body without
+    keeping it and answering that the message was sent"""
+
+    def __init__(self):
+        self.received = 0
+
+    async def handle_async_request(
+        self, request: httpx.Request
+    ) -> httpx.Response:
+        async for chunk in request.stream:  # type: ignore
+            self.received += len(chunk)
+
+        return httpx.Response(200, json={"sent": True, "id": "BENCHMARK"})
+
+
+def get_form_chunks(fields: Dict[str, str], size: int) -> Iterator[bytes]:
+    """Function that yields a multipart/form-data body with the given
+    fields and a PNG file of the given bytes, a chunk at a time"""
+
+    for name, value in fields.items():
+        yield (
+            f"--{BOUNDARY}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n"
+        ).encode("utf-8")
+
+    yield (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="a.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode("ascii") + PNG_HEADER
+
+    for start in range(len(PNG_HEADER), size, CHUNK_SIZE):
+        yield bytes(min(CHUNK_SIZE, size - start))
+
+    yield f"\r\n--{BOUNDARY}--\r\n".encode("ascii")
+
+
+async def upload(app: Any, fields: Dict[str, str], size: int) -> int:
+    """Coroutine that uploads a file of the given bytes along with the
+    given fields to /v1/messages through the ASGI app and returns the
+    status code of its response"""
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/v1/messages",
+        "raw_path": b"/v1/messages",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (
+                b"content-type",
+                f"multipart/form-data; boundary={BOUNDARY}".encode("ascii"),
+            ),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    chunks = get_form_chunks(fields, size)
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        chunk = next(chunks, b"")
+
+        return {
+            "type": "http.request", "body": chunk, "more_body": bool(chunk)
+        }
+
+    async def send(message: Dict[str, Any]):
+        messages.append(message)
+
+    await app(scope, receive, send)
+
+    return messages[0]["status"]
+
+
+async def run(args: argparse.Namespace):
+    """Coroutine that uploads a file of each size and prints how long it
+    took and the peak of the memory traced while doing so"""
+
+    # Body and upload limits are read from the environment when the app is
+    # imported
+    os.environ["BODY_LIMIT"] = ""
+    os.environ["BODY_LIMITS"] = "{}"
+    os.environ["UPLOAD_MAX_SIZES"] = "{}"
+
+    # pylint: disable-next=import-outside-toplevel
+    from src.main import app
+    # pylint: disable-next=import-outside-toplevel
+    from src.schemas.message_dto import required_template
+    # pylint: disable-next=import-outside-toplevel
+    from src.whatsapp_provider import provider
+
+    transport = DrainingTransport()
+
+    # pylint: disable-next=protected-access
+    provider._client = httpx.AsyncClient(transport=transport)
+
+    print(
+        f"{'file':>10}{'sent to Chat API':>20}{'peak memory':>16}"
+        f"{'time':>10}"
+    )
+
+    for size in args.sizes:
+        started = time.perf_counter()
+
+        assert await upload(
+            app, required_template, size * 1024 * 1024
+        ) == 200
+
+        elapsed = time.perf_counter() - started
+        transport.received = 0
+
+        tracemalloc.start()
+
+        await upload(app, required_template, size * 1024 * 1024)
+
+        _, peak = tracemalloc.get_traced_memory()
+
+        tracemalloc.stop()
+
+        print(
+            f"{size:>7} MiB"
+            f"{transport.received / 1024 / 1024:>16.1f} MiB"
+            f"{peak / 1024 / 1024:>12.1f} MiB"
+            f"{elapsed * 1000:>7.0f} ms"
+        )
+
+    await provider.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1, 4, 16, 64]
+    )
+
+    logging.getLogger("dispatcher").setLevel(logging.WARNING)
+
+    asyncio.run(run(parser.parse_args()))
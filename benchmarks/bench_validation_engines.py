@@ -0,0 +1,96 @@
+"""Benchmark that compares validating messages with the pydantic model and
+with the compiled validator, for every kind of message
+
+Each kind is timed with a URL and with a base64 media where it takes one,
+with the media cache turned off so base64 media are validated every time,
+and with an invalid message the compiled validator hands over to the model
+
+Usage:
+    $ python -m benchmarks.bench_validation_engines --number 2000
+"""
+
+import argparse
+import timeit
+from functools import partial
+from typing import Any, Callable
+
+# pylint: disable-next=no-name-in-module
+from pydantic import ValidationError
+
+from src.schemas import message_dto
+from src.schemas.message_dto import (
+    MessageDTO,
+    text_template,
+    required_template,
+    image_template,
+    image_template_base64,
+    video_template,
+    video_template_base64,
+    audio_template,
+    audio_template_base64,
+    document_template_pdf,
+    document_template_base64_pdf,
+)
+from src.schemas.message_validator import message_validator
+
+
+MESSAGES = {
+    "text": text_template,
+    "image url": image_template,
+    "image base64": image_template_base64,
+    "video url": video_template,
+    "video base64": video_template_base64,
+    "audio url": audio_template,
+    "audio base64": audio_template_base64,
+    "document url": document_template_pdf,
+    "document base64": document_template_base64_pdf,
+    "invalid": {**required_template, "text": "asd", "image": "asd"},
+}
+
+
+def parse(parse_obj: Callable[[Any], MessageDTO], data: Any):
+    """Function that validates a message, whether it's valid or not"""
+
+    try:
+        parse_obj(data)
+
+    except ValidationError:
+        pass
+
+
+def time_per_call(func: Callable[[], Any], number: int) -> float:
+    """Function that returns the best time per call of a function out of
+    several runs, in microseconds"""
+
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main(args: argparse.Namespace):
+    """Function that runs every message of the benchmark"""
+
+    message_dto.media_cache = None
+
+    print(f"{args.number} calls per run\n")
+    print(f"{'message':<17}{'pydantic':>12}{'compiled':>12}{'speedup':>10}")
+
+    for name, data in MESSAGES.items():
+        pydantic_time = time_per_call(
+            partial(parse, MessageDTO.parse_obj, data), args.number
+        )
+        compiled_time = time_per_call(
+            partial(parse, message_validator.parse_obj, data), args.number
+        )
+
+        print(
+            f"{name:<17}"
+            f"{pydantic_time:>9.1f} us"
+            f"{compiled_time:>9.1f} us"
+            f"{pydantic_time / compiled_time:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+
+    main(parser.parse_args())
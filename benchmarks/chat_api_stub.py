@@ -0,0 +1,270 @@
+"""Module that contains a local Chat API stub for the benchmarks
+
+The stub listens on localhost with TLS, in a process of its own, and
+negotiates either HTTP/2 or HTTP/1.1 through ALPN, answering every request
+with a successful Chat API response after a configurable latency. Its
+certificate is a throwaway self-signed one, made with the openssl command
+line tool
+"""
+
+import asyncio
+import json
+import multiprocessing
+import ssl
+import subprocess
+import tempfile
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+
+import h11
+import h2.config
+import h2.connection
+import h2.events
+
+
+RESPONSE_BODY = json.dumps(
+    {"sent": True, "id": "false_5492914141794@c.us_BENCHMARK"}
+).encode("utf-8")
+
+
+def make_certificate(directory: Path) -> Tuple[Path, Path]:
+    """Function that makes a self-signed certificate for localhost in the
+    given directory and returns the paths to the certificate and its key"""
+
+    cert_path = directory / "cert.pem"
+    key_path = directory / "key.pem"
+
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-days", "1", "-subj", "/CN=localhost",
+            "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+            "-keyout", str(key_path), "-out", str(cert_path),
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+    return cert_path, key_path
+
+
+class H2Handler:
+    """Class that answers the requests of an HTTP/2 connection"""
+
+    def __init__(self, transport: asyncio.Transport, latency: float):
+        self.transport = transport
+        self.latency = latency
+        self.connection = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=False)
+        )
+
+        self.connection.initiate_connection()
+        self.transport.write(self.connection.data_to_send())
+
+    def data_received(self, data: bytes):
+        """Method that feeds the received bytes to the HTTP/2 state
+        machine"""
+
+        for event in self.connection.receive_data(data):
+            if isinstance(event, h2.events.DataReceived):
+                self.connection.acknowledge_received_data(
+                    event.flow_controlled_length, event.stream_id
+                )
+
+            elif isinstance(event, h2.events.StreamEnded):
+                asyncio.ensure_future(self.respond(event.stream_id))
+
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                self.transport.close()
+
+        self.transport.write(self.connection.data_to_send())
+
+    async def respond(self, stream_id: int):
+        """Coroutine that answers a stream after the stub's latency"""
+
+        await asyncio.sleep(self.latency)
+
+        if self.transport.is_closing():
+            return
+
+        self.connection.send_headers(
+            stream_id,
+            [
+                (":status", "200"),
+                ("content-type", "application/json"),
+                ("content-length", str(len(RESPONSE_BODY))),
+            ],
+        )
+        self.connection.send_data(stream_id, RESPONSE_BODY, end_stream=True)
+
+        self.transport.write(self.connection.data_to_send())
+
+
+class H11Handler:
+    """Class that answers the requests of an HTTP/1.1 connection"""
+
+    def __init__(self, transport: asyncio.Transport, latency: float):
+        self.transport = transport
+        self.latency = latency
+        self.connection = h11.Connection(h11.SERVER)
+        self.responding = False
+
+    def data_received(self, data: bytes):
+        """Method that feeds the received bytes to the HTTP/1.1 state
+        machine"""
+
+        self.connection.receive_data(data)
+        self.process()
+
+    def process(self):
+        """Method that goes through the events that are ready, answering
+        the request once its body is complete"""
+
+        while not self.responding:
+            event = self.connection.next_event()
+
+            if event is h11.NEED_DATA:
+                return
+
+            if isinstance(event, h11.EndOfMessage):
+                self.responding = True
+                asyncio.ensure_future(self.respond())
+
+            elif isinstance(event, h11.ConnectionClosed):
+                self.transport.close()
+
+                return
+
+    async def respond(self):
+        """Coroutine that answers the request after the stub's latency"""
+
+        await asyncio.sleep(self.latency)
+
+        if self.transport.is_closing():
+            return
+
+        for event in (
+            h11.Response(
+                status_code=200,
+                headers=[
+                    ("content-type", "application/json"),
+                    ("content-length", str(len(RESPONSE_BODY))),
+                ],
+            ),
+            h11.Data(data=RESPONSE_BODY),
+            h11.EndOfMessage(),
+        ):
+            self.transport.write(self.connection.send(event))
+
+        self.connection.start_next_cycle()
+        self.responding = False
+        self.process()
+
+
+class StubProtocol(asyncio.Protocol):
+    """Class that picks the handler of every connection basing on the
+    protocol negotiated through ALPN"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.handler: Optional[Union[H2Handler, H11Handler]] = None
+
+    def connection_made(self, transport):
+        ssl_object = transport.get_extra_info("ssl_object")
+
+        if ssl_object.selected_alpn_protocol() == "h2":
+            self.handler = H2Handler(transport, self.latency)
+
+        else:
+            self.handler = H11Handler(transport, self.latency)
+
+    def data_received(self, data: bytes):
+        if self.handler:
+            self.handler.data_received(data)
+
+
+async def serve(
+    cert_path: Path,
+    key_path: Path,
+    alpn_protocols: List[str],
+    latency: float,
+    connection: Connection,
+):
+    """Coroutine that serves the stub until its process is terminated, the
+    port it listens on is sent through the connection"""
+
+    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ssl_context.load_cert_chain(str(cert_path), str(key_path))
+    ssl_context.set_alpn_protocols(alpn_protocols)
+
+    server = await asyncio.get_running_loop().create_server(
+        lambda: StubProtocol(latency),
+        host="127.0.0.1",
+        port=0,
+        ssl=ssl_context,
+    )
+
+    connection.send(server.sockets[0].getsockname()[1])
+
+    async with server:
+        await server.serve_forever()
+
+
+def run(*args: Any):
+    """Function that is the entry point of the stub's process"""
+
+    asyncio.run(serve(*args))
+
+
+class ChatApiStub:
+    """Class that runs the stub in its own process on a free port of
+    localhost, so it doesn't compete with the benchmarked code for the event
+    loop. It's meant to be used as an async context manager"""
+
+    def __init__(self, latency: float = 0.005, http2: bool = True):
+        self.latency = latency
+        self.alpn_protocols: List[str] = (
+            ["h2", "http/1.1"] if http2 else ["http/1.1"]
+        )
+        self.cert_path: Optional[Path] = None
+        self.port = 0
+
+        self._directory = tempfile.TemporaryDirectory()
+        self._process: Optional[multiprocessing.Process] = None
+
+    @property
+    def url(self) -> str:
+        """Property that returns the base URL of the stub"""
+
+        return f"https://localhost:{self.port}"
+
+    async def __aenter__(self) -> "ChatApiStub":
+        self.cert_path, key_path = make_certificate(
+            Path(self._directory.name)
+        )
+
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+
+        self._process = multiprocessing.Process(
+            target=run,
+            args=(
+                self.cert_path, key_path, self.alpn_protocols, self.latency,
+                sender,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+
+        self.port = await asyncio.get_running_loop().run_in_executor(
+            None, receiver.recv
+        )
+
+        return self
+
+    async def __aexit__(self, *_):
+        if self._process:
+            self._process.terminate()
+            self._process.join()
+
+        self._directory.cleanup()
@@ -1,28 +1,75 @@
 """Module that contains the api /v1 router and configures it"""
 
-from fastapi import APIRouter, status, Body
-from fastapi.responses import JSONResponse
+import time
+from typing import List, Optional, Union
 
+from fastapi import APIRouter, status, Depends, Header, Request
+from fastapi.exceptions import HTTPException
+from fastapi.routing import APIRoute
+
+# pylint: disable-next=no-name-in-module
+from pydantic import PositiveFloat
+
+from src.env_variables import env_variables
 from src.whatsapp_provider import provider as whatsapp_provider
+from src.schemas.batch_dto import BatchDTO, batch_template
+from src.schemas.dispatcher_responses import (
+    BatchResponseSchema, MessageJobSchema, SentMessageResponseSchema
+)
 from src.schemas.message_dto import MessageDTO
-from src.schemas.dispatcher_responses import SentMessageResponseSchema
+from src.schemas.upload_dto import UploadDTO
+from src.utils import errors
+from src.utils.fast_json import FastJSONResponse
 from src.utils.logger import logger
 from . import examples
+from .batch import send_batch
+from .jobs import job_queue, prefers_async
+from .message_body import (
+    ParsedMessage, get_batch, get_message, release_message
+)
+from .ndjson_stream import (
+    NDJSONStreamingResponse, iter_records, stream_results
+)
+from .raw_route import RawMessagesRoute
 
 
 api = APIRouter(prefix="/v1", tags=["api_v1"])
 
 
-@api.post("/messages")
 async def messages(
-    message: MessageDTO = Body(..., examples=examples.examples_message_dto)
-) -> JSONResponse:
+    message: Union[MessageDTO, UploadDTO] = Depends(get_message),
+    x_request_timeout: Optional[PositiveFloat] = Header(
+        None,
+        description="Seconds the caller is willing to wait for the message \
+to be sent, nothing keeps going for it once they pass",
+    ),
+    prefer: Optional[str] = Header(
+        None,
+        description="respond-async to be responded with a 202 and a job id \
+as soon as the message is queued, its result is at /v1/messages/{job_id}",
+    ),
+) -> FastJSONResponse:
     """Endpoint function that handles POST requests to /messages validating
-    each one's parameters with the MessageDTO schema class"""
+    each one's parameters with the MessageDTO schema class, off the event
+    loop if the body is large, or with the UploadDTO schema class if the
+    media is uploaded as multipart/form-data. The message is sent in the
+    background if the request prefers to be responded asynchronously"""
+
+    deadline = (
+        time.monotonic() + x_request_timeout
+        if x_request_timeout is not None else None
+    )
+
+    if job_queue is not None and prefers_async(prefer):
+        return await submit_message(message, deadline)
 
-    response = await whatsapp_provider.send(message)
+    # The provider already builds it as SentMessageResponseSchema says, so
+    # it isn't validated again
+    try:
+        response = await whatsapp_provider.send(message, deadline)
 
-    SentMessageResponseSchema(**response)
+    finally:
+        await release_message(message)
 
     # I prefer to use [] to access the value because
     # this way I know immediately something is wrong
@@ -32,7 +79,7 @@ async def messages(
         else status.HTTP_200_OK
     )
 
-    json_response = JSONResponse(response, status_code)
+    json_response = FastJSONResponse(response, status_code)
 
     logger.info(
         "final response from dispatcher: %s",
@@ -40,3 +87,209 @@ async def messages(
     )
 
     return json_response
+
+
+async def submit_message(
+    message: Union[MessageDTO, UploadDTO], deadline: Optional[float]
+) -> FastJSONResponse:
+    """Coroutine that queues a message to be sent in the background and
+    responds with its job id, the message is released once it's sent"""
+
+    assert job_queue is not None
+
+    try:
+        job_id = job_queue.submit((message, deadline))
+
+    except HTTPException:
+        await release_message(message)
+
+        raise
+
+    logger.info("message queued to be sent in the background: %s", job_id)
+
+    return FastJSONResponse(
+        {"jobId": job_id, "status": "queued"},
+        status.HTTP_202_ACCEPTED,
+        headers={
+            "Location": f"{api.prefix}/messages/{job_id}",
+            "Preference-Applied": "respond-async",
+        },
+    )
+
+
+async def message_job(job_id: str) -> FastJSONResponse:
+    """Endpoint function that handles GET requests to /messages/{job_id},
+    the response is the one /messages would have responded once the
+    message is sent, and a 202 with its status until then"""
+
+    if job_queue is None:
+        raise errors.JobNotFoundError
+
+    job_status, result = job_queue.get(job_id)
+
+    if job_status is None:
+        raise errors.JobNotFoundError
+
+    if job_status != "done":
+        return FastJSONResponse(
+            {"jobId": job_id, "status": job_status},
+            status.HTTP_202_ACCEPTED,
+        )
+
+    status_code = (
+        status.HTTP_422_UNPROCESSABLE_ENTITY
+        if not result["success"]
+        else status.HTTP_200_OK
+    )
+
+    return FastJSONResponse(result, status_code)
+
+
+async def messages_batch(
+    batch: List[ParsedMessage] = Depends(get_batch),
+    x_request_timeout: Optional[PositiveFloat] = Header(
+        None,
+        description="Seconds the caller is willing to wait for the whole \
+batch to be sent, nothing keeps going for it once they pass",
+    ),
+) -> FastJSONResponse:
+    """Endpoint function that handles POST requests to /messages:batch,
+    validating every message of the batch as /messages does and sending the
+    valid ones concurrently. The response has the result of each message,
+    in order"""
+
+    deadline = (
+        time.monotonic() + x_request_timeout
+        if x_request_timeout is not None else None
+    )
+
+    results = await send_batch(
+        whatsapp_provider, batch, deadline, env_variables.BATCH_CONCURRENCY
+    )
+
+    logger.info(
+        "final response from dispatcher to a batch: %d of %d sent",
+        sum(result["success"] for result in results),
+        len(results)
+    )
+
+    return FastJSONResponse({"results": results})
+
+
+async def messages_stream(
+    request: Request,
+    x_request_timeout: Optional[PositiveFloat] = Header(
+        None,
+        description="Seconds the caller is willing to wait for each message \
+to be sent since it's received, nothing keeps going for it once they pass",
+    ),
+) -> NDJSONStreamingResponse:
+    """Endpoint function that handles POST requests to /messages:stream,
+    whose body is a message per line. Each message is validated as
+    /messages does and sent as soon as it's received, and the response
+    streams the result of each one back as a line, in order"""
+
+    max_record_size = env_variables.STREAM_MAX_RECORD_SIZE
+
+    return NDJSONStreamingResponse(
+        stream_results(
+            whatsapp_provider,
+            iter_records(request.stream(), max_record_size),
+            env_variables.STREAM_CONCURRENCY,
+            x_request_timeout,
+            max_record_size,
+        )
+    )
+
+
+api.add_api_route(
+    "/messages",
+    messages,
+    methods=["POST"],
+    # The body is validated by get_message, so it's documented here
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": MessageDTO.schema(),
+                    "examples": examples.examples_message_dto,
+                },
+                "multipart/form-data": {
+                    "schema": UploadDTO.schema(),
+                },
+            },
+            "required": True,
+        }
+    },
+    responses={
+        status.HTTP_202_ACCEPTED: {
+            "model": MessageJobSchema,
+            "description": "The message is queued to be sent, if the request \
+prefers to be responded asynchronously",
+        },
+    },
+    route_class_override=(
+        RawMessagesRoute if env_variables.MESSAGES_ROUTE == "raw"
+        else APIRoute
+    ),
+)
+
+api.add_api_route(
+    "/messages/{job_id}",
+    message_job,
+    methods=["GET"],
+    response_model=SentMessageResponseSchema,
+    responses={
+        status.HTTP_202_ACCEPTED: {
+            "model": MessageJobSchema,
+            "description": "The message isn't sent yet",
+        },
+    },
+)
+
+api.add_api_route(
+    "/messages:batch",
+    messages_batch,
+    methods=["POST"],
+    response_model=BatchResponseSchema,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": BatchDTO.schema(),
+                    "example": batch_template,
+                },
+            },
+            "required": True,
+        }
+    },
+)
+
+api.add_api_route(
+    "/messages:stream",
+    messages_stream,
+    methods=["POST"],
+    response_class=NDJSONStreamingResponse,
+    responses={
+        200: {
+            "description": "The result of each message as a line, in order",
+            "content": {
+                "application/x-ndjson": {
+                    "schema": SentMessageResponseSchema.schema(),
+                },
+            },
+        },
+    },
+    # The body is read a line at a time by the endpoint, so it's documented
+    # here
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/x-ndjson": {
+                    "schema": MessageDTO.schema(),
+                },
+            },
+            "required": True,
+        }
+    },
+)
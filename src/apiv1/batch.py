@@ -0,0 +1,86 @@
+"""Module that contains the fan-out of the messages of a batch to the
+provider
+
+The messages are sent concurrently, as many at a time as the concurrency
+of the batch allows, on top of the limits the provider already has. A
+message that fails, or that was invalid, only fails its own result, so the
+results always line up with the messages. That holds for unexpected errors
+too, since the rest of the messages may already be sent
+
+Usage:
+    from src.apiv1.batch import send_batch, send_parsed_message
+
+    results = await send_batch(provider, messages, deadline, concurrency)
+    result = await send_parsed_message(provider, message, deadline)
+"""
+
+import asyncio
+from typing import List, Optional
+
+from fastapi.exceptions import HTTPException
+
+from src.utils import errors
+from src.utils.logger import logger
+from src.utils.provider import Provider
+from src.utils.type_aliases import JsonDict
+from .exception_handlers import format_errors
+from .message_body import ParsedMessage
+
+
+def make_failed_result(error_message: str) -> JsonDict:
+    """Function that makes the result of a message that wasn't sent, as
+    SentMessageResponseSchema says"""
+
+    return {"success": False, "errorMessage": error_message, "id": None}
+
+
+async def send_parsed_message(
+    provider: Provider,
+    parsed_message: ParsedMessage,
+    deadline: Optional[float],
+) -> JsonDict:
+    """Coroutine that sends a message if it's valid and returns its result,
+    the errors it has or the reason it failed otherwise"""
+
+    message, message_errors = parsed_message
+
+    if message is None:
+        return make_failed_result(format_errors(message_errors))
+
+    try:
+        return await provider.send(message, deadline)
+
+    except HTTPException as exception:
+        return make_failed_result(exception.detail)
+
+    # The other messages may already be sent, so an unexpected error only
+    # fails this one instead of the whole batch
+    # pylint: disable-next=broad-except
+    except Exception:
+        logger.exception("unexpected error while sending a message")
+
+        return make_failed_result(errors.UnexpectedSendError.detail)
+
+
+async def send_batch(
+    provider: Provider,
+    messages: List[ParsedMessage],
+    deadline: Optional[float],
+    concurrency: int,
+) -> List[JsonDict]:
+    """Coroutine that sends the valid messages of a batch concurrently and
+    returns the result of each message, in order"""
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(parsed_message: ParsedMessage) -> JsonDict:
+        # Invalid messages don't take a turn
+        if parsed_message[0] is None:
+            return await send_parsed_message(provider, parsed_message, None)
+
+        async with semaphore:
+            return await send_parsed_message(
+                provider, parsed_message, deadline
+            )
+
+    return await asyncio.gather(*(send(message) for message in messages))
@@ -0,0 +1,141 @@
+"""Module that contains the middleware that limits the size of the bodies
+of the requests while they're received
+
+Starlette reads a whole body before the endpoint validates it, so a client
+sending a file far larger than any valid one would have it buffered and
+parsed just to be told so. The middleware counts the bytes of the body as
+the app receives them, and responds with a 413 as soon as they cross the
+limit of the path and content type of the request, without receiving the
+rest. A Content-Length over the limit is rejected before receiving any
+
+Usage:
+    app.add_middleware(
+        BodyLimitMiddleware,
+        limits={"/v1/messages": {"application/json": 524288}},
+        default_limit=1048576,
+    )
+"""
+
+from typing import Mapping, Optional
+
+from fastapi import status
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils import errors
+from src.utils.logger import logger
+from .exception_handlers import make_error_response
+
+
+class BodyLimitMiddleware:
+    """Class that acts as an ASGI middleware that rejects the requests whose
+    body is larger than the limit of their path and content type
+
+    limits maps paths to content types (without parameters, "*" for any) to
+    bytes, or None for no limit (e.g. for bodies streamed a record at a
+    time), requests that match none of them get default_limit, if any"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: Mapping[str, Mapping[str, Optional[int]]],
+        default_limit: Optional[int] = None,
+    ):
+        self.app = app
+        self.limits = limits
+        self.default_limit = default_limit
+
+    def get_limit(self, path: str, content_type: str) -> Optional[int]:
+        """Method that returns the limit of the body of a request, or None
+        if it has no limit"""
+
+        limits = self.limits.get(path, {})
+
+        return limits.get(content_type, limits.get("*", self.default_limit))
+
+    async def reject(
+        self, scope: Scope, receive: Receive, send: Send, limit: int,
+        content_type: str,
+    ):
+        """Coroutine that responds with a 413, and closes the connection so
+        the rest of the body isn't received"""
+
+        error = errors.BodyTooLargeError(
+            limit=limit, content_type=content_type or "untyped"
+        )
+
+        logger.warning("%s: %s", scope["path"], error)
+
+        response = make_error_response(
+            str(error), status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+        response.headers["Connection"] = "close"
+
+        await response(scope, receive, send)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+
+            return
+
+        headers = Headers(scope=scope)
+        media_type, _, _ = headers.get("content-type", "").partition(";")
+        content_type = media_type.strip().lower()
+        limit = self.get_limit(scope["path"], content_type)
+
+        if limit is None:
+            await self.app(scope, receive, send)
+
+            return
+
+        content_length = headers.get("content-length", "")
+
+        if content_length.isdigit() and int(content_length) > limit:
+            await self.reject(scope, receive, send, limit, content_type)
+
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def receive_limited() -> Message:
+            nonlocal received, exceeded
+
+            message = await receive()
+
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+
+                if received > limit:
+                    exceeded = True
+
+                    raise errors.BodyTooLargeError(
+                        limit=limit, content_type=content_type
+                    )
+
+            return message
+
+        async def send_unless_exceeded(message: Message):
+            nonlocal response_started
+
+            # Whatever the app responds to the body it couldn't receive is
+            # replaced by the 413
+            if exceeded:
+                return
+
+            if message["type"] == "http.response.start":
+                response_started = True
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive_limited, send_unless_exceeded)
+
+        except errors.BodyTooLargeError:
+            if response_started:
+                raise
+
+        if exceeded and not response_started:
+            await self.reject(scope, receive, send, limit, content_type)
@@ -1,15 +1,39 @@
 """Module that contains a configure function that adds the customized
 exception handlers for several raised exceptions"""
 
+from typing import Any, Mapping, Sequence
+
 from fastapi import Request, status
 from fastapi.applications import FastAPI
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
 from fastapi.exceptions import HTTPException
 from pydantic import ValidationError
 
 from src.schemas.dispatcher_responses import SentMessageResponseSchema
 from src.utils.errors import ErrorFormatter, Error
+from src.utils.fast_json import FastJSONResponse
+
+
+def make_error_response(detail: str, status_code: int) -> FastJSONResponse:
+    """Function that makes a response with an error, as the dispatcher
+    responds to every error"""
+
+    return FastJSONResponse(
+        content=SentMessageResponseSchema(
+            success=False,
+            errorMessage=detail,
+        ).dict(),
+        status_code=status_code,
+    )
+
+
+def format_errors(errors: Sequence[Mapping[str, Any]]) -> str:
+    """Function that formats the errors of a body, as pydantic lists them,
+    into the errorMessage of the response"""
+
+    return ErrorFormatter.format_list(
+        [Error(error["loc"], error["msg"]) for error in errors]
+    )
 
 
 def configure(app: FastAPI):
@@ -20,26 +44,12 @@ def configure(app: FastAPI):
     def return_proper_error_schema(
         _: Request,
         exc: ValidationError
-    ) -> JSONResponse:
-        return JSONResponse(
-            content=SentMessageResponseSchema(
-                success=False,
-                errorMessage=ErrorFormatter.format_list(
-                    [
-                        Error(error["loc"], error["msg"])
-                        for error in exc.errors()
-                    ]
-                ),
-            ).dict(),
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    ) -> FastJSONResponse:
+        return make_error_response(
+            format_errors(exc.errors()),
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
         )
 
     @app.exception_handler(HTTPException)
     def return_proper_error_http_exception(_: Request, exc: HTTPException):
-        return JSONResponse(
-            content=SentMessageResponseSchema(
-                success=False,
-                errorMessage=exc.detail,
-            ).dict(),
-            status_code=exc.status_code,
-        )
+        return make_error_response(exc.detail, exc.status_code)
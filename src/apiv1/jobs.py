@@ -0,0 +1,75 @@
+"""Module that contains the queue of the messages sent in the background,
+for the requests to /messages that prefer to be responded asynchronously
+
+A request with a Prefer: respond-async header (RFC 7240) is responded with
+a 202 and a job id as soon as its message is validated and queued, instead
+of once Chat API responds, and the result is looked up later with the job
+id. The message is released once it's sent, as /messages does when it
+responds, or once the queue is closed if it was never sent
+
+Usage:
+    from src.apiv1.jobs import job_queue, prefers_async
+
+    if job_queue is not None and prefers_async(prefer):
+        job_id = job_queue.submit((message, deadline))
+"""
+
+from typing import Optional, Tuple
+
+from fastapi.exceptions import HTTPException
+
+from src.env_variables import env_variables
+from src.utils.dispatch import Message
+from src.utils.job_queue import JobQueue
+from src.utils.type_aliases import JsonDict
+from src.whatsapp_provider import provider as whatsapp_provider
+from .batch import make_failed_result
+from .message_body import release_message
+
+
+def prefers_async(prefer: Optional[str]) -> bool:
+    """Function that tells whether the Prefer header of a request asks for
+    it to be responded asynchronously"""
+
+    if not prefer:
+        return False
+
+    return any(
+        preference.partition(";")[0].strip().lower() == "respond-async"
+        for preference in prefer.split(",")
+    )
+
+
+async def send_job(job: Tuple[Message, Optional[float]]) -> JsonDict:
+    """Coroutine that sends the message of a job before its deadline, if
+    any, and returns its result as SentMessageResponseSchema says"""
+
+    message, deadline = job
+
+    try:
+        return await whatsapp_provider.send(message, deadline)
+
+    except HTTPException as exception:
+        return make_failed_result(exception.detail)
+
+    finally:
+        await release_message(message)
+
+
+async def discard_job(job: Tuple[Message, Optional[float]]):
+    """Coroutine that releases the message of a job that was never sent"""
+
+    await release_message(job[0])
+
+
+job_queue = JobQueue(
+    send_job,
+    maxsize=env_variables.JOB_QUEUE_SIZE,
+    workers=env_variables.JOB_WORKERS,
+    results_size=env_variables.JOB_RESULTS_SIZE,
+    results_ttl=env_variables.JOB_RESULTS_TTL,
+    failed_result=make_failed_result(
+        "The message couldn't be sent because of an unexpected error"
+    ),
+    discard=discard_job,
+) if env_variables.ASYNC_JOBS else None
@@ -0,0 +1,339 @@
+"""Module that contains the dependencies that validate the body of the
+requests to /messages and /messages:batch, and the records streamed to
+/messages:stream, in the validation pool if they're large enough
+
+FastAPI would validate the body inline, so a large base64 file would keep
+the event loop busy and every other request waiting, text messages
+included. The errors are the same FastAPI would have responded with
+
+Media can be uploaded as multipart/form-data too, then the file is spooled
+to disk as it's received, instead of being buffered in base64, and the
+message is an UploadDTO
+
+JSON bodies over the spool threshold are spooled too, and the base64 media
+in them are left in the spool file, read from it as they're validated (in
+the validation pool as well) and sent. Only the compiled validator takes
+spooled media, so bodies are only spooled with that engine. Messages that
+can't be validated that way are read whole, so they get the usual errors.
+Either way, the file is closed by release_message once the message is sent
+
+A batch is validated at once, but an invalid message in it only gets its
+own errors, the rest are still sent
+"""
+
+from typing import (
+    Any, List, Mapping, Optional, Sequence, Tuple, Union
+)
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+# pylint: disable-next=no-name-in-module
+from pydantic import ValidationError
+# pylint: disable-next=no-name-in-module
+from pydantic.error_wrappers import ErrorWrapper
+# pylint: disable-next=no-name-in-module
+from pydantic.errors import MissingError
+from starlette.datastructures import UploadFile
+
+from src.env_variables import env_variables
+from src.schemas.batch_dto import BatchDTO
+from src.schemas.message_dto import MessageDTO
+from src.schemas.message_validator import message_validator
+from src.schemas.upload_dto import UploadDTO
+from src.utils import fast_json
+from src.utils.errors import FormBodyParseError
+from src.utils.spooled_json import (
+    SpooledString, parse_spooled_object, spool_stream
+)
+from src.utils.type_aliases import JsonDict
+from src.utils.validation_pool import ValidationPool
+
+
+ErrorDicts = Sequence[Mapping[str, Any]]
+
+# A message of a batch, or the errors found in it if it's invalid
+ParsedMessage = Tuple[Optional[MessageDTO], ErrorDicts]
+
+validation_pool = ValidationPool(
+    threshold=env_variables.VALIDATION_OFFLOAD_THRESHOLD,
+    workers=env_variables.VALIDATION_WORKERS,
+    executor=env_variables.VALIDATION_EXECUTOR,
+) if env_variables.VALIDATION_OFFLOAD else None
+
+parse_obj = (
+    message_validator.parse_obj
+    if env_variables.VALIDATION_ENGINE == "compiled"
+    else MessageDTO.parse_obj
+)
+
+# Only the compiled validator takes the media left in the spool file
+spool_threshold = (
+    env_variables.SPOOL_THRESHOLD
+    if env_variables.VALIDATION_ENGINE == "compiled"
+    else None
+)
+
+
+# pylint: disable-next=too-few-public-methods
+class BodyValidationError(RequestValidationError):
+    """Class that acts as the RequestValidationError FastAPI raises when a
+    body is invalid, made of errors that were already formatted (e.g. in a
+    worker process, as exceptions can't always be pickled)"""
+
+    def __init__(self, errors: ErrorDicts):
+        super().__init__([])
+
+        self._errors = errors
+
+    def errors(self) -> ErrorDicts:  # type: ignore
+        """Method that returns the errors, formatted as pydantic does"""
+
+        return self._errors
+
+
+def load_body(body: bytes) -> Tuple[Any, List[ErrorWrapper]]:
+    """Function that parses the JSON of a body, it returns either its data
+    or the errors found in it"""
+
+    if not body:
+        return None, [ErrorWrapper(MissingError(), loc=("body",))]
+
+    try:
+        return fast_json.loads(body), []
+
+    except ValueError as exception:
+        return None, [
+            ErrorWrapper(exception, ("body", getattr(exception, "pos", 0)))
+        ]
+
+
+def parse_message(body: bytes) -> Tuple[Optional[MessageDTO], ErrorDicts]:
+    """Function that parses and validates the body of a request to
+    /messages, it returns either the message or the errors found in it"""
+
+    data, raw_errors = load_body(body)
+
+    if not raw_errors:
+        try:
+            return parse_obj(data), []
+
+        except ValidationError as exception:
+            raw_errors = [ErrorWrapper(exception, ("body",))]
+
+    return None, RequestValidationError(raw_errors).errors()
+
+
+def parse_batch(
+    body: bytes
+) -> Tuple[Optional[List[ParsedMessage]], ErrorDicts]:
+    """Function that parses and validates the body of a request to
+    /messages:batch, it returns either every message along with the errors
+    found in it, in order, or the errors found in the batch itself"""
+
+    data, raw_errors = load_body(body)
+
+    if not raw_errors:
+        try:
+            batch = BatchDTO.parse_obj(data)
+
+        except ValidationError as exception:
+            raw_errors = [ErrorWrapper(exception, ("body",))]
+
+        else:
+            return [
+                parse_batch_message(index, item)
+                for index, item in enumerate(batch.messages)
+            ], []
+
+    return None, RequestValidationError(raw_errors).errors()
+
+
+def parse_batch_message(index: int, data: JsonDict) -> ParsedMessage:
+    """Function that validates a message of a batch, it returns either the
+    message or the errors found in it, located in the batch"""
+
+    try:
+        return parse_obj(data), []
+
+    except ValidationError as exception:
+        return None, RequestValidationError(
+            [ErrorWrapper(exception, ("body", "messages", index))]
+        ).errors()
+
+
+async def get_upload(request: Request) -> UploadDTO:
+    """Coroutine that returns the message in a multipart/form-data body,
+    whose file is spooled as it's received, and raises BodyValidationError
+    if it's invalid"""
+
+    # A malformed body (e.g. without a boundary) makes the parser raise
+    # just about anything
+    try:
+        form = await request.form()
+
+    # pylint: disable-next=broad-except
+    except Exception as exception:
+        raise FormBodyParseError from exception
+
+    try:
+        return UploadDTO.parse_obj(form)
+
+    except ValidationError as exception:
+        raise BodyValidationError(
+            RequestValidationError(
+                [ErrorWrapper(exception, ("body",))]
+            ).errors()
+        ) from exception
+
+
+def get_spool_file(message: MessageDTO) -> Optional[UploadFile]:
+    """Function that returns the spool file the media of a message is read
+    from, None if it isn't spooled"""
+
+    for field in MessageDTO.media_kinds:
+        value = getattr(message, field)
+
+        if isinstance(value, SpooledString):
+            return value.file
+
+    return None
+
+
+async def release_message(message: Union[MessageDTO, UploadDTO]):
+    """Coroutine that closes the file the media of a message is read from,
+    if any, it's meant to be called once the message is sent"""
+
+    file = (
+        message.file if isinstance(message, UploadDTO)
+        else get_spool_file(message)
+    )
+
+    if file is not None:
+        await file.close()
+
+
+def parse_spooled_message(
+    spool: Tuple[UploadFile, int]
+) -> Optional[MessageDTO]:
+    """Function that parses and validates the message in a spool file,
+    leaving its strings longer than the threshold in the file. It returns
+    None if the message can't be validated that way"""
+
+    file, threshold = spool
+    data = parse_spooled_object(file, threshold)
+
+    if data is None:
+        return None
+
+    values = message_validator.validate(data)
+
+    if values is None:
+        return None
+
+    return message_validator.make_message(data, values)
+
+
+def is_spooled(request: Request, threshold: int) -> bool:
+    """Function that tells whether the body of a request is spooled, it is
+    if it's over the threshold or its length isn't known beforehand"""
+
+    content_length = request.headers.get("Content-Length", "")
+
+    return not (content_length.isdigit() and int(content_length) <= threshold)
+
+
+async def get_spooled_message(
+    request: Request, threshold: int
+) -> Tuple[Optional[MessageDTO], bytes]:
+    """Coroutine that receives the body into a spool file and validates the
+    message in it, leaving its long strings in the file. If the message
+    can't be validated that way, it returns the whole body instead"""
+
+    file = await spool_stream(request.stream(), threshold)
+    size = file.file.tell()
+
+    # The file is read as it's parsed, so it's done in a thread even with
+    # the process executor
+    if validation_pool is None:
+        message = parse_spooled_message((file, threshold))
+
+    else:
+        message = await validation_pool.run(
+            parse_spooled_message, (file, threshold), size, picklable=False
+        )
+
+    if message is not None:
+        # Nothing is read from it if no media was spooled
+        if get_spool_file(message) is None:
+            await file.close()
+
+        return message, b""
+
+    await file.seek(0)
+
+    body = await file.read()
+
+    await file.close()
+
+    return None, body  # type: ignore
+
+
+async def validate_message(body: bytes) -> ParsedMessage:
+    """Coroutine that parses and validates the body of a message, inline or
+    in the validation pool depending on its size"""
+
+    if validation_pool is None:
+        return parse_message(body)
+
+    return await validation_pool.run(parse_message, body, len(body))
+
+
+async def get_batch(request: Request) -> List[ParsedMessage]:
+    """Dependency function that returns the messages in the body of a
+    request to /messages:batch, along with the errors of the invalid ones,
+    validated inline or in the validation pool depending on its size. It
+    raises BodyValidationError if the batch itself is invalid"""
+
+    body = await request.body()
+
+    if validation_pool is None:
+        messages, errors = parse_batch(body)
+
+    else:
+        messages, errors = await validation_pool.run(
+            parse_batch, body, len(body)
+        )
+
+    if messages is None:
+        raise BodyValidationError(errors)
+
+    return messages
+
+
+async def get_message(request: Request) -> Union[MessageDTO, UploadDTO]:
+    """Dependency function that returns the message in the body of the
+    request, validated inline or in the validation pool depending on its
+    size, and raises BodyValidationError if it's invalid"""
+
+    content_type = request.headers.get("Content-Type", "")
+
+    if content_type.partition(";")[0].strip() == "multipart/form-data":
+        return await get_upload(request)
+
+    if spool_threshold is not None and is_spooled(request, spool_threshold):
+        spooled_message, body = await get_spooled_message(
+            request, spool_threshold
+        )
+
+        if spooled_message is not None:
+            return spooled_message
+
+    else:
+        body = await request.body()
+
+    message, errors = await validate_message(body)
+
+    if message is None:
+        raise BodyValidationError(errors)
+
+    return message
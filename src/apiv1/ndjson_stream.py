@@ -0,0 +1,215 @@
+"""Module that contains the streaming of newline-delimited JSON messages to
+the provider, for /messages:stream
+
+Each line of the body is a message, validated and sent as soon as it
+arrives, and its result is streamed back as a line of the response, in the
+same order. Only as many records as the concurrency of the stream are in
+flight at once, the body isn't read any further until one of them is
+written back, so a client sending faster than the provider can take is
+slowed down by the connection itself and the memory used doesn't grow with
+the size of the body. A record over the size limit fails on its own, and
+the rest of its line is discarded as it's received
+
+Usage:
+    from src.apiv1.ndjson_stream import (
+        NDJSONStreamingResponse, iter_records, stream_results
+    )
+
+    records = iter_records(request.stream(), max_record_size)
+
+    return NDJSONStreamingResponse(
+        stream_results(
+            provider, records, concurrency, timeout, max_record_size
+        )
+    )
+"""
+
+import asyncio
+import time
+from typing import AsyncIterable, AsyncIterator, Optional
+
+from fastapi.exceptions import RequestValidationError
+# pylint: disable-next=no-name-in-module
+from pydantic.error_wrappers import ErrorWrapper
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from src.utils import errors, fast_json
+from src.utils.logger import logger
+from src.utils.provider import Provider
+from src.utils.type_aliases import JsonDict
+from .batch import make_failed_result, send_parsed_message
+from .message_body import ParsedMessage, validate_message
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Class that streams the lines of a NDJSON response while the body of
+    the request is still being received
+
+    StreamingResponse listens for the client disconnecting while it
+    streams, which receives the messages of the body the endpoint reads
+    itself, so the disconnection is noticed by the reading instead"""
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await self.stream_response(send)
+
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_records(
+    chunks: AsyncIterable[bytes], max_record_size: int
+) -> AsyncIterator[Optional[bytes]]:
+    """Coroutine that yields each line of a body, as its chunks are
+    received, or None for the lines over max_record_size bytes. Blank lines
+    are skipped"""
+
+    record = bytearray()
+    # Set while the rest of a line that's too large is discarded
+    skipping = False
+
+    async for chunk in chunks:
+        start = 0
+        end = chunk.find(b"\n")
+
+        while end != -1:
+            if skipping:
+                skipping = False
+
+            else:
+                record += chunk[start:end]
+
+                if len(record) > max_record_size:
+                    yield None
+
+                elif record and not record.isspace():
+                    yield bytes(record)
+
+                record.clear()
+
+            start = end + 1
+            end = chunk.find(b"\n", start)
+
+        if skipping:
+            continue
+
+        record += chunk[start:]
+
+        if len(record) > max_record_size:
+            skipping = True
+            record.clear()
+
+            yield None
+
+    if record and not record.isspace():
+        yield bytes(record)
+
+
+async def parse_record(
+    record: Optional[bytes], max_record_size: int
+) -> ParsedMessage:
+    """Coroutine that parses and validates a record, the records that were
+    too large to be received only get that error"""
+
+    if record is None:
+        error = errors.RecordTooLargeError(limit=max_record_size)
+
+        return None, RequestValidationError(
+            [ErrorWrapper(error, ("body",))]
+        ).errors()
+
+    return await validate_message(record)
+
+
+async def stream_results(
+    provider: Provider,
+    records: AsyncIterator[Optional[bytes]],
+    concurrency: int,
+    timeout: Optional[float],
+    max_record_size: int,
+) -> AsyncIterator[bytes]:
+    """Coroutine that sends the records as they're received, up to
+    concurrency of them at once, and yields the result of each one as a
+    line, in order. timeout is how many seconds each record has to be sent
+    since it's received"""
+
+    semaphore = asyncio.Semaphore(concurrency)
+    # Holds the results in the order of the records, None once there are no
+    # more
+    queue: "asyncio.Queue[Optional[asyncio.Future[JsonDict]]]" = (
+        asyncio.Queue()
+    )
+    sent = received = 0
+
+    async def send(record: Optional[bytes]) -> JsonDict:
+        deadline = (
+            time.monotonic() + timeout if timeout is not None else None
+        )
+
+        # Results already written can't be taken back, so an unexpected
+        # error only fails this record instead of cutting the stream
+        try:
+            return await send_parsed_message(
+                provider,
+                await parse_record(record, max_record_size),
+                deadline,
+            )
+
+        # pylint: disable-next=broad-except
+        except Exception:
+            logger.exception("unexpected error while sending a record")
+
+            return make_failed_result(errors.UnexpectedSendError.detail)
+
+    async def read():
+        try:
+            async for record in records:
+                # Past the concurrency, the body isn't read until a result
+                # is written back
+                await semaphore.acquire()
+
+                queue.put_nowait(asyncio.ensure_future(send(record)))
+
+        finally:
+            queue.put_nowait(None)
+
+    reader = asyncio.ensure_future(read())
+
+    try:
+        while True:
+            result_future = await queue.get()
+
+            if result_future is None:
+                break
+
+            result = await result_future
+
+            semaphore.release()
+
+            sent += result["success"]
+            received += 1
+
+            yield fast_json.dumps(result) + b"\n"
+
+        await reader
+
+    except ClientDisconnect:
+        logger.warning("client disconnected from a stream of messages")
+
+    finally:
+        reader.cancel()
+
+        while not queue.empty():
+            pending = queue.get_nowait()
+
+            if pending is not None:
+                pending.cancel()
+
+    logger.info(
+        "final response from dispatcher to a stream: %d of %d sent",
+        sent,
+        received,
+    )
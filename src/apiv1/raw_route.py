@@ -0,0 +1,54 @@
+"""Module that contains the route class of /messages' raw mode, which hands
+the body of the request straight to the endpoint
+
+FastAPI solves the dependencies of every request before calling the
+endpoint, even though /messages only has the message, which get_message
+parses out of the raw body, and headers. The raw route calls both directly
+and raises the same errors in the same order, so exception_handlers formats
+them as it would
+
+Usage:
+    api.add_api_route(
+        "/messages",
+        messages,
+        methods=["POST"],
+        route_class_override=RawMessagesRoute,
+    )
+"""
+
+from typing import Any, Callable, Coroutine
+
+from fastapi import Request, Response
+from fastapi.dependencies.utils import request_params_to_args
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+from .message_body import get_message
+
+
+class RawMessagesRoute(APIRoute):
+    """Class that routes requests to an endpoint that takes the message of
+    the body as its message argument and headers as the rest, without
+    solving its dependencies. Its OpenAPI schema is the one the endpoint
+    declares"""
+
+    def get_route_handler(
+        self,
+    ) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        header_params = self.dependant.header_params
+        endpoint = self.endpoint
+
+        async def handle(request: Request) -> Response:
+            # The body is validated first, as it's a dependency for FastAPI
+            message = await get_message(request)
+
+            headers, errors = request_params_to_args(
+                header_params, request.headers
+            )
+
+            if errors:
+                raise RequestValidationError(errors)
+
+            return await endpoint(message=message, **headers)
+
+        return handle
@@ -4,10 +4,15 @@ The dev_utils API serves the purpose of providing the information required
 for development operations
 """
 
-from fastapi import APIRouter, status
-from fastapi.responses import JSONResponse
+from dataclasses import asdict
 
+from fastapi import APIRouter, status
+from src.apiv1.jobs import job_queue
+from src.apiv1.message_body import validation_pool
 from src.schemas.dispatcher_responses import HealthSchema
+from src.schemas.message_dto import media_cache
+from src.utils.fast_json import FastJSONResponse
+from src.whatsapp_provider import provider as whatsapp_provider
 
 
 devutils = APIRouter(tags=["dev_utils"])
@@ -16,8 +21,88 @@ devutils = APIRouter(tags=["dev_utils"])
 @devutils.get("/management/health")
 async def health():
     """Endpoint function that handles GET requests to
-    /management/health"""
+    /management/health, the app is DOWN until the pool is warmed up so the
+    orchestrator doesn't send it traffic before"""
+
+    warm_up_stats = whatsapp_provider.get_warm_up_stats()
+    is_warm = whatsapp_provider.is_warm()
+
+    health_data = HealthSchema(
+        status="UP" if is_warm else "DOWN",
+        warmUp=asdict(warm_up_stats) if warm_up_stats else None,
+    ).dict()
+
+    return FastJSONResponse(
+        health_data,
+        status.HTTP_200_OK if is_warm else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
+
+@devutils.get("/management/metrics")
+async def metrics():
+    """Endpoint function that handles GET requests to
+    /management/metrics, pool statistics are null until the pooled client
+    has been created, and so are the per-instance ones, the rate limits, the
+    retries, the DNS cache, the validation pool, the media cache and the
+    job queue if they're off"""
+
+    pool_stats = whatsapp_provider.get_pool_stats()
+    instance_pool_stats = whatsapp_provider.get_instance_pool_stats()
+    rate_limiter_stats = whatsapp_provider.get_rate_limiter_stats()
+    retry_stats = whatsapp_provider.get_retry_stats()
+    dns_stats = whatsapp_provider.get_dns_stats()
+    validation_stats = (
+        validation_pool.get_stats() if validation_pool is not None else None
+    )
+    media_cache_stats = (
+        media_cache.get_stats() if media_cache is not None else None
+    )
+    job_stats = job_queue.get_stats() if job_queue is not None else None
+
+    metrics_data = {
+        "pool": asdict(pool_stats) if pool_stats else None,
+        "instance_pools":
+            asdict(instance_pool_stats) if instance_pool_stats else None,
+        "rate_limits":
+            asdict(rate_limiter_stats) if rate_limiter_stats else None,
+        "retries": asdict(retry_stats) if retry_stats else None,
+        "dns": asdict(dns_stats) if dns_stats else None,
+        "validation": asdict(validation_stats) if validation_stats else None,
+        "media_cache":
+            asdict(media_cache_stats) if media_cache_stats else None,
+        "jobs": asdict(job_stats) if job_stats else None,
+    }
+
+    return FastJSONResponse(metrics_data, status.HTTP_200_OK)
+
+
+@devutils.get("/management/limits")
+async def limits():
+    """Endpoint function that handles GET requests to /management/limits,
+    it responds with the current limits of the concurrency limiters by
+    upstream host and by instance, null if they're off"""
+
+    limiter_stats = whatsapp_provider.get_limiter_stats()
+
+    limits_data = {
+        group: {key: asdict(stats) for key, stats in group_stats.items()}
+        for group, group_stats in limiter_stats.items()
+    } if limiter_stats is not None else None
+
+    return FastJSONResponse(limits_data, status.HTTP_200_OK)
+
+
+@devutils.get("/management/circuits")
+async def circuits():
+    """Endpoint function that handles GET requests to
+    /management/circuits, it responds with the state of the circuit
+    breakers by upstream host and by instance, null if they're off"""
+
+    breaker_stats = whatsapp_provider.get_breaker_stats()
 
-    health_data = HealthSchema(status="UP").dict()
+    circuits_data = {
+        group: {key: asdict(stats) for key, stats in group_stats.items()}
+        for group, group_stats in breaker_stats.items()
+    } if breaker_stats is not None else None
 
-    return JSONResponse(health_data, status.HTTP_200_OK)
+    return FastJSONResponse(circuits_data, status.HTTP_200_OK)
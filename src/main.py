@@ -4,9 +4,14 @@ from fastapi import FastAPI
 
 from src import eureka
 from src.apiv1 import api, exception_handlers
+from src.apiv1.body_limit import BodyLimitMiddleware
+from src.apiv1.jobs import job_queue
+from src.apiv1.message_body import validation_pool
 from src.devutils import devutils
 from src.env_variables import env_variables
 from src.schemas.env import EnvSchema
+from src.utils.fast_json import FastJSONResponse
+from src.whatsapp_provider import provider as whatsapp_provider
 
 
 def setup_eureka(env_variables_instance: EnvSchema):
@@ -25,9 +30,58 @@ Python integration with ChatAPI and Beplic Core, developed and being\
 maintained by Facundo Padilla and Martin Nieva\
 ",
     version="Version 0.1",
+    default_response_class=FastJSONResponse,
 )
 
 exception_handlers.configure(app)
 
+app.add_middleware(
+    BodyLimitMiddleware,
+    limits=env_variables.BODY_LIMITS,
+    default_limit=env_variables.BODY_LIMIT,
+)
+
 app.include_router(api)
 app.include_router(devutils)
+
+
+@app.on_event("startup")
+async def start_whatsapp_provider():
+    """Startup hook that creates the pooled client of the provider and
+    starts warming it up"""
+
+    whatsapp_provider.start()
+    whatsapp_provider.start_warm_up()
+
+
+@app.on_event("startup")
+def start_job_queue():
+    """Startup hook that starts the workers that send the messages queued
+    in the background"""
+
+    if job_queue is not None:
+        job_queue.start()
+
+
+@app.on_event("shutdown")
+async def close_job_queue():
+    """Shutdown hook that gives the queued messages a while to be sent and
+    stops the workers, before the provider is closed"""
+
+    if job_queue is not None:
+        await job_queue.close(env_variables.JOB_DRAIN_TIMEOUT)
+
+
+@app.on_event("shutdown")
+async def close_whatsapp_provider():
+    """Shutdown hook that closes the pooled client of the provider"""
+
+    await whatsapp_provider.close()
+
+
+@app.on_event("shutdown")
+def close_validation_pool():
+    """Shutdown hook that shuts the workers of the validation pool down"""
+
+    if validation_pool is not None:
+        validation_pool.close()
@@ -0,0 +1,37 @@
+"""Module that contains the BatchDTO schema, the messages sent together to
+/messages:batch"""
+
+from typing import List
+
+# pylint: disable-next=no-name-in-module
+from pydantic import BaseModel, Field
+
+from src.env_variables import env_variables
+from src.schemas import message_dto
+from src.utils.type_aliases import JsonDict
+
+
+# pylint: disable-next=too-few-public-methods
+class BatchDTO(BaseModel):
+    """BatchDTO schema class
+
+    Only the list is validated by it, every message in it is validated on
+    its own as a MessageDTO, so an invalid one doesn't fail the others"""
+
+    messages: List[JsonDict] = Field(
+        default=...,
+        min_items=1,
+        max_items=env_variables.BATCH_MAX_MESSAGES,
+        title="Messages",
+        description="\
+The messages to send, each as the body of a request to /messages",
+    )
+
+
+batch_template = {
+    "messages": [
+        message_dto.text_template,
+        message_dto.image_template,
+        message_dto.audio_template,
+    ],
+}
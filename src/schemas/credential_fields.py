@@ -0,0 +1,43 @@
+"""Module that contains the fields of the recipient and the Chat API
+credentials every message is sent with, shared by MessageDTO and UploadDTO
+
+They're made by functions instead of a base schema class, so each schema
+keeps them where it declares them, as pydantic puts the fields of base
+classes first"""
+
+from typing import Any
+
+# pylint: disable-next=no-name-in-module
+from pydantic import Field
+
+
+def phone_field() -> Any:
+    """Function that makes the field of the phone number"""
+
+    return Field(
+        default=...,
+        title="Phone number",
+        description="The phone number that must be in international format",
+    )
+
+
+def token_field() -> Any:
+    """Function that makes the field of the message sender token"""
+
+    return Field(
+        default=...,
+        title="Message sender token",
+        description="\
+The message sender token that is gonna be used for credentials",
+    )
+
+
+def instance_field() -> Any:
+    """Function that makes the field of the message instance id"""
+
+    return Field(
+        default=...,
+        title="Message instance id",
+        description="\
+The message instance id that is gonna be used for credentials",
+    )
@@ -1,7 +1,7 @@
 """Module that contains the schemas that represent the
 responses of the dispatcher"""
 
-from typing import Optional
+from typing import Optional, Dict, Any, List
 
 # pylint: disable-next=no-name-in-module
 from pydantic import BaseModel, StrictStr, validator
@@ -27,12 +27,38 @@ class SentMessageResponseSchema(BaseModel):
     id: Optional[str] = None
 
 
+# pylint: disable-next=too-few-public-methods
+class BatchResponseSchema(BaseModel):
+    """Schema class of the response from /messages:batch endpoint to a POST
+    request
+
+    results has the response to each message, in the order they were sent
+    in. Invalid messages aren't sent, their errorMessage tells why"""
+
+    results: List[SentMessageResponseSchema]
+
+
+# pylint: disable-next=too-few-public-methods
+class MessageJobSchema(BaseModel):
+    """Schema class of the response from /messages endpoint to a POST
+    request that prefers to be responded asynchronously, and from
+    /messages/{job_id} while its message isn't sent yet
+
+    status is either queued or running"""
+
+    jobId: str
+    status: str
+
+
 # pylint: disable-next=too-few-public-methods
 class HealthSchema(BaseModel):
     """Schema class of the response from /management/health endpoint to a
-    GET request"""
+    GET request
+
+    warmUp is the progress of the warm-up of the pool, null if it's off"""
 
     status: str
+    warmUp: Optional[Dict[str, Any]] = None
 
     @validator("status")
     def check_up_or_down(cls, value):
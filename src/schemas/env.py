@@ -1,9 +1,18 @@
 """Module that contains the EnvSchema and plenty of templates for it"""
 
-from typing import Optional, Union, NoReturn
+import json
+from typing import Optional, Union, NoReturn, Literal, Dict, Any
 
 # pylint: disable-next=no-name-in-module
-from pydantic import BaseModel, validator, HttpUrl
+from pydantic import (
+    BaseModel,
+    validator,
+    HttpUrl,
+    PositiveInt,
+    PositiveFloat,
+    NonNegativeInt,
+    confloat,
+)
 
 from src.utils.type_aliases import JsonDict, NonEmpty, Phone
 from src.utils import errors
@@ -49,6 +58,99 @@ class EnvSchema(BaseModel):
     EUREKA_AUTH_PASSWORD: Optional[NonEmpty] = None
     EUREKA_CONTEXT: Optional[NonEmpty] = None
 
+    HTTP_MAX_CONNECTIONS: PositiveInt = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: PositiveInt = 20
+    HTTP_KEEPALIVE_EXPIRY: PositiveFloat = 5.0
+    HTTP2: bool = False
+
+    DNS_CACHE: bool = True
+    WARM_UP_CONNECTIONS: NonNegativeInt = 0
+    WARM_UP_TIMEOUT: PositiveFloat = 10.0
+
+    STREAM_MEDIA: bool = True
+
+    VALIDATION_OFFLOAD: bool = True
+    VALIDATION_OFFLOAD_THRESHOLD: NonNegativeInt = 32768
+    VALIDATION_WORKERS: PositiveInt = 4
+    VALIDATION_EXECUTOR: Literal["thread", "process"] = "thread"
+    VALIDATION_ENGINE: Literal["pydantic", "compiled"] = "pydantic"
+    MESSAGES_ROUTE: Literal["fastapi", "raw"] = "fastapi"
+    MEDIA_CACHE_SIZE: NonNegativeInt = 1024
+
+    SPOOL_THRESHOLD: Optional[PositiveInt] = 65536
+    BODY_LIMIT: Optional[PositiveInt] = 1048576
+    BODY_LIMITS: Dict[str, Dict[str, Optional[PositiveInt]]] = {
+        "/v1/messages": {
+            "application/json": 524288,
+            "multipart/form-data": 131072,
+        },
+        "/v1/messages:batch": {"application/json": 16777216},
+        "/v1/messages:stream": {"application/x-ndjson": None},
+    }
+
+    UPLOAD_MAX_SIZES: Dict[
+        Literal["image", "video", "document", "audio"], PositiveInt
+    ] = {"image": 112500, "video": 112500, "document": 112500, "audio": 7500}
+
+    BATCH_MAX_MESSAGES: PositiveInt = 100
+    BATCH_CONCURRENCY: PositiveInt = 10
+    STREAM_MAX_RECORD_SIZE: PositiveInt = 524288
+    STREAM_CONCURRENCY: PositiveInt = 10
+
+    ASYNC_JOBS: bool = True
+    JOB_QUEUE_SIZE: PositiveInt = 1000
+    JOB_WORKERS: PositiveInt = 10
+    JOB_RESULTS_SIZE: PositiveInt = 10000
+    JOB_RESULTS_TTL: PositiveFloat = 600.0
+    JOB_DRAIN_TIMEOUT: PositiveFloat = 10.0
+
+    HTTP_CONNECT_TIMEOUT: PositiveFloat = 5.0
+    HTTP_READ_TIMEOUT: PositiveFloat = 15.0
+    HTTP_WRITE_TIMEOUT: PositiveFloat = 15.0
+    HTTP_POOL_TIMEOUT: PositiveFloat = 5.0
+    ACTION_TIMEOUTS: Dict[
+        Literal["sendMessage", "sendFile", "sendPTT"],
+        Dict[Literal["connect", "read", "write", "pool"], PositiveFloat]
+    ] = {
+        "sendFile": {"read": 60.0, "write": 60.0},
+        "sendPTT": {"read": 60.0, "write": 60.0},
+    }
+
+    INSTANCE_POOLS: bool = False
+    INSTANCE_POOL_MAX_CLIENTS: PositiveInt = 1000
+    INSTANCE_POOL_IDLE_TTL: PositiveFloat = 60.0
+    INSTANCE_POOL_MAX_CONNECTIONS: PositiveInt = 10
+    INSTANCE_POOL_MAX_KEEPALIVE_CONNECTIONS: PositiveInt = 2
+
+    CONCURRENCY_LIMITS: bool = True
+    HOST_CONCURRENCY_LIMIT: PositiveInt = 20
+    HOST_CONCURRENCY_MAX_LIMIT: PositiveInt = 200
+    INSTANCE_CONCURRENCY_LIMIT: PositiveInt = 4
+    INSTANCE_CONCURRENCY_MAX_LIMIT: PositiveInt = 20
+    CONCURRENCY_ACQUIRE_TIMEOUT: PositiveFloat = 5.0
+
+    RATE_LIMIT_PER_SECOND: Optional[PositiveFloat] = None
+    RATE_LIMIT_BURST: PositiveInt = 5
+    RATE_LIMIT_QUEUE_SIZE: PositiveInt = 100
+    RATE_LIMIT_MAX_WAIT: PositiveFloat = 10.0
+    RATE_LIMIT_KEY: Literal["instance", "token"] = "instance"
+
+    RETRY_MAX_ATTEMPTS: PositiveInt = 3
+    RETRY_BASE_DELAY: PositiveFloat = 0.1
+    RETRY_MAX_DELAY: PositiveFloat = 2.0
+    RETRY_BUDGET_RATIO: PositiveFloat = 0.2
+    RETRY_BUDGET_MIN_RETRIES: PositiveInt = 10
+
+    CIRCUIT_BREAKERS: bool = True
+    CIRCUIT_WINDOW_SIZE: PositiveInt = 20
+    CIRCUIT_MIN_REQUESTS: PositiveInt = 10
+    CIRCUIT_ERROR_RATE: confloat(gt=0, le=1) = 0.5  # type: ignore
+    CIRCUIT_SLOW_CALL_LATENCY: PositiveFloat = 5.0
+    CIRCUIT_SLOW_CALL_RATE: confloat(gt=0, le=1) = 0.8  # type: ignore
+    CIRCUIT_OPEN_DURATION: PositiveFloat = 30.0
+    CIRCUIT_PROBE_INTERVAL: PositiveFloat = 5.0
+    CIRCUIT_PROBE_SUCCESSES: PositiveInt = 2
+
     PROD: bool
 
     @validator("PROD", pre=True)
@@ -64,6 +166,34 @@ class EnvSchema(BaseModel):
 
         return value
 
+    @validator(
+        "RATE_LIMIT_PER_SECOND", "BODY_LIMIT", "SPOOL_THRESHOLD", pre=True
+    )
+    def check_empty_is_none(cls, value: Optional[str]) -> Optional[str]:
+        # pylint: disable=no-self-argument
+        # pylint: disable=no-self-use
+
+        """Validator function that takes optional variables left empty in
+        the .env file as not set"""
+
+        if value == "":
+            return None
+
+        return value
+
+    @validator("ACTION_TIMEOUTS", "BODY_LIMITS", pre=True)
+    def parse_json(cls, value: Any) -> Any:
+        # pylint: disable=no-self-argument
+        # pylint: disable=no-self-use
+
+        """Validator function that parses variables set as JSON in the
+        .env file, an empty one is taken as an empty object"""
+
+        if not isinstance(value, str):
+            return value
+
+        return json.loads(value) if value.strip() else {}
+
     @validator("PROD")
     def check_eureka_variables(
         cls, value: bool, values: JsonDict
@@ -1,13 +1,16 @@
 """Module that contains the MessageDTO schema along with plenty of templates"""
 
 import os
+from enum import Enum
 from typing import Optional, Union, NoReturn, Dict, Any, ClassVar, Tuple
 from urllib.parse import urlparse, unquote
-from mimetypes import guess_extension
 
 # pylint: disable-next=no-name-in-module
 from pydantic import BaseModel, HttpUrl, root_validator, Field, validator
 
+from src.schemas.credential_fields import (
+    instance_field, phone_field, token_field
+)
 from src.utils.type_aliases import (
     Phone,
     JsonDict,
@@ -20,6 +23,9 @@ from src.utils.type_aliases import (
 )
 
 from src.utils import errors, file_examples
+from src.utils.extensions import guess_extension
+from src.utils.media_cache import MediaCache, MediaInfo, MediaValue
+from src.utils.spooled_json import SpooledString
 from src.env_variables import env_variables
 
 
@@ -28,6 +34,31 @@ Image = Union[Base64Image, HttpUrl]
 Video = Union[Base64Video, HttpUrl]
 Document = Union[Base64Document, HttpUrl]
 
+
+class MessageKind(str, Enum):
+    """Enum class that represents the kinds of messages, each is sent to
+    the action its provider routes it to"""
+
+    IMAGE = "image"
+    VIDEO = "video"
+    DOCUMENT = "document"
+    TEXT = "text"
+    AUDIO = "audio"
+
+
+# The kinds along with their fields, in the order they're looked at
+MESSAGE_KINDS = tuple(MessageKind)
+KIND_FIELDS = tuple((kind.value, kind) for kind in MESSAGE_KINDS)
+
+# Key of the validated values the kind is resolved into, it's taken out of
+# them into the message's _kind, so it isn't a field
+KIND_KEY = "__kind__"
+
+media_cache = (
+    MediaCache(env_variables.MEDIA_CACHE_SIZE)
+    if env_variables.MEDIA_CACHE_SIZE else None
+)
+
 # NIEVATODO: Move these examples' definitions somewhere else
 required_template = {
     "instance": env_variables.TEST_INSTANCE,
@@ -103,20 +134,25 @@ https://filesamples.com/samples/document/odt/sample3.odt",
 }
 
 
-def get_filename_from_base64(base64_string: str) -> Optional[str]:
-    """Function that gets a filename from a base64 string
-
-    It gets the string between 'data:' and until the ';' to pass it to
-    the guess_extension function. In case the guess_extension returns None,
-    it's not a valid mimetype and hence this function returns None
-    """
+def get_mimetype_from_base64(base64_string: str) -> str:
+    """Function that gets the string between 'data:' and until the ';' of a
+    base64 string, which is its mimetype"""
 
     len_first_base64_chars = len("data:")
     where_does_finish_mimetype = base64_string.find(";")
 
-    mimetype = base64_string[len_first_base64_chars:where_does_finish_mimetype]
+    return base64_string[len_first_base64_chars:where_does_finish_mimetype]
+
+
+def get_filename_from_base64(base64_string: str) -> Optional[str]:
+    """Function that gets a filename from a base64 string
+
+    It gets the mimetype of the string to look its extension up in the
+    index of extensions. In case guess_extension returns None, it's not a
+    valid mimetype and hence this function returns None
+    """
 
-    extension = guess_extension(mimetype)
+    extension = guess_extension(get_mimetype_from_base64(base64_string))
 
     if extension:
         return f"noname{extension}"
@@ -157,6 +193,14 @@ class MessageDTO(BaseModel):
         "image", "video", "text", "audio", "document"
     )
 
+    # The media type each media field is validated as
+    media_kinds: ClassVar[Dict[str, Optional[str]]] = {
+        "image": Base64Image.media_type,
+        "video": Base64Video.media_type,
+        "document": Base64Document.media_type,
+        "audio": Base64Audio.media_type,
+    }
+
     image: Optional[Image] = Field(
         default=None, title="Image file", description="\
 The image in HTTP URL or Base64"
@@ -183,25 +227,11 @@ The document in HTTP URL or Base64"
 The audio in HTTP URL or Base64. It must be in OGG Opus format!",
     )
 
-    phone: Phone = Field(
-        default=...,
-        title="Phone number",
-        description="The phone number that must be in international format",
-    )
+    phone: Phone = phone_field()
 
-    token: NonEmpty = Field(
-        default=...,
-        title="Message sender token",
-        description="\
-The message sender token that is gonna be used for credentials",
-    )
+    token: NonEmpty = token_field()
 
-    instance: NonEmpty = Field(
-        default=...,
-        title="Message instance id",
-        description="\
-The message instance id that is gonna be used for credentials",
-    )
+    instance: NonEmpty = instance_field()
 
     filename: Optional[str] = Field(
         default=None,
@@ -211,6 +241,20 @@ This is the filename of the resource sent. Do not set, as it'll be ignored,\
  since this is an auto-defined value on validation",
     )
 
+    _kind: MessageKind
+
+    def __init__(self, **data: Any):
+        super().__init__(**data)
+
+        self._kind = self.__dict__.pop(KIND_KEY)
+
+    @property
+    def kind(self) -> MessageKind:
+        """Property that returns the kind of the message, the one resolve_kind
+        resolved on validation"""
+
+        return self._kind
+
     @root_validator(pre=True)
     def check_only_one(
         cls, values: JsonDict
@@ -273,6 +317,28 @@ This is the filename of the resource sent. Do not set, as it'll be ignored,\
             values=tuple(the_fields.values())
         )
 
+    @root_validator(pre=True)
+    def look_up_media_cache(cls, values: JsonDict) -> JsonDict:
+        # pylint: disable=no-self-argument
+        # pylint: disable=no-self-use
+
+        """Validator function that looks the base64 media fields up in the
+        media cache, the ones it already validated aren't validated again"""
+
+        if media_cache is None:
+            return values
+
+        # The caller's dict is left as it is
+        values = {**values}
+
+        for field, kind in cls.media_kinds.items():
+            value = values.get(field)
+
+            if isinstance(value, str) and value.startswith("data:"):
+                values[field] = media_cache.wrap(kind, value)
+
+        return values
+
     @validator("filename", always=True)
     def check_valid_filename(cls, _, values: Dict[str, Any]):
         # pylint: disable=no-self-argument
@@ -296,6 +362,13 @@ This is the filename of the resource sent. Do not set, as it'll be ignored,\
         if isinstance(to_parse, HttpUrl):
             filename = get_filename_from_url(str(to_parse))
 
+        elif isinstance(to_parse, MediaValue) and to_parse.info is not None:
+            filename = to_parse.info.filename
+
+        # Only the compiled validator takes them
+        elif isinstance(to_parse, SpooledString):
+            filename = get_filename_from_base64(to_parse.header)
+
         elif isinstance(to_parse, str):
             filename = get_filename_from_base64(to_parse)
 
@@ -303,3 +376,52 @@ This is the filename of the resource sent. Do not set, as it'll be ignored,\
             raise errors.BadFilenameNotRecognizedError
 
         return filename
+
+    @root_validator(skip_on_failure=True)
+    def resolve_kind(cls, values: JsonDict) -> JsonDict:
+        # pylint: disable=no-self-argument
+        # pylint: disable=no-self-use
+
+        """Validator function that resolves the kind of the message once, the
+        one of its content fields that's set, as validation leaves only one,
+        so it isn't worked out again every time it's dispatched"""
+
+        for field, kind in KIND_FIELDS:
+            if values.get(field):
+                values[KIND_KEY] = kind
+
+                return values
+
+        raise errors.AtLeastOneOfThemError(
+            at_least=cls.at_least_fields,
+            values=tuple(values.get(field) for field in cls.at_least_fields),
+        )
+
+    @root_validator(skip_on_failure=True)
+    def put_media_cache(cls, values: JsonDict) -> JsonDict:
+        # pylint: disable=no-self-argument
+        # pylint: disable=no-self-use
+
+        """Validator function that caches the base64 media fields that were
+        validated for the first time, along with their filename"""
+
+        if media_cache is None:
+            return values
+
+        for field, kind in cls.media_kinds.items():
+            value = values.get(field)
+
+            if isinstance(value, MediaValue) and value.info is None:
+                media_cache.put(
+                    value,
+                    MediaInfo(
+                        kind=kind,
+                        mimetype=get_mimetype_from_base64(value),
+                        filename=(
+                            values.get("filename")
+                            if field != "audio" else None
+                        ),
+                    ),
+                )
+
+        return values
@@ -0,0 +1,292 @@
+"""Module that contains the compiled validator of MessageDTO, which validates
+a raw message in a single pass instead of pydantic's several
+
+pydantic rebuilds a dict of the media fields in each pre root validator,
+then validates every field, populated or not, and each media against both
+types of its Union. The compiled validator resolves the kind of the message
+while checking that it's the only one set, then validates the payload of
+that kind and the credentials with checks compiled from the model's types,
+and derives the filename
+
+It only ever accepts the messages the model accepts, into the same values.
+The messages it doesn't accept are validated by the model, so invalid
+messages get the very same errors
+
+It's also the only one that takes the SpooledString of a spooled body as
+base64 media, whose data it checks reading them from the spool file
+
+Usage:
+    from src.schemas.message_validator import message_validator
+
+    message = message_validator.parse_obj(data)
+"""
+
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+# pylint: disable-next=no-name-in-module
+from pydantic import AnyUrl, BaseConfig, ConstrainedStr
+# pylint: disable-next=no-name-in-module
+from pydantic.fields import ModelField
+
+from src.schemas import message_dto
+from src.schemas.message_dto import KIND_KEY, MessageDTO
+from src.utils.spooled_json import SpooledString, is_spooled_base64_data_uri
+from src.utils.type_aliases import JsonDict
+
+
+# Returns the validated value, raises ValueError if it isn't valid
+Check = Callable[[Any], Any]
+
+
+def compile_str_check(
+    type_: Type[ConstrainedStr], config: Type[BaseConfig]
+) -> Optional[Check]:
+    """Function that compiles the validators of a constrained string type
+    into a single check, or returns None if the type transforms its values
+    before validating their length"""
+
+    if (
+        type_.strip_whitespace or
+        getattr(type_, "to_lower", False) or
+        getattr(type_, "to_upper", False)
+    ):
+        return None
+
+    min_length = (
+        type_.min_length if type_.min_length is not None
+        else config.min_anystr_length
+    ) or 0
+    max_length = (
+        type_.max_length if type_.max_length is not None
+        else config.max_anystr_length
+    )
+
+    def check(value: Any) -> Any:
+        # Both str_validator and strict_str_validator take a str as it is
+        if not isinstance(value, str) or isinstance(value, Enum):
+            raise ValueError(value)
+
+        if len(value) < min_length or (
+            max_length is not None and len(value) > max_length
+        ):
+            raise ValueError(value)
+
+        return type_.validate(value)
+
+    return check
+
+
+def compile_spooled_check(
+    type_: Type[ConstrainedStr], config: Type[BaseConfig]
+) -> Check:
+    """Function that compiles the validators of a base64 type into a single
+    check of spooled strings"""
+
+    min_length = (
+        type_.min_length if type_.min_length is not None
+        else config.min_anystr_length
+    ) or 0
+    max_length = (
+        type_.max_length if type_.max_length is not None
+        else config.max_anystr_length
+    )
+    media_type = getattr(type_, "media_type", None)
+
+    def check(value: SpooledString) -> SpooledString:
+        if len(value) < min_length or (
+            max_length is not None and len(value) > max_length
+        ):
+            raise ValueError(value)
+
+        if not is_spooled_base64_data_uri(value, media_type):
+            raise ValueError(value)
+
+        return value
+
+    return check
+
+
+def compile_field_check(
+    field: ModelField, model: Type[MessageDTO]
+) -> Check:
+    """Function that compiles the check of a field without class validators
+
+    A Union of a base64 type and a URL type only checks the type the value
+    can be, the base64 type never takes anything but data URIs. Other types
+    are checked by the field itself"""
+
+    def check_field(value: Any) -> Any:
+        validated, error = field.validate(value, {}, loc=field.name, cls=model)
+
+        if error:
+            raise ValueError(value)
+
+        return validated
+
+    if field.sub_fields is None:
+        if issubclass(field.type_, ConstrainedStr):
+            return compile_str_check(
+                field.type_, model.__config__
+            ) or check_field
+
+        return check_field
+
+    if len(field.sub_fields) != 2:
+        return check_field
+
+    base64_field, url_field = field.sub_fields
+
+    if not (
+        issubclass(base64_field.type_, ConstrainedStr) and
+        issubclass(url_field.type_, AnyUrl)
+    ):
+        return check_field
+
+    check_base64 = compile_str_check(base64_field.type_, model.__config__)
+    check_spooled = compile_spooled_check(
+        base64_field.type_, model.__config__
+    )
+    check_url = compile_field_check(url_field, model)
+
+    if check_base64 is None:
+        return check_field
+
+    kind = model.media_kinds.get(field.name)
+
+    def check_media(value: Any) -> Any:
+        if isinstance(value, SpooledString):
+            return check_spooled(value)
+
+        if not isinstance(value, str) or not value.startswith("data:"):
+            return check_url(value)
+
+        if message_dto.media_cache is not None:
+            value = message_dto.media_cache.wrap(kind, value)
+
+        return check_base64(value)
+
+    return check_media
+
+
+class MessageValidator:
+    """Class that validates raw messages into a model like MessageDTO in a
+    single pass, and falls back to the model for the messages it doesn't
+    accept"""
+
+    def __init__(self, model: Type[MessageDTO] = MessageDTO):
+        self.model = model
+
+        # Exactly one of them must be set, which is the kind of the message
+        self.kinds = tuple(dict.fromkeys((
+            *model.at_least_fields,
+            *(field for fields in model.incompatible_fields
+              for field in fields),
+        )))
+
+        # Fields with class validators depend on the ones before them, so
+        # they're validated by the field itself, with them
+        self.checks: Tuple[Tuple[str, ModelField, Optional[Check]], ...] = (
+            tuple(
+                (
+                    name,
+                    field,
+                    None if field.class_validators
+                    else compile_field_check(field, model),
+                )
+                for name, field in model.__fields__.items()
+            )
+        )
+
+    def resolve_kind(self, data: JsonDict) -> Optional[str]:
+        """Method that returns which of the kinds of message is the only one
+        set in a message, or None if it isn't exactly one"""
+
+        kind = None
+
+        for field in self.kinds:
+            if data.get(field) is not None:
+                if kind is not None:
+                    return None
+
+                kind = field
+
+        if kind not in self.model.at_least_fields:
+            return None
+
+        return kind
+
+    def validate(self, data: Any) -> Optional[JsonDict]:
+        """Method that validates a raw message in a single pass, and returns
+        the values of its fields, or None if it doesn't accept it"""
+
+        if not isinstance(data, dict) or self.resolve_kind(data) is None:
+            return None
+
+        values: Dict[str, Any] = {}
+
+        for name, field, check in self.checks:
+            value = data.get(name)
+
+            if check is None:
+                value, error = field.validate(
+                    value, values, loc=name, cls=self.model
+                )
+
+                if error:
+                    return None
+
+            elif value is None:
+                if field.required:
+                    return None
+
+            else:
+                try:
+                    value = check(value)
+
+                except (ValueError, TypeError, AssertionError):
+                    return None
+
+            values[name] = value
+
+        try:
+            return self.model.put_media_cache(self.model.resolve_kind(values))
+
+        except (ValueError, TypeError, AssertionError):
+            return None
+
+    def parse_obj(self, data: Any) -> MessageDTO:
+        """Method that validates a raw message into the model, it raises
+        pydantic's ValidationError if the message is invalid"""
+
+        values = self.validate(data)
+
+        if values is None:
+            return self.model.parse_obj(data)
+
+        return self.make_message(data, values)
+
+    def make_message(self, data: JsonDict, values: JsonDict) -> MessageDTO:
+        """Method that makes an instance of the model out of the values it
+        validated a raw message into"""
+
+        message = self.model.__new__(self.model)
+        values = {**values}
+        kind = values.pop(KIND_KEY)
+
+        # As BaseModel.__init__ and MessageDTO.__init__ do once the data is
+        # validated
+        object.__setattr__(message, "__dict__", values)
+        object.__setattr__(
+            message,
+            "__fields_set__",
+            {name for name in self.model.__fields__ if name in data},
+        )
+        # pylint: disable=protected-access
+        message._init_private_attributes()
+        message._kind = kind
+
+        return message
+
+
+message_validator = MessageValidator()
@@ -0,0 +1,140 @@
+"""Module that contains the UploadDTO schema, the media messages sent to
+/messages as multipart/form-data, with the file uploaded as it is instead of
+in base64"""
+
+import os
+from typing import Any, Dict, Literal, Optional
+
+from fastapi import UploadFile
+# pylint: disable-next=no-name-in-module
+from pydantic import BaseModel, Field, validator
+
+from src.env_variables import env_variables
+from src.schemas.credential_fields import (
+    instance_field, phone_field, token_field
+)
+from src.schemas.message_dto import MessageDTO, MessageKind
+from src.utils import errors
+from src.utils.extensions import guess_extension
+from src.utils.file_signatures import SNIFF_SIZE, detect_mimetype
+from src.utils.type_aliases import NonEmpty, Phone
+
+
+Kind = Literal["image", "video", "document", "audio"]
+
+# The kind of message each media type is sent as, e.g. application files are
+# sent as documents
+MEDIA_TYPE_KINDS: Dict[Optional[str], str] = {
+    media_type: kind for kind, media_type in MessageDTO.media_kinds.items()
+}
+
+
+class MediaFile(UploadFile):
+    """Type for schema classes uploaded file fields, documented as binary
+    strings as OpenAPI describes files in multipart/form-data bodies"""
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]):
+        field_schema.update(type="string", format="binary")
+
+
+class UploadDTO(BaseModel):
+    """UploadDTO schema class"""
+
+    phone: Phone = phone_field()
+
+    token: NonEmpty = token_field()
+
+    instance: NonEmpty = instance_field()
+
+    file: MediaFile = Field(
+        default=...,
+        title="Media file",
+        description="The image, video, document or audio file, as it is",
+    )
+
+    kind: Optional[Kind] = Field(
+        default=None,
+        title="Kind of media",
+        description="\
+The kind of media the file is sent as, it's told from its mimetype if not set",
+    )
+
+    mimetype: Optional[str] = Field(
+        default=None,
+        title="Mimetype of the file",
+        description="\
+Do not set, as it'll be ignored, since it's detected from the file's content\
+ on validation, or taken from its Content-Type if it's a container that\
+ could be several formats",
+    )
+
+    filename: Optional[str] = Field(
+        default=None,
+        title="Filename of the resource sent",
+        description="\
+Do not set, as it'll be ignored, since this is an auto-defined value on\
+ validation",
+    )
+
+    @validator("mimetype", always=True)
+    def detect_file_mimetype(cls, _, values: Dict[str, Any]):
+        # pylint: disable=no-self-argument
+        # pylint: disable=no-self-use
+
+        """Validator function that detects the mimetype of the file from its
+        first bytes, checks that it can be sent as the kind of media given,
+        sets the kind if it wasn't and checks that the file isn't larger
+        than the limit of uploads of that kind"""
+
+        file = values.get("file")
+
+        if file is None:
+            return None
+
+        # Only its first bytes are read, from the spool file
+        header = file.file.read(SNIFF_SIZE)
+        file.file.seek(0)
+
+        mimetype = detect_mimetype(header, file.content_type)
+
+        if not mimetype or not guess_extension(mimetype):
+            raise errors.BadMimetypeNotRecognizedError
+
+        expected_kind = values.get("kind")
+        kind = MEDIA_TYPE_KINDS.get(mimetype.partition("/")[0])
+
+        if kind is None or expected_kind not in (None, kind):
+            raise errors.BadMimetypeForKindError(
+                mimetype=mimetype, kind=expected_kind or "any kind of media"
+            )
+
+        values["kind"] = MessageKind(kind)
+
+        limit = env_variables.UPLOAD_MAX_SIZES.get(kind)
+
+        # It's measured in its spool file
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+        file.file.seek(0)
+
+        if limit is not None and size > limit:
+            raise errors.FileTooLargeError(limit=limit)
+
+        return mimetype
+
+    @validator("filename", always=True)
+    def check_valid_filename(cls, _, values: Dict[str, Any]):
+        # pylint: disable=no-self-argument
+        # pylint: disable=no-self-use
+
+        """Validator function that sets the filename of the file from its
+        mimetype, as MessageDTO does for base64 files. Audios are sent
+        without one"""
+
+        mimetype = values.get("mimetype")
+
+        if mimetype is None or values.get("kind") == "audio":
+            return None
+
+        return f"noname{guess_extension(mimetype)}"
@@ -0,0 +1,29 @@
+"""Module that contains helpers shared by the tests"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List
+
+from src.utils import errors
+from src.utils.type_aliases import JsonDict
+
+
+def counting_send(in_flight: List[int]) -> Callable[..., Awaitable[JsonDict]]:
+    """Helper function that returns a fake provider send that takes a while
+    to send a message, keeps the sends in flight in in_flight[0] and the
+    most there were at once in in_flight[1], and fails the messages whose
+    text is "fail" """
+
+    async def send_message(message: Any, _: Any) -> JsonDict:
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+
+        await asyncio.sleep(0.01)
+
+        in_flight[0] -= 1
+
+        if message.text == "fail":
+            raise errors.UpstreamConnectionError
+
+        return {"success": True, "errorMessage": None, "id": message.text}
+
+    return send_message
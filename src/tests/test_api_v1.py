@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+import base64
 import json
-from typing import Tuple
+from typing import Any, List, Tuple
 from unittest import TestCase
 from unittest import mock
 
@@ -12,6 +13,7 @@ from fastapi.testclient import TestClient
 from pydantic import ValidationError
 from httpx import Response
 from requests import models
+from src.apiv1 import message_body
 from src.schemas import message_dto
 
 from src.utils import (
@@ -19,6 +21,7 @@ from src.utils import (
     type_aliases,
     errors
 )
+from src.env_variables import env_variables
 from src.main import app
 from src.schemas.dispatcher_responses import SentMessageResponseSchema
 
@@ -779,3 +782,218 @@ class TestApiV1(TestCase):
                 ]
             ),
         )
+
+    @mock.patch("src.whatsapp_provider.provider.send")
+    def test_v1_messages_request_timeout(self, send: mock.MagicMock):
+        """Test function that checks that X-Request-Timeout is turned into
+        the deadline of the send, and that a 422 is returned if it's bad"""
+
+        send.return_value = {"success": True, "errorMessage": None, "id": "a"}
+
+        response = client.post(
+            "/v1/messages",
+            json=message_dto.text_template,
+            headers={"X-Request-Timeout": "2.5"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(send.call_args.args[1])
+
+        response = client.post(
+            "/v1/messages",
+            json=message_dto.text_template,
+            headers={"X-Request-Timeout": "-1"},
+        )
+
+        self.assertEqual(response.status_code, 422)
+
+    def test_v1_messages_bad_body(self):
+        """Test function that checks that bodies that aren't JSON, or are
+        missing, are rejected just like FastAPI rejects them"""
+
+        for content in (b"", b"{asd"):
+            response = client.post(
+                "/v1/messages",
+                data=content,
+                headers={"Content-Type": "application/json"},
+            )
+
+            self.assertEqual(response.status_code, 422)
+            self.assertFalse(response.json()["success"])
+            self.assertIn("body", response.json()["errorMessage"])
+
+    @mock.patch("httpx.AsyncClient.post")
+    def test_v1_messages_upload(self, async_client_post: mock.AsyncMock):
+        """Test function that checks that media uploaded as
+        multipart/form-data are sent to Chat API in the very same body as
+        when they're sent in base64"""
+
+        bodies: List[bytes] = []
+
+        async def post(**kwargs: Any) -> Response:
+            bodies.append(b"".join([
+                chunk async for chunk in kwargs["content"]
+            ]))
+
+            return Response(status_code=200, json={"sent": True, "id": "a"})
+
+        async_client_post.side_effect = post
+
+        for field, data_uri in (
+            ("image", message_dto.image_template_base64["image"]),
+            ("document", message_dto.file_examples.base64_document_pdf),
+            ("document", message_dto.file_examples.base64_document_docx),
+        ):
+            # The image example isn't a JPEG, but a PNG
+            data_uri = data_uri.replace("image/jpeg", "image/png")
+
+            response = client.post(
+                "/v1/messages",
+                json={**message_dto.required_template, field: data_uri},
+            )
+
+            self.assertEqual(response.status_code, 200)
+
+            response = client.post(
+                "/v1/messages",
+                data={**message_dto.required_template, "kind": field},
+                files={
+                    "file": (
+                        "asd",
+                        base64.b64decode(data_uri.partition(",")[2]),
+                        "application/octet-stream",
+                    )
+                },
+            )
+
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(data_uri.encode("ascii"), bodies[-1])
+            self.assertEqual(bodies[-1], bodies[-2])
+
+    @mock.patch("httpx.AsyncClient.post")
+    def test_v1_messages_spooled(self, async_client_post: mock.AsyncMock):
+        """Test function that checks that bodies spooled to a file are sent
+        to Chat API, and rejected, just like the ones read whole, that
+        they're validated in the validation pool and that the file is
+        closed once the message is sent"""
+
+        bodies: List[bytes] = []
+        closed: List[bool] = []
+
+        async def post(**kwargs: Any) -> Response:
+            bodies.append(b"".join([
+                chunk async for chunk in kwargs["content"]
+            ]))
+
+            return Response(status_code=200, json={"sent": True, "id": "a"})
+
+        async def release_message(message: Any):
+            await release(message)
+
+            file = message_body.get_spool_file(message)
+
+            closed.append(file is not None and file.file.closed)
+
+        async_client_post.side_effect = post
+        release = message_body.release_message
+        json_data = {
+            **message_dto.required_template,
+            "document": message_dto.file_examples.base64_document_pdf,
+        }
+        bad_json_data = {
+            **json_data,
+            "document": json_data["document"][:-4] + "*QQ=",
+        }
+
+        assert message_body.validation_pool is not None
+
+        offloaded = message_body.validation_pool.get_stats().offloaded
+
+        with mock.patch(
+            "src.apiv1.release_message", release_message
+        ), mock.patch.object(message_body, "spool_threshold", 65536):
+            response = client.post("/v1/messages", json=json_data)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(closed, [True])
+            self.assertEqual(
+                message_body.validation_pool.get_stats().offloaded,
+                offloaded + 1,
+            )
+
+            bad_response = client.post("/v1/messages", json=bad_json_data)
+
+        with mock.patch.object(message_body, "spool_threshold", None):
+            response = client.post("/v1/messages", json=json_data)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                client.post("/v1/messages", json=bad_json_data).json(),
+                bad_response.json(),
+            )
+
+        self.assertEqual(bad_response.status_code, 422)
+        self.assertEqual(bodies[0], bodies[1])
+
+    def test_v1_messages_bad_upload(self):
+        """Test function that checks that uploads of files that can't be
+        sent as the kind of media given, that aren't media at all or that
+        are too large, are rejected like bad bodies, and that malformed ones
+        are rejected"""
+
+        for kind, content in (
+            ("audio", base64.b64decode(
+                message_dto.file_examples.base64_document_pdf.partition(",")[2]
+            )),
+            ("image", b"asd"),
+            ("asd", b"asd"),
+        ):
+            response = client.post(
+                "/v1/messages",
+                data={**message_dto.required_template, "kind": kind},
+                files={"file": ("asd", content, "text/plain")},
+            )
+
+            self.assertEqual(response.status_code, 422)
+            self.assertFalse(response.json()["success"])
+
+        # Content that isn't known isn't taken as what it's declared to be
+        response = client.post(
+            "/v1/messages",
+            data=message_dto.required_template,
+            files={"file": ("asd", b"asd", "image/png")},
+        )
+
+        self.assertEqual(response.status_code, 422)
+        self.assertIn(
+            str(errors.BadMimetypeNotRecognizedError),
+            response.json()["errorMessage"],
+        )
+
+        # Audios are limited to what a base64 audio holds, less than images
+        limits = {**env_variables.UPLOAD_MAX_SIZES, "image": 100}
+
+        for header, limit in (
+            (b"OggS\x00\x02" + bytes(22) + b"\x01vorbis", limits["audio"]),
+            (b"\x89PNG\r\n\x1a\n", 100),
+        ):
+            with mock.patch.object(env_variables, "UPLOAD_MAX_SIZES", limits):
+                response = client.post(
+                    "/v1/messages",
+                    data=message_dto.required_template,
+                    files={"file": ("asd", header.ljust(limit + 1), "")},
+                )
+
+            self.assertEqual(response.status_code, 422)
+            self.assertIn(
+                str(errors.FileTooLargeError(limit=limit)),
+                response.json()["errorMessage"],
+            )
+
+        response = client.post(
+            "/v1/messages",
+            data=b"asd",
+            headers={"Content-Type": "multipart/form-data"},
+        )
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,109 @@
+"""Module that contains the tests for the base64_validator module"""
+
+import random
+import re
+import unittest
+
+# pylint: disable-next=no-name-in-module
+from pydantic import BaseModel, ValidationError
+
+from src.utils import type_aliases
+from src.utils.base64_validator import is_base64, is_base64_data_uri
+from src.utils.file_examples import base64_image, base64_document_pdf
+
+
+PATTERNS = {
+    None: type_aliases.base_64_pattern_file,
+    "image": type_aliases.base_64_pattern_image,
+    "video": type_aliases.base_64_pattern_video,
+    "audio": type_aliases.base_64_pattern_audio,
+    "application": type_aliases.base_64_pattern_document,
+}
+
+# Pieces the fuzzed strings are made of, chosen to hit every branch of the
+# patterns: headers, separators, padding, newlines and odd characters
+PIECES = (
+    "data:", "image", "video", "audio", "application", "/", "png", "x_y",
+    ";base64,", ";base64", ",", ";", "A", "Qw", "xyz", "+/", "0", "=",
+    "==", "\n", "\r", " ", "!", "٣", "á", "-",
+)
+
+DATA_PIECES = ("AAAA", "Qw==", "xyz=", "+/09", "A", "=", "٣", "\n", "!")
+
+
+class TestBase64Validator(unittest.TestCase):
+    """Test class that contains tests for the base64_validator module"""
+
+    def test_same_as_patterns(self):
+        """Test function that checks that fuzzed strings are accepted by
+        the validator if and only if the base64 patterns match them"""
+
+        rng = random.Random(0)
+
+        def make(pieces):
+            return "".join(
+                rng.choice(pieces) for _ in range(rng.randint(0, 12))
+            )
+
+        for index in range(30000):
+            value = make(PIECES)
+
+            if index % 3:
+                value = f"data:{rng.choice(PIECES[1:5])}/{value}"
+
+            if index % 3 == 2:
+                value = f"{value};base64,{make(DATA_PIECES)}"
+
+            for media_type, pattern in PATTERNS.items():
+                self.assertEqual(
+                    is_base64_data_uri(value, media_type),
+                    re.match(pattern, value) is not None,
+                    (value, media_type),
+                )
+
+    def test_examples(self):
+        """Test function that checks real files and edge cases"""
+
+        self.assertTrue(is_base64_data_uri(base64_image, "image"))
+        self.assertTrue(is_base64_data_uri(base64_document_pdf, None))
+        self.assertFalse(is_base64_data_uri(base64_image, "video"))
+        self.assertFalse(is_base64_data_uri(base64_image[:-1], "image"))
+        self.assertFalse(is_base64_data_uri(base64_image + "\n\n", "image"))
+        self.assertTrue(is_base64_data_uri(base64_image + "\n", "image"))
+        self.assertTrue(is_base64_data_uri("data:a/b;base64,", None))
+        self.assertFalse(is_base64_data_uri("data:a/;base64,", None))
+
+        self.assertTrue(is_base64(""))
+        self.assertTrue(is_base64("٣٣٣="))
+        self.assertFalse(is_base64("AA=A"))
+        self.assertFalse(is_base64("A==="))
+
+    def test_type_aliases_error(self):
+        """Test function that checks that the base64 types raise the same
+        error they raised with the regex"""
+
+        # pylint: disable-next=too-few-public-methods
+        class Schema(BaseModel):
+            """Schema class with a base64 image field"""
+
+            image: type_aliases.Base64Image
+
+        with self.assertRaises(ValidationError) as context:
+            Schema(image=base64_image.replace("image", "video"))
+
+        self.assertEqual(
+            context.exception.errors(),
+            [
+                {
+                    "loc": ("image",),
+                    "msg": "string does not match regex "
+                    f"\"{type_aliases.Base64Image.regex.pattern}\"",
+                    "type": "value_error.str.regex",
+                    "ctx": {
+                        "pattern": type_aliases.Base64Image.regex.pattern
+                    },
+                }
+            ],
+        )
+
+        self.assertEqual(Schema(image=base64_image).image, base64_image)
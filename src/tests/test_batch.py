@@ -0,0 +1,120 @@
+"""Module that contains the tests for POST /v1/messages:batch"""
+
+import unittest
+from typing import List
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from src.env_variables import env_variables
+from src.main import app
+from src.schemas import message_dto
+from src.schemas.dispatcher_responses import SentMessageResponseSchema
+from src.tests.helpers import counting_send
+from src.utils import errors
+
+
+client = TestClient(app)
+
+
+class TestBatch(unittest.TestCase):
+    """Test class that contains tests for the batches of messages"""
+
+    @mock.patch("src.whatsapp_provider.provider.send")
+    def test_v1_messages_batch(self, send: mock.AsyncMock):
+        """Test function that checks that the messages of a batch are sent
+        concurrently, up to the concurrency of batches, and that every one
+        of them gets its own result in order, the invalid ones and the ones
+        that failed to be sent included"""
+
+        in_flight: List[int] = [0, 0]
+
+        send.side_effect = counting_send(in_flight)
+
+        messages = [
+            {**message_dto.text_template, "text": str(index)}
+            for index in range(30)
+        ]
+        messages[3] = {**message_dto.text_template, "text": "fail"}
+        messages[7] = {**message_dto.text_template, "phone": "asd"}
+
+        with mock.patch.object(env_variables, "BATCH_CONCURRENCY", 4):
+            response = client.post(
+                "/v1/messages:batch", json={"messages": messages}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(send.call_count, 29)
+        self.assertEqual(in_flight[1], 4)
+
+        results = response.json()["results"]
+
+        for index, result in enumerate(results):
+            self.assertEqual(
+                SentMessageResponseSchema(**result).dict(), result
+            )
+
+            if index not in (3, 7):
+                self.assertEqual(result["id"], str(index))
+
+        self.assertEqual(
+            results[3]["errorMessage"], errors.UpstreamConnectionError.detail
+        )
+        self.assertFalse(results[7]["success"])
+        self.assertIn("'messages', 7, 'phone'", results[7]["errorMessage"])
+
+    @mock.patch("logging.Logger.exception")
+    @mock.patch("src.whatsapp_provider.provider.send")
+    def test_v1_messages_batch_unexpected_error(
+        self, send: mock.AsyncMock, logger_exception: mock.MagicMock
+    ):
+        """Test function that checks that an unexpected error while sending
+        a message only fails its own result, not the whole batch"""
+
+        send.side_effect = [
+            {"success": True, "errorMessage": None, "id": "0"},
+            RuntimeError,
+            {"success": True, "errorMessage": None, "id": "2"},
+        ]
+
+        response = client.post(
+            "/v1/messages:batch",
+            json={"messages": [message_dto.text_template] * 3},
+            headers={"X-Request-Timeout": "10"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(send.call_count, 3)
+
+        results = response.json()["results"]
+
+        self.assertEqual([result["success"] for result in results], [
+            True, False, True
+        ])
+        self.assertEqual(
+            results[1]["errorMessage"], errors.UnexpectedSendError.detail
+        )
+        logger_exception.assert_called_once()
+
+    def test_v1_messages_bad_batch(self):
+        """Test function that checks that batches that aren't a list of up
+        to the most messages allowed are rejected whole"""
+
+        for content in (
+            {"messages": []},
+            {"messages": [message_dto.text_template] * 101},
+            {"messages": message_dto.text_template},
+            [message_dto.text_template],
+        ):
+            response = client.post("/v1/messages:batch", json=content)
+
+            self.assertEqual(response.status_code, 422)
+            self.assertFalse(response.json()["success"])
+
+        response = client.post(
+            "/v1/messages:batch",
+            data=b"{asd",
+            headers={"Content-Type": "application/json"},
+        )
+
+        self.assertEqual(response.status_code, 422)
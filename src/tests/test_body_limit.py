@@ -0,0 +1,174 @@
+"""Module that contains the tests for the body_limit module"""
+
+import json
+import unittest
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.apiv1.body_limit import BodyLimitMiddleware
+from src.main import app
+from src.schemas.message_dto import required_template
+from src.utils import file_examples
+
+
+TOO_BIG = (
+    Path(file_examples.__file__).parent / "example_base64_too_big"
+).read_text(encoding="utf-8").strip()
+
+
+async def echo_length(scope, receive, send):
+    """Helper ASGI app that responds with the length of the body"""
+
+    body = await Request(scope, receive).body()
+
+    await Response(str(len(body)))(scope, receive, send)
+
+
+async def post(
+    asgi_app: Any, chunks: List[bytes], headers: List[Any]
+) -> Dict[str, Any]:
+    """Helper coroutine that posts a body in chunks to an ASGI app, and
+    returns its response along with how many chunks it received"""
+
+    received: List[bytes] = []
+    messages: List[Dict[str, Any]] = []
+
+    async def receive():
+        received.append(chunks[len(received)])
+
+        return {
+            "type": "http.request",
+            "body": received[-1],
+            "more_body": len(received) < len(chunks),
+        }
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi_app(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/v1/messages",
+            "headers": headers,
+        },
+        receive,
+        send,
+    )
+
+    return {
+        "status": messages[0]["status"],
+        "headers": dict(messages[0]["headers"]),
+        "body": b"".join(message.get("body", b"") for message in messages),
+        "received": len(received),
+    }
+
+
+class TestBodyLimitMiddleware(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains tests for the BodyLimitMiddleware class"""
+
+    def test_get_limit(self):
+        """Test function that checks that the limit of the content type of
+        a path is preferred over the one of any type, and that over the
+        default one"""
+
+        middleware = BodyLimitMiddleware(
+            echo_length,
+            limits={"/asd": {"application/json": 10, "*": 20}},
+            default_limit=30,
+        )
+
+        self.assertEqual(middleware.get_limit("/asd", "application/json"), 10)
+        self.assertEqual(middleware.get_limit("/asd", "text/plain"), 20)
+        self.assertEqual(middleware.get_limit("/", "application/json"), 30)
+        self.assertIsNone(
+            BodyLimitMiddleware(echo_length, limits={}).get_limit("/", "")
+        )
+
+    async def test_streamed_body(self):
+        """Test function that checks that a body without Content-Length is
+        rejected as soon as it crosses the limit, and that the rest of it
+        isn't received"""
+
+        middleware = BodyLimitMiddleware(
+            echo_length, limits={"/v1/messages": {"application/json": 10}}
+        )
+        headers = [(b"content-type", b"application/json; charset=utf-8")]
+
+        response = await post(middleware, [b"a" * 6, b"a" * 4], headers)
+
+        self.assertEqual(response["status"], 200)
+        self.assertEqual(response["body"], b"10")
+
+        response = await post(middleware, [b"a" * 6] * 5, headers)
+
+        self.assertEqual(response["status"], 413)
+        self.assertEqual(response["received"], 2)
+        self.assertEqual(response["headers"][b"connection"], b"close")
+        self.assertEqual(
+            json.loads(response["body"]),
+            {
+                "success": False,
+                "errorMessage": "Request body is larger than the 10 bytes "
+                                "allowed for application/json requests",
+                "id": None,
+            },
+        )
+
+    async def test_content_length(self):
+        """Test function that checks that a Content-Length over the limit is
+        rejected before receiving the body or calling the app"""
+
+        downstream = mock.AsyncMock()
+        middleware = BodyLimitMiddleware(
+            downstream, limits={}, default_limit=10
+        )
+
+        response = await post(
+            middleware, [b"a" * 11], [(b"content-length", b"11")]
+        )
+
+        self.assertEqual(response["status"], 413)
+        self.assertEqual(response["received"], 0)
+        downstream.assert_not_awaited()
+
+    async def test_app_response_replaced(self):
+        """Test function that checks that the 413 replaces whatever the app
+        responds to the body it couldn't receive"""
+
+        api = FastAPI()
+
+        @api.post("/v1/messages")
+        def messages(data: Dict[str, Any]):
+            return data
+
+        middleware = BodyLimitMiddleware(api, limits={}, default_limit=10)
+
+        response = await post(
+            middleware,
+            [b'{"a": ', b'"aaaaaaaa"}'],
+            [(b"content-type", b"application/json")],
+        )
+
+        self.assertEqual(response["status"], 413)
+
+    def test_messages(self):
+        """Test function that checks that /v1/messages rejects a file larger
+        than any valid one with a 413"""
+
+        response = TestClient(app).post(
+            "/v1/messages",
+            json={
+                **required_template,
+                "image": TOO_BIG,
+            },
+        )
+
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(response.json()["success"])
@@ -0,0 +1,219 @@
+"""Module that contains the tests for the circuit_breaker module"""
+
+import unittest
+from unittest import mock
+
+from fastapi.exceptions import HTTPException
+
+from src.utils import errors, help_functions
+from src.utils.circuit_breaker import (
+    BreakerSettings, CircuitBreaker, CircuitBreakers, CircuitState
+)
+
+
+SETTINGS = BreakerSettings(
+    window_size=4,
+    min_requests=4,
+    error_rate=0.5,
+    slow_call_latency=1,
+    slow_call_rate=0.75,
+    open_duration=10,
+    probe_interval=2,
+    probe_successes=2,
+)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test class that contains tests for the CircuitBreaker class"""
+
+    def test_trips_on_error_rate(self):
+        """Test function that checks that the breaker trips once enough
+        requests of the window failed, and not before min_requests"""
+
+        breaker = CircuitBreaker(SETTINGS, mock.Mock(return_value=0))
+
+        for failed in (True, True, False):
+            breaker.record(0.1, failed, breaker.allow())
+
+        permit = breaker.allow()
+
+        self.assertIsNotNone(permit)
+
+        breaker.record(0.1, False, permit)
+
+        self.assertIsNone(breaker.allow())
+        self.assertEqual(breaker.get_stats().state, CircuitState.OPEN)
+        self.assertEqual(breaker.get_stats().trips, 1)
+
+    def test_trips_on_latency(self):
+        """Test function that checks that the breaker trips once enough
+        requests of the window were too slow, and that old outcomes slide
+        out of the window"""
+
+        breaker = CircuitBreaker(SETTINGS, mock.Mock(return_value=0))
+
+        for latency in (0.1, 2, 2, 2):
+            breaker.record(latency, False, breaker.allow())
+
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+
+        breaker = CircuitBreaker(SETTINGS, mock.Mock(return_value=0))
+
+        for latency in (2, 2, 0.1, 0.1, 0.1, 2):
+            breaker.record(latency, False, breaker.allow())
+
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        self.assertEqual(breaker.get_stats().slow_rate, 0.25)
+
+    def test_half_open_probes(self):
+        """Test function that checks that a tripped breaker lets rate
+        limited probes through once the open duration is over, closing
+        after enough successful probes and opening again on a failed
+        one"""
+
+        clock = mock.Mock(return_value=0)
+
+        breaker = CircuitBreaker(SETTINGS, clock)
+
+        for _ in range(4):
+            breaker.record(0.1, True, breaker.allow())
+
+        clock.return_value = 10
+
+        self.assertFalse(breaker.is_open())
+
+        permit = breaker.allow()
+
+        self.assertTrue(permit.probe)
+        self.assertIsNone(breaker.allow())
+
+        breaker.record(0.1, False, permit)
+
+        # One probe per probe interval
+        self.assertIsNone(breaker.allow())
+
+        clock.return_value = 12
+
+        permit = breaker.allow()
+
+        self.assertIsNotNone(permit)
+
+        breaker.record(0.1, True, permit)
+
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        self.assertEqual(breaker.trips, 2)
+
+        clock.return_value = 22
+
+        for _ in range(2):
+            permit = breaker.allow()
+
+            self.assertIsNotNone(permit)
+
+            breaker.record(0.1, False, permit)
+
+            clock.return_value += 2
+
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        self.assertEqual(breaker.get_stats().requests, 0)
+
+    def test_in_flight_when_tripped(self):
+        """Test function that checks that the outcomes of requests that
+        were in flight when the breaker tripped don't count as half-open
+        probes, don't reopen it and aren't recorded once it's closed
+        again"""
+
+        clock = mock.Mock(return_value=0)
+
+        breaker = CircuitBreaker(SETTINGS, clock)
+        in_flight = [breaker.allow() for _ in range(4)]
+
+        for _ in range(4):
+            breaker.record(0.1, True, breaker.allow())
+
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+
+        clock.return_value = 5
+
+        # Late successes don't close it, late failures don't reopen it
+        breaker.record(0.1, False, in_flight[0])
+        breaker.record(0.1, False, in_flight[1])
+        breaker.record(0.1, True, in_flight[2])
+
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        self.assertEqual(breaker.trips, 1)
+
+        # It still half-opens once the open duration since it tripped is
+        # over, and its first probe doesn't close it on its own
+        clock.return_value = 10
+
+        permit = breaker.allow()
+
+        self.assertTrue(permit.probe)
+
+        breaker.record(0.1, False, permit)
+
+        self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+
+        clock.return_value = 12
+
+        breaker.record(0.1, False, breaker.allow())
+
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+        breaker.record(0.1, True, in_flight[3])
+
+        self.assertEqual(breaker.get_stats().requests, 0)
+
+
+class TestCircuitBreakers(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains tests for the CircuitBreakers class"""
+
+    async def test_guard(self):
+        """Test function that checks that failures are recorded on both the
+        host's and the instance's breakers, and that the open one's error
+        is raised"""
+
+        breakers = CircuitBreakers(SETTINGS, mock.Mock(return_value=0))
+
+        async def send_failing(instance: str):
+            async with breakers.guard("asd.com", instance):
+                raise ConnectionError
+
+        for _ in range(4):
+            await help_functions.get_exception_async(
+                ConnectionError, lambda: send_failing("asd")
+            )
+
+        async def send():
+            async with breakers.guard("asd.com", "qwe"):
+                pass
+
+        exc = await help_functions.get_exception_async(HTTPException, send)
+
+        self.assertIs(exc, errors.HostCircuitOpenError)
+
+        stats = breakers.get_stats()
+
+        self.assertEqual(stats["hosts"]["asd.com"].state, CircuitState.OPEN)
+        self.assertEqual(stats["instances"]["asd"].trips, 1)
+        self.assertEqual(stats["instances"]["qwe"].requests, 0)
+
+    async def test_own_http_exceptions_are_not_recorded(self):
+        """Test function that checks that HTTPExceptions raised by this
+        service while guarded don't count as failures of the upstream"""
+
+        breakers = CircuitBreakers(SETTINGS, mock.Mock(return_value=0))
+
+        async def send():
+            async with breakers.guard("asd.com", "asd"):
+                raise errors.UpstreamOverloadedError
+
+        for _ in range(4):
+            await help_functions.get_exception_async(HTTPException, send)
+
+        breakers.check("asd.com", "asd")
+
+        self.assertEqual(
+            breakers.get_stats()["instances"]["asd"].requests, 0
+        )
@@ -0,0 +1,189 @@
+"""Module that contains the tests for the concurrency_limiter module"""
+
+import asyncio
+import unittest
+
+from fastapi.exceptions import HTTPException
+
+from src.utils import errors, help_functions
+from src.utils.concurrency_limiter import AIMDLimiter, ConcurrencyLimiters
+
+
+class TestAIMDLimiter(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains tests for the AIMDLimiter class"""
+
+    async def test_waits_for_a_slot(self):
+        """Test function that checks that acquiring past the limit waits
+        until a slot is released, or times out"""
+
+        limiter = AIMDLimiter(initial_limit=1, max_limit=10)
+
+        await limiter.acquire()
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await limiter.acquire(timeout=0.01)
+
+        waiting = asyncio.ensure_future(limiter.acquire(timeout=1))
+
+        await asyncio.sleep(0)
+
+        self.assertEqual(limiter.get_stats().waiting, 1)
+
+        limiter.release()
+
+        await waiting
+
+        self.assertEqual(limiter.get_stats().in_flight, 1)
+
+    def test_additive_increase(self):
+        """Test function that checks that the limit grows by one per steady
+        sample while it's being used, and never past the max limit"""
+
+        limiter = AIMDLimiter(initial_limit=2, max_limit=3)
+
+        limiter.in_flight = 2
+
+        limiter.on_sample(0.1)
+        limiter.on_sample(0.1)
+
+        self.assertEqual(limiter.get_stats().limit, 3)
+
+        limiter.on_sample(0.1)
+
+        self.assertEqual(limiter.get_stats().limit, 3)
+
+        # Not using the limit doesn't make it grow
+        limiter = AIMDLimiter(initial_limit=10, max_limit=20)
+
+        limiter.on_sample(0.1)
+
+        self.assertEqual(limiter.get_stats().limit, 10)
+
+    def test_multiplicative_decrease(self):
+        """Test function that checks that the limit is cut when a request
+        is dropped or its latency goes past the tolerance"""
+
+        limiter = AIMDLimiter(
+            initial_limit=10, max_limit=20, backoff_ratio=0.5
+        )
+
+        limiter.on_sample(0.1)
+        limiter.on_sample(0.3)
+
+        self.assertEqual(limiter.get_stats().limit, 5)
+
+        limiter.on_sample(0.1, dropped=True)
+
+        stats = limiter.get_stats()
+
+        self.assertEqual(stats.limit, 2)
+        self.assertEqual(stats.drops, 1)
+
+        for _ in range(10):
+            limiter.on_sample(0.1, dropped=True)
+
+        self.assertEqual(limiter.get_stats().limit, 1)
+
+
+class TestConcurrencyLimiters(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains tests for the ConcurrencyLimiters class"""
+
+    async def test_limit_by_host_and_instance(self):
+        """Test function that checks that a slot of both the host and the
+        instance is held while sending, and that the request times out with
+        an HTTPException if no slot is released"""
+
+        limiters = ConcurrencyLimiters(
+            host_limit=2,
+            host_max_limit=2,
+            instance_limit=1,
+            instance_max_limit=1,
+            acquire_timeout=0.01,
+        )
+
+        async with limiters.limit("asd.com", "asd"):
+            stats = limiters.get_stats()
+
+            self.assertEqual(stats["hosts"]["asd.com"].in_flight, 1)
+            self.assertEqual(stats["instances"]["asd"].in_flight, 1)
+
+            async def send_same_instance():
+                async with limiters.limit("asd.com", "asd"):
+                    pass
+
+            exc = await help_functions.get_exception_async(
+                HTTPException, send_same_instance
+            )
+
+            self.assertIs(exc, errors.UpstreamOverloadedError)
+
+            async with limiters.limit("asd.com", "qwe"):
+                self.assertEqual(
+                    limiters.get_stats()["hosts"]["asd.com"].in_flight, 2
+                )
+
+        stats = limiters.get_stats()
+
+        self.assertEqual(stats["hosts"]["asd.com"].in_flight, 0)
+        self.assertEqual(stats["instances"]["asd"].in_flight, 0)
+
+    async def test_cancelled_while_waiting(self):
+        """Test function that checks that the instance's slot is given back
+        if the request is cancelled while waiting for a slot of the host"""
+
+        limiters = ConcurrencyLimiters(
+            host_limit=1,
+            host_max_limit=1,
+            instance_limit=5,
+            instance_max_limit=5,
+            acquire_timeout=1,
+        )
+
+        async def send():
+            async with limiters.limit("asd.com", "qwe"):
+                pass
+
+        async with limiters.limit("asd.com", "asd"):
+            task = asyncio.ensure_future(send())
+
+            await asyncio.sleep(0.01)
+
+            self.assertEqual(
+                limiters.get_stats()["instances"]["qwe"].in_flight, 1
+            )
+
+            task.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        stats = limiters.get_stats()
+
+        self.assertEqual(stats["instances"]["qwe"].in_flight, 0)
+        self.assertEqual(stats["hosts"]["asd.com"].in_flight, 0)
+
+    async def test_exceptions_are_drops(self):
+        """Test function that checks that an exception raised while sending
+        counts as a dropped request"""
+
+        limiters = ConcurrencyLimiters(
+            host_limit=10,
+            host_max_limit=10,
+            instance_limit=10,
+            instance_max_limit=10,
+            acquire_timeout=1,
+        )
+
+        async def send():
+            async with limiters.limit("asd.com", "asd"):
+                raise ConnectionError
+
+        await help_functions.get_exception_async(ConnectionError, send)
+
+        async with limiters.limit("asd.com", "asd") as sample:
+            sample.dropped = True
+
+        stats = limiters.get_stats()
+
+        self.assertEqual(stats["hosts"]["asd.com"].drops, 2)
+        self.assertEqual(stats["instances"]["asd"].limit, 8)
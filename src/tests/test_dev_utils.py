@@ -2,6 +2,7 @@
 
 import unittest
 import json
+from unittest import mock
 
 from fastapi.testclient import TestClient
 from pydantic import ValidationError
@@ -9,6 +10,7 @@ from pydantic import ValidationError
 from src.main import app
 from src.schemas.dispatcher_responses import HealthSchema
 from src.utils.help_functions import get_exception
+from src.whatsapp_provider import provider as whatsapp_provider
 
 
 client = TestClient(app)
@@ -34,3 +36,58 @@ class TestDevUtils(unittest.TestCase):
             get_exception(ValidationError, lambda: HealthSchema(**content)),
             None
         )
+
+    def test_management_health_warming_up(self):
+        """Test function that checks that /management/health responds DOWN
+        with the warm-up progress until the pool is warmed up"""
+
+        with mock.patch.object(whatsapp_provider, "warm_up_connections", 2):
+            response = client.get("/management/health")
+
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(content["status"], "DOWN")
+        self.assertEqual(content["warmUp"]["state"], "pending")
+        self.assertEqual(content["warmUp"]["target"], 2)
+
+    def test_management_metrics(self):
+        """Test function that checks that /management/metrics responds with
+        the statistics of the pool once the pooled client exists"""
+
+        whatsapp_provider.start()
+
+        response = client.get("/management/metrics")
+
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content["pool"]["requests"], 0)
+        self.assertIn("reuse_rate", content["pool"])
+        self.assertIn("budget_left", content["retries"])
+        self.assertIn("queued", content["validation"])
+        self.assertIn("hit_ratio", content["media_cache"])
+
+    def test_management_limits(self):
+        """Test function that checks that /management/limits responds with
+        the limits of the concurrency limiters"""
+
+        response = client.get("/management/limits")
+
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hosts", content)
+        self.assertIn("instances", content)
+
+    def test_management_circuits(self):
+        """Test function that checks that /management/circuits responds with
+        the state of the circuit breakers"""
+
+        response = client.get("/management/circuits")
+
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hosts", content)
+        self.assertIn("instances", content)
@@ -0,0 +1,119 @@
+"""Module that contains the tests for the dispatch tables"""
+
+import unittest
+from typing import Any
+from unittest import mock
+
+from httpx import Response
+
+from src.schemas import message_dto
+from src.schemas.message_dto import KIND_KEY, MessageDTO, MessageKind
+from src.schemas.message_validator import message_validator
+from src.utils import errors
+from src.utils.dispatch import (
+    Route,
+    dispatch_tables,
+    get_dispatch_table,
+    get_message_kind,
+    register_dispatch_table,
+)
+from src.whatsapp_provider.outbound import CHAT_API_TABLE, SendMessage
+from src.whatsapp_provider.whatsapp_provider import WhatsappProvider
+
+
+def build_text(message: Any, _: MessageKind) -> SendMessage:
+    """Helper function that builds every message as the same text"""
+
+    return SendMessage(message.phone, "asd")
+
+
+class TestDispatch(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains tests for the dispatch tables"""
+
+    def test_message_kind(self):
+        """Test function that checks that the kind of a message is the field
+        that's set, resolved on validation by both the model and the compiled
+        validator without becoming a field, and that it's routed to its Chat
+        API action"""
+
+        for template, kind, action in (
+            (message_dto.text_template, MessageKind.TEXT, "sendMessage"),
+            (message_dto.image_template, MessageKind.IMAGE, "sendFile"),
+            (message_dto.video_template, MessageKind.VIDEO, "sendFile"),
+            (
+                message_dto.document_template_pdf,
+                MessageKind.DOCUMENT,
+                "sendFile",
+            ),
+            (message_dto.audio_template, MessageKind.AUDIO, "sendPTT"),
+        ):
+            message = MessageDTO.parse_obj(template)
+            route = get_dispatch_table("whatsapp")[get_message_kind(message)]
+
+            self.assertEqual(get_message_kind(message), kind)
+            self.assertEqual(
+                get_message_kind(message_validator.parse_obj(template)), kind
+            )
+            self.assertNotIn(KIND_KEY, message.dict())
+            self.assertEqual(route.action, action)
+            self.assertEqual(
+                route.make_url("http://a", "b", "c"),
+                f"http://a/b/{action}?token=c",
+            )
+
+    def test_register(self):
+        """Test function that checks that tables are only registered if
+        they route every kind of message"""
+
+        route = Route("asd", "{api_url}", build_text)
+
+        with self.assertRaises(errors.IncompleteDispatchTableError) as error:
+            register_dispatch_table("asd", {MessageKind.TEXT: route})
+
+        self.assertIn("image, video, document, audio", str(error.exception))
+        self.assertNotIn("asd", dispatch_tables)
+
+        register_dispatch_table("asd", dict.fromkeys(MessageKind, route))
+
+        self.assertIs(get_dispatch_table("asd")[MessageKind.AUDIO], route)
+
+        del dispatch_tables["asd"]
+
+        with self.assertRaises(KeyError):
+            get_dispatch_table("asd")
+
+    @mock.patch("httpx.AsyncClient.post")
+    async def test_provider_table(self, async_client_post: mock.AsyncMock):
+        """Test function that checks that a provider sends messages as the
+        table it's given routes them"""
+
+        async_client_post.return_value = Response(
+            status_code=200, json={"sent": True, "id": "a"}
+        )
+
+        provider = WhatsappProvider(
+            "http://localhost",
+            dispatch_table={
+                **CHAT_API_TABLE,
+                MessageKind.IMAGE: Route(
+                    "sendText",
+                    "{api_url}/v2/{instance}/sendText?key={token}",
+                    build_text,
+                ),
+            },
+        )
+
+        await provider.send(MessageDTO.parse_obj(message_dto.image_template))
+
+        self.assertEqual(
+            async_client_post.call_args.kwargs["url"],
+            "http://localhost/v2/"
+            f"{message_dto.required_template['instance']}/sendText?key="
+            f"{message_dto.required_template['token']}",
+        )
+        self.assertEqual(
+            async_client_post.call_args.kwargs["json"],
+            {"phone": message_dto.required_template["phone"], "body": "asd"},
+        )
+
+        await provider.close()
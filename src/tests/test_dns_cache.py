@@ -0,0 +1,118 @@
+"""Module that contains the tests for the dns_cache module"""
+
+import asyncio
+import socket
+import unittest
+from typing import List
+from unittest import mock
+
+import dns.resolver
+
+from src.utils.dns_cache import DNSCache
+
+
+# pylint: disable-next=too-few-public-methods
+class Answer:
+    """Class that fakes the answer of a dnspython resolver"""
+
+    def __init__(self, addresses: List[str], ttl: int):
+        self.rrset = mock.Mock(ttl=ttl)
+        self.records = [mock.Mock(to_text=lambda a=a: a) for a in addresses]
+
+    def __iter__(self):
+        return iter(self.records)
+
+
+class TestDNSCache(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains tests for the DNSCache class"""
+
+    async def test_respects_ttl(self):
+        """Test function that checks that addresses are cached for as long
+        as their TTL, and that concurrent lookups share a query"""
+
+        clock = mock.Mock(return_value=0)
+        resolver = mock.Mock()
+        resolver.resolve = mock.AsyncMock(
+            return_value=Answer(["10.0.0.1", "10.0.0.2"], ttl=30)
+        )
+
+        dns_cache = DNSCache(resolver, clock)
+
+        addresses = await asyncio.gather(
+            dns_cache.resolve("asd.com"), dns_cache.resolve("asd.com")
+        )
+
+        self.assertEqual(addresses[0], ["10.0.0.1", "10.0.0.2"])
+        self.assertEqual(addresses[0], addresses[1])
+        self.assertEqual(resolver.resolve.call_count, 1)
+
+        clock.return_value = 29
+
+        await dns_cache.resolve("asd.com")
+
+        self.assertEqual(resolver.resolve.call_count, 1)
+
+        clock.return_value = 30
+
+        await dns_cache.resolve("asd.com")
+
+        self.assertEqual(resolver.resolve.call_count, 2)
+
+        stats = dns_cache.get_stats()
+
+        self.assertEqual(stats.hits, 1)
+        self.assertEqual(stats.misses, 3)
+        self.assertEqual(stats.hosts, {"asd.com": ["10.0.0.1", "10.0.0.2"]})
+
+    async def test_failures(self):
+        """Test function that checks that stale addresses are used while
+        the resolver fails, that OSError is raised if there are none, and
+        that IP addresses aren't resolved"""
+
+        clock = mock.Mock(return_value=0)
+        resolver = mock.Mock()
+        resolver.resolve = mock.AsyncMock(
+            return_value=Answer(["10.0.0.1"], ttl=0)
+        )
+
+        dns_cache = DNSCache(resolver, clock)
+
+        await dns_cache.resolve("asd.com")
+
+        clock.return_value = 5
+        resolver.resolve.side_effect = dns.resolver.NXDOMAIN
+
+        with mock.patch.object(
+            asyncio.get_running_loop(),
+            "getaddrinfo",
+            side_effect=socket.gaierror,
+        ):
+            self.assertEqual(
+                await dns_cache.resolve("asd.com"), ["10.0.0.1"]
+            )
+
+            with self.assertRaises(OSError):
+                await dns_cache.resolve("qwe.com")
+
+        self.assertEqual(await dns_cache.resolve("::1"), ["::1"])
+
+        stats = dns_cache.get_stats()
+
+        self.assertEqual(stats.stale_hits, 1)
+        self.assertEqual(stats.failures, 2)
+
+    async def test_hosts_file(self):
+        """Test function that checks that the hosts dnspython finds nothing
+        about, like the ones of the hosts file, are resolved through the
+        system's resolver"""
+
+        resolver = mock.Mock()
+        resolver.resolve = mock.AsyncMock(side_effect=dns.resolver.NXDOMAIN)
+
+        dns_cache = DNSCache(resolver)
+
+        addresses = await dns_cache.resolve("localhost")
+
+        self.assertTrue(set(addresses) & {"127.0.0.1", "::1"}, addresses)
+        self.assertEqual(len(addresses), len(set(addresses)))
+        self.assertEqual(dns_cache.get_stats().failures, 0)
@@ -214,6 +214,33 @@ class TestEnvVariables(unittest.TestCase):
             prod_template
         )
 
+    def test_env_schema_action_timeouts(self):
+        """Test function that checks that ACTION_TIMEOUTS is parsed from
+        JSON, and that an exception is thrown if it has bad values"""
+
+        env = EnvSchema(**{
+            **dev_template,
+            "ACTION_TIMEOUTS": '{"sendFile": {"read": 30}}'
+        })
+
+        self.assertEqual(env.ACTION_TIMEOUTS, {"sendFile": {"read": 30.0}})
+
+        env = EnvSchema(**{**dev_template, "ACTION_TIMEOUTS": ""})
+
+        self.assertEqual(env.ACTION_TIMEOUTS, {})
+
+        attr_not_values_test(
+            self,
+            "ACTION_TIMEOUTS",
+            (
+                "{",
+                '{"asd": {"read": 30}}',
+                '{"sendFile": {"asd": 30}}',
+                '{"sendFile": {"read": -1}}',
+            ),
+            dev_template
+        )
+
     def test_get_reasons(self):
         """Test function that checks that the get_reasons function returns
         the proper string basing on certain conditions like if the .env
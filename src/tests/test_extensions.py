@@ -0,0 +1,64 @@
+"""Module that contains the tests for the extensions module"""
+
+import mimetypes
+import unittest
+from unittest import mock
+
+from src.utils import extensions
+
+
+class TestExtensions(unittest.TestCase):
+    """Test class that contains tests for the index of extensions"""
+
+    def test_guess_extension(self):
+        """Test function that checks the extensions of the mimetypes the
+        file examples have, and that unknown mimetypes have none"""
+
+        self.assertEqual(extensions.guess_extension("image/jpeg"), ".jpg")
+        self.assertEqual(extensions.guess_extension("IMAGE/JPEG"), ".jpg")
+        self.assertEqual(extensions.guess_extension("audio/ogg"), ".oga")
+        self.assertEqual(extensions.guess_extension("video/mp4"), ".mp4")
+        self.assertEqual(
+            extensions.guess_extension("application/pdf"), ".pdf"
+        )
+        self.assertEqual(
+            extensions.guess_extension(
+                "application/vnd.oasis.opendocument.text"
+            ),
+            ".odt",
+        )
+        self.assertEqual(
+            extensions.guess_extension(
+                "application/"
+                "vnd.openxmlformats-officedocument.wordprocessingml.document"
+            ),
+            ".docx",
+        )
+        self.assertIsNone(extensions.guess_extension("image/ddddd"))
+        self.assertIsNone(extensions.guess_extension(""))
+
+    def test_host_independent(self):
+        """Test function that checks that the mime databases of the host
+        aren't read"""
+
+        with mock.patch.object(
+            mimetypes, "guess_extension", side_effect=AssertionError
+        ), mock.patch.object(mimetypes, "init", side_effect=AssertionError):
+            self.assertEqual(extensions.guess_extension("image/png"), ".png")
+
+    def test_index(self):
+        """Test function that checks that every media type Base64 fields
+        take is in the index, with an extension each"""
+
+        index = extensions.load_index(extensions.INDEX_PATH)
+
+        self.assertEqual(index, extensions.extensions)
+
+        for kind in ("image", "video", "audio", "application"):
+            self.assertTrue(
+                any(mimetype.startswith(f"{kind}/") for mimetype in index)
+            )
+
+        for mimetype, extension in index.items():
+            self.assertEqual(mimetype, mimetype.lower())
+            self.assertTrue(extension.startswith("."), mimetype)
@@ -0,0 +1,52 @@
+"""Module that contains the tests for the fast_json module"""
+
+import json
+import unittest
+from unittest import mock
+
+from fastapi.responses import JSONResponse
+
+from src.utils import fast_json
+from src.utils.fast_json import FastJSONResponse
+
+
+CONTENT = {
+    "success": False,
+    "errorMessage": "Número inválido \"asd\" 😀",
+    "id": None,
+    "stats": {"hits": 1, "rate": 0.5, "hosts": ["10.0.0.1"]},
+}
+
+
+class TestFastJSON(unittest.TestCase):
+    """Test class that contains tests for the fast_json module"""
+
+    def test_same_as_json_response(self):
+        """Test function that checks that responses have the same body
+        Starlette's JSONResponse gives them, with orjson and without it"""
+
+        expected = JSONResponse(CONTENT).body
+
+        self.assertTrue(fast_json.is_orjson_available())
+        self.assertEqual(FastJSONResponse(CONTENT).body, expected)
+
+        with mock.patch.object(fast_json, "orjson", None):
+            self.assertFalse(fast_json.is_orjson_available())
+            self.assertEqual(FastJSONResponse(CONTENT).body, expected)
+
+    def test_loads(self):
+        """Test function that checks that bytes are parsed the same with
+        orjson and without it, and that bad JSON raises ValueError"""
+
+        encoded = json.dumps(CONTENT).encode("utf-8")
+
+        self.assertEqual(fast_json.loads(encoded), CONTENT)
+
+        with self.assertRaises(ValueError):
+            fast_json.loads(b"<html>")
+
+        with mock.patch.object(fast_json, "orjson", None):
+            self.assertEqual(fast_json.loads(encoded), CONTENT)
+
+            with self.assertRaises(ValueError):
+                fast_json.loads(b"<html>")
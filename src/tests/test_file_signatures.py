@@ -0,0 +1,101 @@
+"""Module that contains the tests for the file_signatures module"""
+
+import base64
+import unittest
+
+from src.utils import file_examples
+from src.utils.file_signatures import SNIFF_SIZE, detect_mimetype
+
+
+def decode_data_uri(data_uri: str) -> bytes:
+    """Helper function that decodes the content of a base64 data URI"""
+
+    return base64.b64decode(data_uri.partition(",")[2])
+
+
+class TestFileSignatures(unittest.TestCase):
+    """Test class that contains tests for the detection of mimetypes"""
+
+    def test_file_examples(self):
+        """Test function that checks the mimetypes detected from the file
+        examples, whatever the mimetype of their data URI says"""
+
+        for data_uri, mimetype in (
+            (file_examples.base64_image, "image/png"),
+            (file_examples.base64_audio, "image/png"),
+            (file_examples.base64_document_pdf, "application/pdf"),
+            (
+                file_examples.base64_document_odt,
+                "application/vnd.oasis.opendocument.text",
+            ),
+            (
+                file_examples.base64_document_docx,
+                "application/"
+                "vnd.openxmlformats-officedocument.wordprocessingml.document",
+            ),
+        ):
+            header = decode_data_uri(data_uri)[:SNIFF_SIZE]
+
+            self.assertEqual(detect_mimetype(header), mimetype)
+            self.assertEqual(detect_mimetype(header, "text/plain"), mimetype)
+
+    def test_signatures(self):
+        """Test function that checks the mimetypes detected from the first
+        bytes of the media formats"""
+
+        for header, mimetype in (
+            (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image/jpeg"),
+            (b"GIF89a\x01\x00", "image/gif"),
+            (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image/webp"),
+            (b"RIFF\x00\x00\x00\x00WAVEfmt ", "audio/x-wav"),
+            (b"\x00\x00\x00\x20ftypisom", "video/mp4"),
+            (b"\x00\x00\x00\x20ftypM4A ", "audio/mp4"),
+            (b"\x00\x00\x00\x14ftypqt  ", "video/quicktime"),
+            (b"\x1aE\xdf\xa3\x9fB\x86\x81\x01B\x82\x84webm", "video/webm"),
+            (b"OggS\x00\x02" + bytes(22) + b"\x01vorbis", "audio/ogg"),
+            (b"OggS\x00\x02" + bytes(22) + b"\x80theora", "video/ogg"),
+            (b"ID3\x04\x00", "audio/mpeg"),
+            (b"\xff\xfb\x90\x64", "audio/mpeg"),
+            (b"\xff\xf1\x50\x80", "audio/aac"),
+            (b"PK\x03\x04" + bytes(26), "application/zip"),
+        ):
+            self.assertEqual(detect_mimetype(header), mimetype, header)
+
+    def test_declared_mimetype(self):
+        """Test function that checks that the declared mimetype is only
+        taken for ambiguous containers, never for unknown formats"""
+
+        self.assertIsNone(detect_mimetype(b"asd"))
+        self.assertIsNone(detect_mimetype(b"asd", "Text/Plain; charset=utf-8"))
+        self.assertIsNone(detect_mimetype(b"asd", "image/png"))
+        self.assertEqual(
+            detect_mimetype(
+                b"PK\x03\x04" + bytes(26), "Application/Zip; asd=1"
+            ),
+            "application/zip",
+        )
+        self.assertEqual(
+            detect_mimetype(
+                b"PK\x03\x04" + bytes(26),
+                "application/vnd.android.package-archive",
+            ),
+            "application/vnd.android.package-archive",
+        )
+        self.assertEqual(
+            detect_mimetype(
+                b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/msword"
+            ),
+            "application/msword",
+        )
+        self.assertEqual(
+            detect_mimetype(b"%PDF-1.4", "image/png"), "application/pdf"
+        )
+
+    def test_truncated_zip(self):
+        """Test function that checks that a ZIP archive whose first entry
+        doesn't fit in the header is still detected as one"""
+
+        header = decode_data_uri(file_examples.base64_document_docx)
+
+        self.assertEqual(detect_mimetype(header[:40]), "application/zip")
+        self.assertEqual(detect_mimetype(header[:10]), "application/zip")
@@ -0,0 +1,174 @@
+"""Module that contains the tests for the job queue"""
+
+import asyncio
+import unittest
+from typing import Any, List
+from unittest import mock
+
+from src.utils import errors
+from src.utils.job_queue import JobQueue
+
+
+class TestJobQueue(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains tests for the job queue"""
+
+    async def test_jobs(self):
+        """Test function that checks that jobs are handled by the workers
+        in the background, and that their results are kept"""
+
+        release = asyncio.Event()
+        handled: List[Any] = []
+
+        async def handle(payload: Any) -> Any:
+            await release.wait()
+
+            handled.append(payload)
+
+            return {"payload": payload}
+
+        job_queue = JobQueue(handle, maxsize=10, workers=2)
+        job_queue.start()
+
+        job_ids = [job_queue.submit(index) for index in range(4)]
+
+        await asyncio.sleep(0)
+
+        self.assertEqual(len(set(job_ids)), 4)
+        self.assertEqual(job_queue.get(job_ids[0]), ("running", {}))
+        self.assertEqual(job_queue.get(job_ids[3]), ("queued", {}))
+        self.assertEqual(job_queue.get("asd"), (None, {}))
+
+        stats = job_queue.get_stats()
+
+        self.assertEqual((stats.queued, stats.running), (2, 2))
+
+        release.set()
+
+        await job_queue.close(1)
+
+        self.assertEqual(sorted(handled), [0, 1, 2, 3])
+
+        for index, job_id in enumerate(job_ids):
+            self.assertEqual(
+                job_queue.get(job_id), ("done", {"payload": index})
+            )
+
+        self.assertEqual(job_queue.get_stats().done, 4)
+
+    async def test_full(self):
+        """Test function that checks that jobs are rejected once the queue
+        is full, and accepted again once there's room"""
+
+        release = asyncio.Event()
+
+        async def handle(_: Any) -> Any:
+            await release.wait()
+
+            return {}
+
+        job_queue = JobQueue(handle, maxsize=2, workers=1)
+        job_queue.start()
+        job_queue.submit(0)
+
+        # The worker takes the first one, so two more fit in the queue
+        await asyncio.sleep(0)
+
+        job_queue.submit(1)
+        job_queue.submit(2)
+
+        with self.assertRaises(type(errors.JobQueueFullError)) as error:
+            job_queue.submit(3)
+
+        self.assertIs(error.exception, errors.JobQueueFullError)
+        self.assertEqual(job_queue.get_stats().rejected, 1)
+
+        release.set()
+
+        await asyncio.sleep(0.01)
+
+        job_queue.submit(3)
+
+        await job_queue.close(1)
+
+        self.assertEqual(job_queue.get_stats().accepted, 4)
+
+    async def test_failed_job(self):
+        """Test function that checks that a job that raises is done with the
+        failed result and doesn't stop its worker"""
+
+        async def handle(payload: Any) -> Any:
+            if payload == "fail":
+                raise RuntimeError
+
+            return {"success": True}
+
+        job_queue = JobQueue(
+            handle, maxsize=10, workers=1, failed_result={"success": False}
+        )
+        job_queue.start()
+
+        failed = job_queue.submit("fail")
+        succeeded = job_queue.submit("asd")
+
+        await job_queue.close(1)
+
+        self.assertEqual(job_queue.get(failed), ("done", {"success": False}))
+        self.assertEqual(
+            job_queue.get(succeeded), ("done", {"success": True})
+        )
+
+    async def test_results_expire(self):
+        """Test function that checks that results expire the TTL after
+        their job is done, however often they're looked up"""
+
+        clock = mock.Mock(return_value=0)
+
+        async def handle(_: Any) -> Any:
+            return {"success": True}
+
+        job_queue = JobQueue(
+            handle, maxsize=10, workers=1, results_ttl=10, clock=clock
+        )
+        job_queue.start()
+
+        job_id = job_queue.submit("asd")
+
+        await job_queue.close(1)
+
+        for now in (3, 6, 9):
+            clock.return_value = now
+
+            self.assertEqual(
+                job_queue.get(job_id), ("done", {"success": True})
+            )
+
+        clock.return_value = 10
+
+        self.assertEqual(job_queue.get(job_id), (None, {}))
+
+    async def test_close_discards_queued(self):
+        """Test function that checks that the payloads of the jobs still
+        queued once the drain times out are discarded"""
+
+        discarded: List[Any] = []
+
+        async def handle(_: Any) -> Any:
+            await asyncio.sleep(10)
+
+            return {}
+
+        async def discard(payload: Any):
+            discarded.append(payload)
+
+        job_queue = JobQueue(handle, maxsize=10, workers=1, discard=discard)
+        job_queue.start()
+
+        for index in range(3):
+            job_queue.submit(index)
+
+        await asyncio.sleep(0)
+        await job_queue.close(0.01)
+
+        # The first one was running, its handler is the one that cleans up
+        self.assertEqual(discarded, [1, 2])
+        self.assertEqual(job_queue.get_stats().queued, 0)
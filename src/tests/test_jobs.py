@@ -0,0 +1,136 @@
+"""Module that contains the tests for the messages sent in the background,
+through POST /v1/messages with Prefer: respond-async"""
+
+import asyncio
+import time
+import unittest
+from typing import Any
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from src.apiv1.jobs import prefers_async
+from src.main import app
+from src.schemas import message_dto
+from src.utils import errors
+
+
+class TestJobs(unittest.TestCase):
+    """Test class that contains tests for the messages sent in the
+    background"""
+
+    def test_prefers_async(self):
+        """Test function that checks that only the requests that prefer it
+        are responded asynchronously"""
+
+        self.assertTrue(prefers_async("respond-async"))
+        self.assertTrue(prefers_async("wait=10, Respond-Async"))
+        self.assertTrue(prefers_async("respond-async; asd=1"))
+        self.assertFalse(prefers_async(None))
+        self.assertFalse(prefers_async("return=minimal"))
+
+    @mock.patch("src.apiv1.jobs.release_message")
+    @mock.patch("src.whatsapp_provider.provider.send")
+    def test_v1_messages_async(
+        self, send: mock.AsyncMock, release_message: mock.AsyncMock
+    ):
+        """Test function that checks that a message that prefers to be
+        responded asynchronously is accepted before it's sent, that its
+        result can be looked up once it is, and that it's released after"""
+
+        async def send_message(message: Any, deadline: Any) -> Any:
+            await asyncio.sleep(0.05)
+
+            if message.text == "fail":
+                raise errors.UpstreamConnectionError
+
+            self.assertIsNotNone(deadline)
+
+            return {"success": True, "errorMessage": None, "id": "asd"}
+
+        send.side_effect = send_message
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/v1/messages",
+                json=message_dto.text_template,
+                headers={
+                    "Prefer": "respond-async", "X-Request-Timeout": "10"
+                },
+            )
+
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(
+                response.headers["Preference-Applied"], "respond-async"
+            )
+
+            job_id = response.json()["jobId"]
+
+            self.assertEqual(
+                response.headers["Location"], f"/v1/messages/{job_id}"
+            )
+
+            response = client.get(f"/v1/messages/{job_id}")
+
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response.json()["jobId"], job_id)
+            self.assertIn(response.json()["status"], ("queued", "running"))
+
+            time.sleep(0.1)
+
+            response = client.get(f"/v1/messages/{job_id}")
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                response.json(),
+                {"success": True, "errorMessage": None, "id": "asd"},
+            )
+            release_message.assert_awaited_once()
+
+            response = client.post(
+                "/v1/messages",
+                json={**message_dto.text_template, "text": "fail"},
+                headers={"Prefer": "respond-async"},
+            )
+            job_id = response.json()["jobId"]
+
+            time.sleep(0.1)
+
+            response = client.get(f"/v1/messages/{job_id}")
+
+            self.assertEqual(response.status_code, 422)
+            self.assertEqual(
+                response.json()["errorMessage"],
+                errors.UpstreamConnectionError.detail,
+            )
+
+            response = client.get("/v1/messages/asd")
+
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(
+                response.json()["errorMessage"],
+                errors.JobNotFoundError.detail,
+            )
+
+    @mock.patch("src.apiv1.release_message")
+    @mock.patch("src.apiv1.jobs.job_queue.submit")
+    def test_v1_messages_queue_full(
+        self, submit: mock.Mock, release_message: mock.AsyncMock
+    ):
+        """Test function that checks that a message is rejected, and
+        released, if the queue is full"""
+
+        submit.side_effect = errors.JobQueueFullError
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/v1/messages",
+                json=message_dto.text_template,
+                headers={"Prefer": "respond-async"},
+            )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(
+            response.json()["errorMessage"], errors.JobQueueFullError.detail
+        )
+        release_message.assert_awaited_once()
@@ -0,0 +1,94 @@
+"""Module that contains the tests for the lru module"""
+
+import unittest
+from unittest import mock
+
+from src.utils.lru import LRUCache
+
+
+class Clock:
+    """Class that fakes a monotonic clock which only moves when told to"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLRU(unittest.TestCase):
+    """Test class that contains tests for the LRUCache class"""
+
+    def test_evicts_least_recently_used(self):
+        """Test function that checks that the least recently used entry is
+        the one evicted once the cache is full, and that it's counted"""
+
+        on_evict = mock.Mock()
+
+        cache = LRUCache(maxsize=2, on_evict=on_evict)
+
+        cache.put("a", 1)
+        cache.put("b", 2)
+
+        self.assertEqual(cache.get("a"), 1)
+
+        cache.put("c", 3)
+
+        self.assertNotIn("b", cache)
+        self.assertIs(cache.get("b"), None)
+        on_evict.assert_called_once_with("b", 2)
+
+        stats = cache.get_stats()
+
+        self.assertEqual(stats.size, 2)
+        self.assertEqual(stats.hits, 1)
+        self.assertEqual(stats.misses, 1)
+        self.assertEqual(stats.evictions, 1)
+        self.assertEqual(stats.expirations, 0)
+
+    def test_idle_entries_expire(self):
+        """Test function that checks that entries expire after being idle
+        for ttl seconds, both lazily and through expire"""
+
+        clock = Clock()
+        on_evict = mock.Mock()
+
+        cache = LRUCache(
+            maxsize=10, ttl=10, on_evict=on_evict, clock=clock
+        )
+
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.put("c", 3)
+
+        clock.now = 5
+
+        self.assertEqual(cache.get("c"), 3)
+
+        clock.now = 10
+
+        self.assertIs(cache.get("a"), None)
+        self.assertEqual(cache.expire(), 1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(on_evict.call_count, 2)
+
+        clock.now = 15
+
+        self.assertEqual(cache.expire(), 1)
+        self.assertEqual(cache.get_stats().expirations, 3)
+
+    def test_pop_is_not_an_eviction(self):
+        """Test function that checks that popping a key doesn't count as an
+        eviction nor calls on_evict"""
+
+        on_evict = mock.Mock()
+
+        cache = LRUCache(maxsize=2, on_evict=on_evict)
+
+        cache.put("a", 1)
+
+        self.assertEqual(cache.pop("a"), 1)
+        self.assertIs(cache.pop("a"), None)
+
+        on_evict.assert_not_called()
+        self.assertEqual(cache.get_stats().evictions, 0)
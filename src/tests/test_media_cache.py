@@ -0,0 +1,76 @@
+"""Module that contains the tests for the media_cache module"""
+
+import unittest
+
+from src.utils.media_cache import MediaCache, MediaInfo
+
+
+IMAGE = MediaInfo("image", "image/png", "noname.png")
+
+
+class TestMediaCache(unittest.TestCase):
+    """Test class that contains tests for the MediaCache class"""
+
+    def test_hit(self):
+        """Test function that checks that a media is only known to the
+        cache once it's been put, and that hits and misses are counted"""
+
+        cache = MediaCache(maxsize=10)
+
+        media = cache.wrap("image", "data:image/png;base64,YXNk")
+
+        self.assertEqual(media, "data:image/png;base64,YXNk")
+        self.assertIsNone(media.info)
+
+        cache.put(media, IMAGE)
+
+        self.assertEqual(media.info, IMAGE)
+        self.assertEqual(
+            cache.wrap("image", "data:image/png;base64,YXNk").info, IMAGE
+        )
+
+        stats = cache.get_stats()
+
+        self.assertEqual(stats.size, 1)
+        self.assertEqual(stats.hits, 1)
+        self.assertEqual(stats.misses, 1)
+        self.assertEqual(stats.hit_ratio, 0.5)
+
+    def test_kind(self):
+        """Test function that checks that a media validated as one kind
+        isn't reused as another one"""
+
+        cache = MediaCache(maxsize=10)
+
+        cache.put(cache.wrap("image", "data:image/png;base64,YXNk"), IMAGE)
+
+        self.assertIsNone(
+            cache.wrap("audio", "data:image/png;base64,YXNk").info
+        )
+
+    def test_memory(self):
+        """Test function that checks that the memory goes up when a media is
+        put, and is given back when it's evicted"""
+
+        cache = MediaCache(maxsize=1)
+
+        self.assertEqual(cache.get_stats().memory, 0)
+
+        media = cache.wrap("image", "data:image/png;base64,YXNk")
+
+        cache.put(media, IMAGE)
+        memory = cache.get_stats().memory
+
+        self.assertGreater(memory, 0)
+
+        # Putting it again doesn't count it twice
+        cache.put(media, IMAGE)
+
+        self.assertEqual(cache.get_stats().memory, memory)
+
+        cache.put(cache.wrap("image", "data:image/png;base64,YXNkYQ=="), IMAGE)
+
+        stats = cache.get_stats()
+
+        self.assertEqual(stats.memory, memory)
+        self.assertEqual(stats.evictions, 1)
@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 import unittest
+from unittest import mock
 
 import pydantic
 
+from src.schemas import message_dto
 from src.schemas.message_dto import (
     MessageDTO,
     get_filename_from_url,
@@ -25,7 +27,8 @@ from src.schemas.message_dto import (
     document_template_pdf
 )
 
-from src.utils import help_functions, file_examples, errors
+from src.utils import help_functions, file_examples, errors, type_aliases
+from src.utils.media_cache import MediaCache, MediaInfo
 from src.utils.type_aliases import (
     JsonDict,
     Phone,
@@ -663,3 +666,40 @@ data:video/asd{
                 )
             )
         )
+
+    def test_media_cache(self):
+        """Test function that checks that a base64 media is validated only
+        the first time, that its filename is kept, and that it's only
+        reused as the media type it was validated as"""
+
+        validate = mock.Mock(wraps=type_aliases.is_base64_data_uri)
+
+        with mock.patch.object(
+            message_dto, "media_cache", MediaCache(maxsize=10)
+        ) as media_cache, mock.patch.object(
+            type_aliases, "is_base64_data_uri", validate
+        ):
+            for _ in range(3):
+                message = MessageDTO(**document_template_base64_pdf)
+
+                self.assertEqual(message.filename, "noname.pdf")
+
+            self.assertEqual(validate.call_count, 1)
+            self.assertEqual(
+                message.document.info,
+                MediaInfo("application", "application/pdf", "noname.pdf")
+            )
+
+            # The same file as another media type is validated again
+            with self.assertRaises(pydantic.ValidationError):
+                MessageDTO(**{
+                    **required_template,
+                    "image": document_template_base64_pdf["document"],
+                })
+
+            stats = media_cache.get_stats()
+
+            self.assertEqual(stats.size, 1)
+            self.assertEqual(stats.hits, 2)
+            self.assertEqual(stats.misses, 2)
+            self.assertGreater(stats.memory, 0)
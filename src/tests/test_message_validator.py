@@ -0,0 +1,158 @@
+"""Module that contains the tests for the message_validator module"""
+
+import random
+import unittest
+from typing import Any, Tuple
+from unittest import mock
+
+# pylint: disable-next=no-name-in-module
+from pydantic import ValidationError
+
+from src.schemas import message_dto
+from src.schemas.message_dto import (
+    MessageDTO,
+    text_template,
+    required_template,
+    image_template,
+    image_template_base64,
+    video_template,
+    video_template_base64,
+    audio_template,
+    audio_template_base64,
+    document_template_base64_docx,
+    document_template_base64_odt,
+    document_template_base64_pdf,
+    document_template_pdf,
+)
+from src.schemas.message_validator import MessageValidator
+from src.utils import file_examples
+from src.utils.media_cache import MediaCache
+
+
+TEMPLATES = (
+    text_template,
+    image_template,
+    image_template_base64,
+    video_template,
+    video_template_base64,
+    audio_template,
+    audio_template_base64,
+    document_template_base64_docx,
+    document_template_base64_odt,
+    document_template_base64_pdf,
+    document_template_pdf,
+)
+
+# Values the fuzzed messages are made of, both valid and invalid ones
+VALUES: Tuple[Any, ...] = (
+    None, "", "asd", 1, 1.5, True, [], ["asd"], {}, {"a": 1},
+    "5492914141794", "54929141417941", "12345678", "5492914141794asd",
+    "https://example.com/image.png", "http://example.com", "example.com",
+    "https://", "ftp://example.com/file.pdf", "data:image/png;base64,",
+    "data:image/png;base64,YXNk", "data:image/ddddd;base64,YXNk",
+    "data:audio/ogg;base64,YXNk", "data:application/pdf;base64,YXNk",
+    "data:video/mp4;base64,YXN", file_examples.base64_image,
+    file_examples.base64_audio, file_examples.base64_document_pdf,
+    "x" * 20001,
+)
+
+FIELDS = (
+    "text", "image", "video", "audio", "document", "phone", "token",
+    "instance", "filename", "other",
+)
+
+
+def validate(parse_obj, data):
+    """Helper function that returns either the message a parse_obj function
+    validates, or the errors it raises"""
+
+    try:
+        message = parse_obj(data)
+
+    except ValidationError as exception:
+        return None, exception.errors()
+
+    return (
+        (message.dict(), message.__fields_set__, type(message.image)),
+        None,
+    )
+
+
+class TestMessageValidator(unittest.TestCase):
+    """Test class that contains tests for the MessageValidator class"""
+
+    def setUp(self):
+        patcher = mock.patch.object(message_dto, "media_cache", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.validator = MessageValidator(MessageDTO)
+
+    def test_templates(self):
+        """Test function that checks that every kind of message is accepted
+        in a single pass, into the same message the model validates"""
+
+        for template in TEMPLATES:
+            with self.subTest(template=sorted(template)):
+                self.assertIsNotNone(self.validator.validate(template))
+                self.assertEqual(
+                    validate(self.validator.parse_obj, template),
+                    validate(MessageDTO.parse_obj, template),
+                )
+
+        message = self.validator.parse_obj({
+            **document_template_base64_pdf, "filename": "asd.txt"
+        })
+
+        self.assertEqual(message.filename, "noname.pdf")
+        self.assertEqual(
+            message.__fields_set__,
+            {*required_template, "document", "filename"},
+        )
+
+    def test_same_as_model(self):
+        """Test function that checks that fuzzed messages are validated
+        into the same message, or the same errors, as the model does"""
+
+        rng = random.Random(0)
+
+        for _ in range(3000):
+            data = {
+                field: rng.choice(VALUES)
+                for field in rng.sample(FIELDS, rng.randint(0, len(FIELDS)))
+            }
+
+            # Most of them valid credentials, so the rest is what fails
+            if rng.random() < 0.7:
+                data.update(required_template)
+
+            with self.subTest(data=data):
+                self.assertEqual(
+                    validate(self.validator.parse_obj, data),
+                    validate(MessageDTO.parse_obj, data),
+                )
+
+        for data in (None, "asd", 1, [], [("text", "asd")], [1, 2]):
+            with self.subTest(data=data):
+                self.assertEqual(
+                    validate(self.validator.parse_obj, data),
+                    validate(MessageDTO.parse_obj, data),
+                )
+
+    def test_media_cache(self):
+        """Test function that checks that the media cache is looked up and
+        filled as the model does"""
+
+        with mock.patch.object(
+            message_dto, "media_cache", MediaCache(maxsize=10)
+        ) as media_cache:
+            for _ in range(3):
+                self.assertEqual(
+                    self.validator.parse_obj(image_template_base64).filename,
+                    "noname.jpg",
+                )
+
+            stats = media_cache.get_stats()
+
+        self.assertEqual(stats.size, 1)
+        self.assertEqual(stats.hits, 2)
@@ -0,0 +1,223 @@
+"""Module that contains the tests for POST /v1/messages:stream"""
+
+import asyncio
+import unittest
+from typing import Any, AsyncIterator, Iterator, List, Optional
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from src.apiv1.ndjson_stream import iter_records, stream_results
+from src.env_variables import env_variables
+from src.main import app
+from src.schemas import message_dto
+from src.tests.helpers import counting_send
+from src.utils import errors, fast_json
+
+
+client = TestClient(app)
+
+
+async def iter_chunks(chunks: List[bytes]) -> AsyncIterator[bytes]:
+    """Helper function that yields the chunks of a body as it's received"""
+
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect_records(
+    chunks: List[bytes], max_record_size: int
+) -> List[Optional[bytes]]:
+    """Helper function that returns the records of a body"""
+
+    return [
+        record async for record in iter_records(
+            iter_chunks(chunks), max_record_size
+        )
+    ]
+
+
+class TestNDJSONStream(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains tests for the streams of messages"""
+
+    async def test_iter_records(self):
+        """Test function that checks that records are split by lines
+        whatever the chunks they're received in, that blank lines are
+        skipped and that the lines that are too large are discarded"""
+
+        self.assertEqual(
+            await collect_records(
+                [b'{"a"', b': 1}\n\n  \r\n{"b": 2}\n{', b'"c": 3}'], 10
+            ),
+            [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}'],
+        )
+        self.assertEqual(
+            await collect_records(
+                [b"12345\n1234567", b"89012345", b"6789\n123\n", b"1" * 11],
+                10,
+            ),
+            [b"12345", None, b"123", None],
+        )
+        self.assertEqual(
+            await collect_records([b"12345678901\n123\n"], 10),
+            [None, b"123"],
+        )
+
+    async def test_backpressure(self):
+        """Test function that checks that records aren't read any further
+        while as many as the concurrency are waiting to be sent"""
+
+        received: List[int] = []
+        release = asyncio.Event()
+
+        async def records() -> AsyncIterator[Optional[bytes]]:
+            for index in range(20):
+                received.append(index)
+
+                yield fast_json.dumps(
+                    {**message_dto.text_template, "text": str(index)}
+                )
+
+        async def send_message(message: Any, _: Any) -> Any:
+            await release.wait()
+
+            return {"success": True, "errorMessage": None, "id": message.text}
+
+        provider = mock.Mock(send=mock.AsyncMock(side_effect=send_message))
+        lines = stream_results(provider, records(), 4, None, 1024)
+        first_line = asyncio.ensure_future(lines.__anext__())
+
+        await asyncio.sleep(0.05)
+
+        # The reader waits with the record after the ones in flight
+        self.assertEqual(len(received), 5)
+        self.assertEqual(provider.send.call_count, 4)
+
+        release.set()
+
+        results = [fast_json.loads(await first_line)]
+        results += [fast_json.loads(line) async for line in lines]
+
+        self.assertEqual(
+            [result["id"] for result in results],
+            [str(index) for index in range(20)],
+        )
+
+    @mock.patch("logging.Logger.exception")
+    @mock.patch("src.apiv1.ndjson_stream.parse_record")
+    async def test_unexpected_error(
+        self, parse_record: mock.AsyncMock, logger_exception: mock.MagicMock
+    ):
+        """Test function that checks that an unexpected error while sending
+        a record only fails its own result, and the stream carries on"""
+
+        parse_record.side_effect = [
+            (message_dto.MessageDTO(**message_dto.text_template), []),
+            RuntimeError,
+            (message_dto.MessageDTO(**message_dto.text_template), []),
+        ]
+        provider = mock.Mock(send=mock.AsyncMock(return_value={
+            "success": True, "errorMessage": None, "id": "asd"
+        }))
+
+        results = [
+            fast_json.loads(line) async for line in stream_results(
+                provider, iter_chunks([b"", b"", b""]), 4, None, 1024
+            )
+        ]
+
+        self.assertEqual(
+            [result["success"] for result in results], [True, False, True]
+        )
+        self.assertEqual(
+            results[1]["errorMessage"], errors.UnexpectedSendError.detail
+        )
+        logger_exception.assert_called_once()
+
+
+class TestNDJSONStreamEndpoint(unittest.TestCase):
+    """Test class that contains tests for the /v1/messages:stream
+    endpoint"""
+
+    @mock.patch("src.whatsapp_provider.provider.send")
+    def test_v1_messages_stream(self, send: mock.AsyncMock):
+        """Test function that checks that the records of a stream are sent
+        up to the concurrency of streams at once, and that every one of them
+        gets its own result in order, the invalid ones, the ones that were
+        too large and the ones that failed to be sent included"""
+
+        in_flight: List[int] = [0, 0]
+
+        send.side_effect = counting_send(in_flight)
+
+        records = [
+            {**message_dto.text_template, "text": str(index)}
+            for index in range(30)
+        ]
+        records[3] = {**message_dto.text_template, "text": "fail"}
+        records[7] = {**message_dto.text_template, "phone": "asd"}
+        records[9] = {**message_dto.text_template, "text": "a" * 2048}
+
+        def body() -> Iterator[bytes]:
+            # Records are split across chunks, as they're received
+            for record in records:
+                line = fast_json.dumps(record) + b"\n"
+
+                yield line[:20]
+                yield line[20:]
+
+        with mock.patch.multiple(
+            env_variables, STREAM_CONCURRENCY=4, STREAM_MAX_RECORD_SIZE=1024
+        ):
+            response = client.post(
+                "/v1/messages:stream",
+                data=body(),
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.headers["Content-Type"], "application/x-ndjson"
+        )
+        self.assertEqual(send.call_count, 28)
+        self.assertEqual(in_flight[1], 4)
+
+        results = [
+            fast_json.loads(line) for line in response.content.splitlines()
+        ]
+
+        self.assertEqual(len(results), 30)
+
+        for index, result in enumerate(results):
+            if index in (3, 7, 9):
+                self.assertFalse(result["success"])
+                self.assertIsNone(result["id"])
+
+            else:
+                self.assertEqual(
+                    result,
+                    {"success": True, "errorMessage": None, "id": str(index)},
+                )
+
+        self.assertEqual(
+            results[3]["errorMessage"], errors.UpstreamConnectionError.detail
+        )
+        self.assertIn("phone", results[7]["errorMessage"])
+        self.assertIn(
+            str(errors.RecordTooLargeError(limit=1024)),
+            results[9]["errorMessage"],
+        )
+
+    def test_v1_messages_stream_invalid_json(self):
+        """Test function that checks that a line that isn't JSON only fails
+        its own result"""
+
+        response = client.post(
+            "/v1/messages:stream",
+            data=b"asd\n\n",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.content.splitlines()), 1)
+        self.assertFalse(fast_json.loads(response.content)["success"])
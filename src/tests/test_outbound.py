@@ -0,0 +1,85 @@
+"""Module that contains the tests for the outbound messages"""
+
+import dataclasses
+import unittest
+
+from starlette.datastructures import UploadFile
+
+from src.schemas import message_dto
+from src.schemas.message_dto import MessageDTO
+from src.schemas.upload_dto import UploadDTO
+from src.utils.dispatch import get_message_kind
+from src.whatsapp_provider.chat_api_request_schemas import (
+    SendAudioSchema, SendFileSchema, SendMessageSchema
+)
+from src.whatsapp_provider.outbound import (
+    CHAT_API_TABLE,
+    SEND_AUDIO,
+    SEND_FILE,
+    SEND_MESSAGE,
+    get_outbound_message,
+)
+from src.whatsapp_provider.streaming import Base64File
+
+
+class TestOutbound(unittest.TestCase):
+    """Test class that contains tests for the outbound messages"""
+
+    def test_same_as_schemas(self):
+        """Test function that checks that the outbound messages are sent to
+        the same action, with the same body, as the Chat API schemas the
+        messages used to be validated again with"""
+
+        for template, schema, action in (
+            (message_dto.text_template, SendMessageSchema, SEND_MESSAGE),
+            (message_dto.image_template, SendFileSchema, SEND_FILE),
+            (message_dto.image_template_base64, SendFileSchema, SEND_FILE),
+            (
+                message_dto.document_template_base64_pdf,
+                SendFileSchema,
+                SEND_FILE,
+            ),
+            (message_dto.audio_template, SendAudioSchema, SEND_AUDIO),
+            (message_dto.audio_template_base64, SendAudioSchema, SEND_AUDIO),
+        ):
+            message = MessageDTO.parse_obj(template)
+            outbound = get_outbound_message(message)
+            json_data = outbound.to_json()
+
+            self.assertEqual(
+                CHAT_API_TABLE[get_message_kind(message)].action, action
+            )
+            self.assertEqual(json_data, schema(**json_data).dict())
+            self.assertEqual(list(json_data), list(schema.__fields__))
+
+    def test_no_copies(self):
+        """Test function that checks that the media of the message is the
+        very same string in the body, and that outbound messages can't be
+        changed or given other attributes"""
+
+        message = MessageDTO.parse_obj(message_dto.image_template_base64)
+        outbound = get_outbound_message(message)
+
+        self.assertIs(outbound.to_json()["body"], message.image)
+        self.assertFalse(hasattr(outbound, "__dict__"))
+
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            outbound.phone = "asd"  # type: ignore
+
+    def test_upload(self):
+        """Test function that checks that the file of an upload is sent in
+        base64 as it's read"""
+
+        message = UploadDTO.construct(
+            phone="5492914141794",
+            file=UploadFile("asd"),
+            kind="audio",
+            mimetype="audio/ogg",
+            filename=None,
+        )
+        outbound = get_outbound_message(message)
+
+        self.assertEqual(
+            CHAT_API_TABLE[get_message_kind(message)].action, SEND_AUDIO
+        )
+        self.assertIsInstance(outbound.to_json()["audio"], Base64File)
@@ -0,0 +1,239 @@
+"""Module that contains the tests for the pooled transport of
+WhatsappProvider"""
+
+import asyncio
+import unittest
+from unittest import mock
+
+import httpx
+from httpx import Request, Response
+
+from src.utils.dns_cache import DNSCache
+from src.whatsapp_provider.pool import (
+    PooledTransport, KeyedClientPool, CachingDNSBackend
+)
+
+
+class FakeConnection:
+    """Class that fakes an httpcore connection of the pool"""
+
+    def __init__(self, idle: bool):
+        self.idle = idle
+
+    def is_idle(self) -> bool:
+        """Method that tells whether the fake connection is idle or not"""
+
+        return self.idle
+
+
+class TestPool(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains the tests for the pooled transport"""
+
+    async def test_stats(self):
+        """Test function that checks that the requests and the opened
+        connections are counted, so the reuse rate is properly computed"""
+
+        transport = PooledTransport()
+
+        stats = transport.get_stats()
+
+        self.assertEqual(stats.requests, 0)
+        self.assertEqual(stats.reuse_rate, 0.0)
+
+        connections = [FakeConnection(idle=True)]
+
+        def get_connections():
+            return set(connections)
+
+        request = Request("POST", "https://asd.com/asd/sendMessage")
+
+        with mock.patch(
+            "httpx.AsyncHTTPTransport.handle_async_request",
+            return_value=Response(200, json={"sent": True}),
+        ), mock.patch.object(
+            transport, "_get_connections", side_effect=get_connections
+        ):
+            for _ in range(3):
+                await transport.handle_async_request(request)
+
+            connections.append(FakeConnection(idle=False))
+
+            await transport.handle_async_request(request)
+
+            stats = transport.get_stats()
+
+        self.assertEqual(stats.requests, 4)
+        self.assertEqual(stats.connections_opened, 2)
+        self.assertEqual(stats.open_connections, 2)
+        self.assertEqual(stats.idle_connections, 1)
+        self.assertEqual(stats.reuse_rate, 0.5)
+
+    async def test_http_versions(self):
+        """Test function that checks that the HTTP version of every response
+        is counted, which tells whether HTTP/2 was negotiated or not"""
+
+        transport = PooledTransport()
+
+        request = Request("POST", "https://asd.com/asd/sendMessage")
+
+        with mock.patch(
+            "httpx.AsyncHTTPTransport.handle_async_request",
+            side_effect=[
+                Response(200, extensions={"http_version": b"HTTP/2"}),
+                Response(200, extensions={"http_version": b"HTTP/2"}),
+                Response(200, extensions={"http_version": b"HTTP/1.1"}),
+            ],
+        ):
+            for _ in range(3):
+                await transport.handle_async_request(request)
+
+        self.assertEqual(
+            transport.get_stats().http_versions,
+            {"HTTP/2": 2, "HTTP/1.1": 1}
+        )
+
+
+class TestCachingDNSBackend(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains the tests for the caching DNS backend"""
+
+    async def test_connects_to_cached_address(self):
+        """Test function that checks that connections go to the addresses
+        of the DNS cache, skipping the ones that refuse them, while the
+        request keeps its hostname"""
+
+        hosts = []
+
+        async def handle(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ):
+            head = await reader.readuntil(b"\r\n\r\n")
+
+            hosts.append(
+                [
+                    line for line in head.split(b"\r\n")
+                    if line.lower().startswith(b"host:")
+                ][0]
+            )
+
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        dns_cache = DNSCache()
+        dns_cache.resolve = mock.AsyncMock(  # type: ignore
+            return_value=["127.0.0.2", "127.0.0.1"]
+        )
+
+        # 127.0.0.2 refuses the connection, nothing listens there
+        async with httpx.AsyncClient(
+            transport=PooledTransport(backend=CachingDNSBackend(dns_cache))
+        ) as client:
+            response = await client.get(f"http://chat.test:{port}/")
+
+        server.close()
+        await server.wait_closed()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(hosts, [f"Host: chat.test:{port}".encode()])
+        dns_cache.resolve.assert_called_once_with("chat.test")
+
+
+class TestKeyedClientPool(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains the tests for the keyed client pool"""
+
+    async def test_lease_and_eviction(self):
+        """Test function that checks that each key gets a client of its own,
+        that it's reused, and that evicted clients are closed once they're
+        no longer leased"""
+
+        pool = KeyedClientPool(
+            make_transport=PooledTransport, max_clients=1, idle_ttl=60
+        )
+
+        async with pool.lease("asd") as client:
+            async with pool.lease("asd") as same_client:
+                self.assertIs(client, same_client)
+
+            async with pool.lease("qwe") as other_client:
+                self.assertIsNot(client, other_client)
+
+                # asd was evicted, but it's still being used
+                self.assertFalse(client.is_closed)
+
+        self.assertTrue(client.is_closed)
+        self.assertFalse(other_client.is_closed)
+
+        stats = pool.get_stats()
+
+        self.assertEqual(stats.clients, 1)
+        self.assertEqual(stats.hits, 1)
+        self.assertEqual(stats.misses, 2)
+        self.assertEqual(stats.evictions, 1)
+        self.assertEqual(stats.leased_clients, 0)
+
+        await pool.close()
+
+        self.assertTrue(other_client.is_closed)
+        self.assertEqual(pool.get_stats().clients, 0)
+
+    async def test_evicted_while_closing(self):
+        """Test function that checks that a client can't be evicted and
+        closed by another lease while it's being handed out"""
+
+        pool = KeyedClientPool(
+            make_transport=PooledTransport, max_clients=1, idle_ttl=60
+        )
+        aclose = httpx.AsyncClient.aclose
+
+        async def slow_aclose(client: httpx.AsyncClient):
+            await asyncio.sleep(0.01)
+            await aclose(client)
+
+        async def is_closed_while_leased(key: str) -> bool:
+            async with pool.lease(key) as client:
+                await asyncio.sleep(0.05)
+
+                return client.is_closed
+
+        async with pool.lease("zxc"):
+            pass
+
+        with mock.patch.object(httpx.AsyncClient, "aclose", slow_aclose):
+            # The lease of asd waits for zxc to be closed, while qwe evicts
+            # it
+            results = await asyncio.gather(
+                is_closed_while_leased("asd"), is_closed_while_leased("qwe")
+            )
+
+        self.assertEqual(results, [False, False])
+
+        await pool.close()
+
+    async def test_idle_clients_are_closed(self):
+        """Test function that checks that the clients of keys that have been
+        idle for idle_ttl seconds are closed on the next lease"""
+
+        clock = mock.Mock(return_value=0)
+
+        pool = KeyedClientPool(
+            make_transport=PooledTransport,
+            max_clients=10,
+            idle_ttl=10,
+            clock=clock,
+        )
+
+        async with pool.lease("asd") as client:
+            pass
+
+        clock.return_value = 10
+
+        async with pool.lease("qwe"):
+            pass
+
+        self.assertTrue(client.is_closed)
+        self.assertEqual(pool.get_stats().expirations, 1)
+
+        await pool.close()
@@ -0,0 +1,95 @@
+"""Module that contains the tests for the rate_limiter module"""
+
+import unittest
+from unittest import mock
+
+from fastapi.exceptions import HTTPException
+
+from src.utils import errors, help_functions
+from src.utils.rate_limiter import RateLimiter, TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test class that contains tests for the TokenBucket class"""
+
+    def test_reserve(self):
+        """Test function that checks that the burst goes through without
+        waiting, and that the next reservations wait for their turn"""
+
+        clock = mock.Mock(return_value=0)
+
+        bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0.5)
+        self.assertEqual(bucket.reserve(), 1)
+
+        bucket.cancel()
+
+        clock.return_value = 10
+
+        # The bucket is refilled up to the burst only
+        bucket.reserve()
+        bucket.reserve()
+
+        self.assertEqual(bucket.reserve(), 0.5)
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains tests for the RateLimiter class"""
+
+    @mock.patch("asyncio.sleep")
+    async def test_wait_and_reject(self, sleep: mock.MagicMock):
+        """Test function that checks that requests over the rate wait in the
+        queue, and that they're rejected once the wait is too long"""
+
+        clock = mock.Mock(return_value=0)
+
+        rate_limiter = RateLimiter(
+            rate=1, burst=1, queue_size=10, max_wait=2, clock=clock
+        )
+
+        self.assertEqual(await rate_limiter.wait("asd"), 0)
+        self.assertEqual(await rate_limiter.wait("asd"), 1)
+        self.assertEqual(await rate_limiter.wait("asd"), 2)
+
+        sleep.assert_has_calls([mock.call(1), mock.call(2)])
+
+        async def wait():
+            await rate_limiter.wait("asd")
+
+        exc = await help_functions.get_exception_async(HTTPException, wait)
+
+        self.assertIs(exc, errors.RateLimitedError)
+
+        # Other keys have buckets of their own
+        self.assertEqual(await rate_limiter.wait("qwe"), 0)
+
+        stats = rate_limiter.get_stats()
+
+        self.assertEqual(stats.buckets, 2)
+        self.assertEqual(stats.admitted, 4)
+        self.assertEqual(stats.delayed, 2)
+        self.assertEqual(stats.rejected, 1)
+        self.assertEqual(stats.total_wait, 3)
+        self.assertEqual(stats.max_wait, 2)
+
+    async def test_full_queue(self):
+        """Test function that checks that requests are rejected while the
+        queue of their key is full"""
+
+        rate_limiter = RateLimiter(
+            rate=1, burst=1, queue_size=1, max_wait=100
+        )
+
+        await rate_limiter.wait("asd")
+
+        rate_limiter.buckets.get("asd").queued = 1
+
+        async def wait():
+            await rate_limiter.wait("asd")
+
+        exc = await help_functions.get_exception_async(HTTPException, wait)
+
+        self.assertIs(exc, errors.RateLimitedError)
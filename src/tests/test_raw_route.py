@@ -0,0 +1,68 @@
+"""Module that contains the tests for the raw_route module"""
+
+import unittest
+from typing import Any, Dict, Tuple
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.apiv1 import exception_handlers, messages
+from src.apiv1.raw_route import RawMessagesRoute
+from src.main import app
+from src.schemas.message_dto import text_template
+from src.whatsapp_provider import provider as whatsapp_provider
+
+
+client = TestClient(app)
+
+raw_app = FastAPI()
+
+exception_handlers.configure(raw_app)
+
+raw_app.router.add_api_route(
+    "/v1/messages",
+    messages,
+    methods=["POST"],
+    route_class_override=RawMessagesRoute,
+)
+
+raw_client = TestClient(raw_app)
+
+
+class TestRawMessagesRoute(unittest.TestCase):
+    """Test class that contains tests for the RawMessagesRoute class"""
+
+    @mock.patch.object(
+        whatsapp_provider,
+        "send",
+        new_callable=mock.AsyncMock,
+        return_value={"success": True, "errorMessage": None, "id": "asd"},
+    )
+    def test_same_as_fastapi(self, send: mock.AsyncMock):
+        """Test function that checks that the raw route responds as the
+        FastAPI one does, to valid and invalid requests alike"""
+
+        requests: Tuple[Dict[str, Any], ...] = (
+            {"json": text_template},
+            {"json": text_template, "headers": {"X-Request-Timeout": "5"}},
+            {"json": text_template, "headers": {"X-Request-Timeout": "-1"}},
+            {"json": text_template, "headers": {"X-Request-Timeout": "a"}},
+            {"json": {"text": "asd"}, "headers": {"X-Request-Timeout": "a"}},
+            {"json": {**text_template, "image": "asd"}},
+            {"data": b'{"text": '},
+            {},
+        )
+
+        for kwargs in requests:
+            with self.subTest(kwargs=kwargs):
+                response = client.post("/v1/messages", **kwargs)
+                raw_response = raw_client.post("/v1/messages", **kwargs)
+
+                self.assertEqual(
+                    raw_response.status_code, response.status_code
+                )
+                self.assertEqual(raw_response.json(), response.json())
+
+        self.assertEqual(send.await_count, 4)
+        self.assertIsNotNone(send.await_args_list[-1].args[1])
@@ -0,0 +1,88 @@
+"""Module that contains the tests for the retry module"""
+
+import unittest
+from unittest import mock
+
+from src.utils.retry import RetryBudget, RetryPolicy, parse_retry_after
+
+
+class TestRetry(unittest.TestCase):
+    """Test class that contains tests for the retry module"""
+
+    def test_parse_retry_after(self):
+        """Test function that checks that Retry-After is parsed both in
+        seconds and as an HTTP date, and that bad values are ignored"""
+
+        self.assertEqual(parse_retry_after("3"), 3)
+        self.assertEqual(
+            parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0
+        )
+
+        for value in (None, "", "soon", "-1"):
+            self.assertIs(parse_retry_after(value), None)
+
+    def test_backoff_full_jitter(self):
+        """Test function that checks that the backoff doubles per attempt
+        up to the max delay, and that it's jittered all the way down to
+        zero"""
+
+        policy = RetryPolicy(
+            max_attempts=10,
+            base_delay=0.1,
+            max_delay=0.3,
+            budget=RetryBudget(ratio=0.1, min_retries=10),
+            rng=lambda: 1,
+        )
+
+        self.assertEqual(policy.backoff(1), 0.1)
+        self.assertEqual(policy.backoff(2), 0.2)
+        self.assertEqual(policy.backoff(3), 0.3)
+
+        policy.rng = lambda: 0
+
+        self.assertEqual(policy.backoff(3), 0)
+
+    def test_get_delay(self):
+        """Test function that checks when a failed attempt mustn't be
+        retried, and that Retry-After is honored"""
+
+        policy = RetryPolicy(
+            max_attempts=2,
+            base_delay=0.1,
+            max_delay=1,
+            budget=RetryBudget(ratio=0.1, min_retries=10),
+        )
+
+        self.assertEqual(policy.get_delay(1, retry_after=0.5), 0.5)
+        self.assertIs(policy.get_delay(1, retry_after=5), None)
+        self.assertIs(
+            policy.get_delay(1, retry_after=0.5, time_left=0.5), None
+        )
+        self.assertIs(policy.get_delay(2), None)
+
+        stats = policy.get_stats()
+
+        self.assertEqual(stats.retries, 1)
+        self.assertEqual(stats.exhausted, 1)
+
+    def test_budget(self):
+        """Test function that checks that retries can't go past the ratio
+        of the requests of the window, and that the window moves on"""
+
+        clock = mock.Mock(return_value=0)
+
+        budget = RetryBudget(ratio=0.5, min_retries=1, clock=clock)
+
+        for _ in range(4):
+            budget.on_request()
+
+        self.assertEqual(budget.get_left(), 3)
+
+        for _ in range(3):
+            self.assertTrue(budget.try_retry())
+
+        self.assertFalse(budget.try_retry())
+
+        clock.return_value = 10
+
+        self.assertEqual(budget.get_left(), 1)
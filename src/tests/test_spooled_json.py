@@ -0,0 +1,192 @@
+"""Module that contains the tests for the spooled_json module"""
+
+import io
+import json
+import random
+import unittest
+from typing import Any, List, Optional
+
+from starlette.datastructures import UploadFile
+
+from src.utils import file_examples
+from src.utils.base64_validator import is_base64_data_uri
+from src.utils.spooled_json import (
+    CHUNK_SIZE,
+    SpooledString,
+    is_spooled_base64_data_uri,
+    parse_spooled_object,
+    spool_stream,
+)
+
+
+# Values the objects are made of, the strings are long enough to be spooled
+VALUES = (
+    None, True, False, 0, -1.5e3, "", "asd", "á\\\"\n", "x" * 40,
+    "data:image/png;base64," + "QUJD" * 10, 'x"' * 20, "\x7f" * 20,
+)
+
+
+def make_file(content: bytes) -> UploadFile:
+    """Helper function that makes a spool file with the given content"""
+
+    return UploadFile("body", io.BytesIO(content))
+
+
+def unspool(data: Any) -> Any:
+    """Helper function that reads the spooled strings of an object into
+    memory"""
+
+    return {
+        key: "".join(value.iter_text(chunk_size=7))
+        if isinstance(value, SpooledString) else value
+        for key, value in data.items()
+    }
+
+
+def spool(value: str) -> SpooledString:
+    """Helper function that spools a string as the value of an object"""
+
+    data = parse_spooled_object(
+        make_file(json.dumps({"a": value}).encode("ascii")), 16
+    )
+
+    assert data is not None and isinstance(data["a"], SpooledString)
+
+    return data["a"]
+
+
+class TestSpooledJSON(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains tests for the parser of spooled bodies"""
+
+    def test_same_as_json(self):
+        """Test function that checks that the objects parsed are the ones
+        json.loads parses, with the strings longer than the threshold
+        spooled, and whitespace taken anywhere"""
+
+        generator = random.Random(0)
+
+        for _ in range(500):
+            data = {
+                f"key{index}": generator.choice(VALUES)
+                for index in range(generator.randint(0, 5))
+            }
+            indent: Optional[int] = generator.choice((None, 2))
+            content = json.dumps(data, indent=indent).encode("utf-8")
+
+            parsed = parse_spooled_object(make_file(content), 16)
+
+            if parsed is None:
+                # Only long strings that are escaped are given up on
+                self.assertTrue(any(
+                    isinstance(value, str) and
+                    len(json.dumps(value)) - 2 > 16 and
+                    json.dumps(value)[1:-1] != value
+                    for value in data.values()
+                ))
+
+                continue
+
+            self.assertEqual(unspool(parsed), data)
+
+            for key, value in parsed.items():
+                self.assertEqual(
+                    isinstance(value, SpooledString),
+                    isinstance(data[key], str) and len(data[key]) > 16,
+                )
+
+    def test_gives_up(self):
+        """Test function that checks that anything but a flat JSON object
+        is left to be parsed whole"""
+
+        for content in (
+            b"", b"  ", b"[]", b'"asd"', b"1", b"{", b'{"a"}', b'{"a": }',
+            b'{"a": 1,}', b'{"a": 1} 1', b'{"a": {}}', b'{"a": []}',
+            b'{"a": 1 2}', b'{"a": nul}', b'{"a": NaN}', b'{"a": "asd}',
+            b'{"' + b"a" * 20 + b'": 1}', b'{"a": ' + b"1" * 100 + b"}",
+            b'{"a": "' + b"x" * 20 + b'\\n"}',
+            b'{"a": "\\n' + b"x" * 20 + b'"}',
+            b'{"a": "' + "á".encode("utf-8") * 20 + b'"}',
+        ):
+            self.assertIsNone(
+                parse_spooled_object(make_file(content), 16), content
+            )
+
+        self.assertEqual(parse_spooled_object(make_file(b" {} "), 16), {})
+
+    def test_chunk_boundaries(self):
+        """Test function that checks that values split across the chunks
+        the file is read in are parsed whole"""
+
+        content = json.dumps({
+            "text": "x" * (CHUNK_SIZE - 11),
+            "image": file_examples.base64_image * 400,
+            "escaped": "\\" * 8,
+            "number": 123456,
+        }).encode("ascii")
+
+        for threshold in (16, CHUNK_SIZE * 2):
+            parsed = parse_spooled_object(make_file(content), threshold)
+
+            self.assertIsNotNone(parsed)
+            self.assertEqual(unspool(parsed), json.loads(content))
+
+    def test_base64_data_uri(self):
+        """Test function that checks that spooled strings are taken as
+        base64 data URIs if is_base64_data_uri takes them as well, unless
+        their data has a separator too"""
+
+        data = "QUJD" * (CHUNK_SIZE // 4)
+        values: List[str] = [
+            file_examples.base64_image,
+            file_examples.base64_audio,
+            file_examples.base64_document_pdf,
+            f"data:image/png;base64,{data}{data}QQ==",
+            f"data:image/png;base64,{data[:-4]}QQ=={data}",
+            f"data:image/png;base64,{data}Q",
+            f"data:image/png;base64,{data}Q===",
+            f"data:image/png;base64,{data};base64,QUJD",
+            f"data:image/png;base64,{data}*UJD",
+            f"data:image/;base64,{data}",
+            f"data:imagepng;base64,{data}",
+            f"image/png;base64,{data}",
+            f"data:image/png;base66,{data}",
+        ]
+
+        for value in values:
+            spooled = spool(value)
+
+            for media_type in (None, "image", "audio", "application"):
+                # A separator after the first one is taken in memory only,
+                # the body is validated whole when it isn't taken spooled
+                self.assertEqual(
+                    is_spooled_base64_data_uri(spooled, media_type),
+                    is_base64_data_uri(value, media_type) and
+                    value.count(";base64,") == 1,
+                    (value[:40], media_type),
+                )
+
+    async def test_spool_stream(self):
+        """Test function that checks that a body is written to a file that
+        rolls over to disk past the threshold, and that spooled strings are
+        sent as they are in it"""
+
+        async def stream():
+            yield b'{"image": "'
+            yield file_examples.base64_image.encode("ascii")
+            yield b'"}'
+
+        file = await spool_stream(stream(), 64)
+
+        # pylint: disable-next=protected-access
+        self.assertFalse(file._in_memory)
+
+        data = parse_spooled_object(file, 64)
+
+        assert data is not None
+
+        self.assertEqual(
+            b"".join([chunk async for chunk in data["image"].iter_chunks(7)]),
+            file_examples.base64_image.encode("ascii"),
+        )
+
+        await file.close()
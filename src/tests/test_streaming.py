@@ -0,0 +1,119 @@
+"""Module that contains the tests for the streaming JSON body"""
+
+import base64
+import json
+import unittest
+from typing import List
+
+import httpx
+from starlette.datastructures import UploadFile
+
+from src.schemas import message_dto
+from src.whatsapp_provider.streaming import Base64File, StreamingJSONBody
+
+
+async def read_chunks(body: StreamingJSONBody) -> List[bytes]:
+    """Helper function that reads the whole body, chunk by chunk"""
+
+    return [chunk async for chunk in body]
+
+
+class TestStreamingJSONBody(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains tests for the StreamingJSONBody class"""
+
+    async def test_same_bytes_as_json(self):
+        """Test function that checks that the body is made of the same bytes
+        json.dumps makes, with a matching Content-Length, in chunks no
+        longer than the chunk size"""
+
+        for data in (
+            {
+                "phone": "5492914141794",
+                "filename": "asd.png",
+                "body": message_dto.image_template_base64["image"] * 10,
+            },
+            {"audio": 'qwe"\\\n\x7fá\U0001f600' * 100, "phone": None},
+            {"body": "x" * 16, "ok": True, "id": 2},
+            {},
+        ):
+            body = StreamingJSONBody(data, chunk_size=16)
+
+            chunks = await read_chunks(body)
+            encoded = json.dumps(data).encode("utf-8")
+
+            self.assertEqual(b"".join(chunks), encoded)
+            self.assertEqual(body.content_length, len(encoded))
+            self.assertEqual(
+                body.headers["Content-Length"], str(len(encoded))
+            )
+
+            # Escaped characters take up to 12 bytes each
+            for chunk in chunks[1:-1]:
+                self.assertLessEqual(len(chunk), 16 * 12)
+
+            # It can be sent again
+            self.assertEqual(b"".join(await read_chunks(body)), encoded)
+
+    async def test_sent_through_httpx(self):
+        """Test function that checks that httpx sends the body with its
+        Content-Length instead of chunked"""
+
+        data = {"phone": "5492914141794", "body": "a" * 100}
+        requests: List[httpx.Request] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await request.aread()
+
+            requests.append(request)
+
+            return httpx.Response(200)
+
+        body = StreamingJSONBody(data, chunk_size=10)
+
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as client:
+            await client.post(
+                "https://asd.com", content=body, headers=body.headers
+            )
+
+        self.assertEqual(json.loads(requests[0].content), data)
+        self.assertEqual(
+            requests[0].headers["Content-Length"], str(body.content_length)
+        )
+        self.assertNotIn("Transfer-Encoding", requests[0].headers)
+
+    async def test_base64_file(self):
+        """Test function that checks that an uploaded file is sent as the
+        same base64 data URI json.dumps would make of it, whichever its
+        size, without reading it until it's sent"""
+
+        for size in (0, 1, 2, 3, 47, 48, 49, 1000):
+            content = bytes(range(256)) * 4
+
+            upload = UploadFile("asd")
+            await upload.write(content[:size])
+
+            media = Base64File(upload, "image/png")
+
+            data = {"phone": "5492914141794", "body": media}
+            expected = {
+                "phone": "5492914141794",
+                "body": "data:image/png;base64,"
+                f"{base64.b64encode(content[:size]).decode('ascii')}",
+            }
+
+            body = StreamingJSONBody(data, chunk_size=16)
+
+            chunks = await read_chunks(body)
+            encoded = json.dumps(expected).encode("utf-8")
+
+            self.assertEqual(b"".join(chunks), encoded)
+            self.assertEqual(body.content_length, len(encoded))
+            self.assertEqual(len(media), len(expected["body"]))
+
+            # The prefix of the data URI is the longest of them
+            for chunk in chunks[1:-1]:
+                self.assertLessEqual(len(chunk), 22)
+
+            self.assertEqual(b"".join(await read_chunks(body)), encoded)
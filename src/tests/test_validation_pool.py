@@ -0,0 +1,118 @@
+"""Module that contains the tests for the validation_pool module"""
+
+import asyncio
+import threading
+import time
+import unittest
+
+from src.apiv1.message_body import parse_message
+from src.utils.validation_pool import ValidationPool
+
+
+def get_thread_name(_: bytes) -> str:
+    """Helper function that returns the name of the thread it runs in"""
+
+    return threading.current_thread().name
+
+
+def sleep(seconds: float) -> float:
+    """Helper function that blocks its thread for a while"""
+
+    time.sleep(seconds)
+
+    return seconds
+
+
+class TestValidationPool(unittest.IsolatedAsyncioTestCase):
+    """Test class that contains tests for the ValidationPool class"""
+
+    async def test_threshold(self):
+        """Test function that checks that payloads up to the threshold are
+        validated inline and larger ones in a worker"""
+
+        pool = ValidationPool(threshold=10, workers=1)
+
+        self.assertEqual(
+            await pool.run(get_thread_name, b"asd", 3),
+            threading.current_thread().name,
+        )
+        self.assertTrue(
+            (await pool.run(get_thread_name, b"asd", 11)).startswith(
+                "validation"
+            )
+        )
+
+        stats = pool.get_stats()
+
+        self.assertEqual(stats.inline, 1)
+        self.assertEqual(stats.offloaded, 1)
+        self.assertEqual(stats.in_flight, 0)
+
+        pool.close()
+
+    async def test_queueing(self):
+        """Test function that checks that validations waiting for a free
+        worker are counted, along with how long they waited"""
+
+        pool = ValidationPool(threshold=0, workers=1)
+
+        tasks = [
+            asyncio.ensure_future(pool.run(sleep, 0.05, 1)) for _ in range(3)
+        ]
+
+        await asyncio.sleep(0.01)
+
+        stats = pool.get_stats()
+
+        self.assertEqual(stats.in_flight, 3)
+        self.assertEqual(stats.queued, 2)
+
+        await asyncio.gather(*tasks)
+
+        stats = pool.get_stats()
+
+        self.assertEqual(stats.queued, 0)
+        self.assertEqual(stats.peak_queued, 2)
+        self.assertGreaterEqual(stats.max_queue_wait, 0.09)
+        self.assertGreater(stats.avg_queue_wait, 0)
+
+        pool.close()
+
+    async def test_process_executor(self):
+        """Test function that checks that messages and errors make it back
+        from a worker process"""
+
+        pool = ValidationPool(threshold=0, workers=1, executor="process")
+
+        message, errors = await pool.run(
+            parse_message,
+            b'{"text": "asd", "phone": "5492914141794", '
+            b'"instance": "asd", "token": "asd"}',
+            1,
+        )
+
+        self.assertIsNotNone(message)
+        self.assertEqual(errors, [])
+
+        message, errors = await pool.run(parse_message, b'{"text": 1}', 1)
+
+        self.assertIsNone(message)
+        self.assertEqual(errors[0]["loc"], ("body", "text"))
+
+        pool.close()
+
+    async def test_unpicklable_payload(self):
+        """Test function that checks that payloads that can't leave the
+        process are validated in a thread even with the process
+        executor"""
+
+        pool = ValidationPool(threshold=0, workers=1, executor="process")
+
+        self.assertTrue(
+            (
+                await pool.run(get_thread_name, b"asd", 1, picklable=False)
+            ).startswith("validation")
+        )
+        self.assertEqual(pool.get_stats().offloaded, 1)
+
+        pool.close()
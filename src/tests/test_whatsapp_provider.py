@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
 import unittest
+from typing import cast
 from unittest import mock
 
-from httpx import Response, ConnectTimeout
+import httpx
+from httpx import Response, ConnectTimeout, ConnectError, ReadError
 
 # pylint: disable-next=no-name-in-module
 from pydantic import ValidationError
@@ -17,7 +21,14 @@ from src.schemas.dispatcher_responses import SentMessageResponseSchema
 from src.utils.type_aliases import JsonDict
 from src.utils import help_functions
 from src.utils import errors
-from src.whatsapp_provider.whatsapp_provider import ERROR_CONTACT_DEVELOPERS
+from src.utils.rate_limiter import RateLimiter
+from src.utils.retry import RetryBudget, RetryPolicy
+from src.utils.circuit_breaker import BreakerSettings, CircuitBreakers
+from src.whatsapp_provider.pool import WarmUpStats
+from src.whatsapp_provider.streaming import StreamingJSONBody
+from src.whatsapp_provider.whatsapp_provider import (
+    ERROR_CONTACT_DEVELOPERS, WhatsappProvider
+)
 
 
 async def response_test(
@@ -98,6 +109,35 @@ class TestWhatsappProvider(unittest.IsolatedAsyncioTestCase):
             }
         )
 
+    @mock.patch("httpx.AsyncClient.post")
+    async def test_response_types(self, async_client_post: mock.MagicMock):
+        """Test function that checks that the response is made as
+        SentMessageResponseSchema says, whatever types Chat API responds"""
+
+        async_client_post.return_value = Response(
+            status_code=200, json={"sent": 1, "id": 123}
+        )
+
+        await response_test(
+            self, message_dto.text_template, {
+                "success": True,
+                "errorMessage": None,
+                "id": "123"
+            }
+        )
+
+        async_client_post.return_value = Response(
+            status_code=200, json={"sent": False, "message": ["Error!"]}
+        )
+
+        await response_test(
+            self, message_dto.text_template, {
+                "success": False,
+                "errorMessage": "['Error!']",
+                "id": None
+            }
+        )
+
     @mock.patch("logging.Logger.info")
     @mock.patch("logging.Logger.error")
     @mock.patch("httpx.AsyncClient.post")
@@ -226,3 +266,369 @@ class TestWhatsappProvider(unittest.IsolatedAsyncioTestCase):
         # in this module
         # In the case there is no exception, an assertion error is thrown
         self.assertTrue(exc)
+
+    @mock.patch("logging.Logger.error")
+    @mock.patch("httpx.AsyncClient.post")
+    async def test_bad_response_raises_http(
+        self,
+        async_client_post: mock.MagicMock,
+        logger_error: mock.MagicMock
+    ):
+        """Test function that checks that the provider raises an HTTPException
+        if Chat API responds something that isn't a JSON object"""
+
+        async def send():
+            await provider.send(message_dto.MessageDTO(
+                **message_dto.text_template
+            ))
+
+        for response in (
+            Response(status_code=200, content=b"<html>Bad Gateway</html>"),
+            Response(status_code=200, json=["asd"]),
+        ):
+            async_client_post.return_value = response
+
+            exc = await help_functions.get_exception_async(
+                HTTPException, send
+            )
+
+            self.assertIs(exc, errors.BadUpstreamResponseError)
+
+        self.assertEqual(logger_error.call_count, 2)
+
+    @mock.patch("asyncio.sleep")
+    @mock.patch("httpx.AsyncClient.post")
+    async def test_retries(
+        self,
+        async_client_post: mock.MagicMock,
+        asyncio_sleep: mock.MagicMock
+    ):
+        """Test function that checks that connect errors and overloaded
+        responses with Retry-After are retried, and that other errors
+        aren't"""
+
+        retry_policy = RetryPolicy(
+            max_attempts=3,
+            base_delay=0.1,
+            max_delay=5,
+            budget=RetryBudget(ratio=0.1, min_retries=10),
+        )
+
+        whatsapp_provider = WhatsappProvider(
+            api_url="https://asd.com", retry_policy=retry_policy
+        )
+
+        sent = Response(status_code=200, json={"sent": True, "id": "asd"})
+
+        async_client_post.side_effect = [
+            ConnectError(""),
+            Response(status_code=503, headers={"Retry-After": "2"}),
+            sent,
+        ]
+
+        response = await whatsapp_provider.send(
+            message_dto.MessageDTO(**message_dto.text_template)
+        )
+
+        self.assertTrue(response["success"])
+        self.assertEqual(async_client_post.call_count, 3)
+        self.assertEqual(asyncio_sleep.call_args.args, (2,))
+        self.assertEqual(retry_policy.get_stats().retries, 2)
+
+        # Without Retry-After, Chat API may have processed the message
+        async_client_post.reset_mock()
+        async_client_post.side_effect = None
+        async_client_post.return_value = Response(status_code=503, json={})
+
+        await whatsapp_provider.send(
+            message_dto.MessageDTO(**message_dto.text_template)
+        )
+
+        self.assertEqual(async_client_post.call_count, 1)
+
+        # Bytes may have reached Chat API already
+        async_client_post.reset_mock()
+        async_client_post.side_effect = ReadError("")
+
+        async def get_exception_func():
+            await whatsapp_provider.send(
+                message_dto.MessageDTO(**message_dto.text_template)
+            )
+
+        exc = await help_functions.get_exception_async(
+            HTTPException,
+            get_exception_func
+        )
+
+        self.assertIs(exc, errors.UpstreamConnectionError)
+        self.assertEqual(async_client_post.call_count, 1)
+
+        await whatsapp_provider.close()
+
+    @mock.patch("asyncio.sleep")
+    @mock.patch("httpx.AsyncClient.post")
+    async def test_retries_take_turns(
+        self,
+        async_client_post: mock.MagicMock,
+        asyncio_sleep: mock.MagicMock
+    ):
+        """Test function that checks that every attempt takes a turn of the
+        rate limiter, the retries included"""
+
+        rate_limiter = RateLimiter(rate=1, burst=10, queue_size=10, max_wait=5)
+
+        whatsapp_provider = WhatsappProvider(
+            api_url="https://asd.com",
+            retry_policy=RetryPolicy(
+                max_attempts=3,
+                base_delay=0.1,
+                max_delay=5,
+                budget=RetryBudget(ratio=0.1, min_retries=10),
+            ),
+            rate_limiter=rate_limiter,
+        )
+
+        async_client_post.side_effect = [
+            ConnectError(""),
+            ConnectError(""),
+            Response(status_code=200, json={"sent": True, "id": "asd"}),
+        ]
+
+        response = await whatsapp_provider.send(
+            message_dto.MessageDTO(**message_dto.text_template)
+        )
+
+        self.assertTrue(response["success"])
+        self.assertEqual(asyncio_sleep.call_count, 2)
+        self.assertEqual(rate_limiter.get_stats().admitted, 3)
+
+        await whatsapp_provider.close()
+
+    @mock.patch("httpx.AsyncClient.post")
+    async def test_open_circuit_fails_fast(
+        self, async_client_post: mock.MagicMock
+    ):
+        """Test function that checks that the provider stops sending to
+        Chat API once its circuit is open, and raises an HTTPException"""
+
+        whatsapp_provider = WhatsappProvider(
+            api_url="https://asd.com",
+            breakers=CircuitBreakers(
+                BreakerSettings(window_size=2, min_requests=2)
+            ),
+        )
+
+        async_client_post.return_value = Response(status_code=500, json={})
+
+        for _ in range(2):
+            await whatsapp_provider.send(
+                message_dto.MessageDTO(**message_dto.text_template)
+            )
+
+        async def get_exception_func():
+            await whatsapp_provider.send(
+                message_dto.MessageDTO(**message_dto.text_template)
+            )
+
+        exc = await help_functions.get_exception_async(
+            HTTPException,
+            get_exception_func
+        )
+
+        self.assertIs(exc, errors.HostCircuitOpenError)
+        self.assertEqual(async_client_post.call_count, 2)
+
+        await whatsapp_provider.close()
+
+    @mock.patch("httpx.AsyncClient.post")
+    async def test_timeouts(self, async_client_post: mock.MagicMock):
+        """Test function that checks that actions get their own timeouts,
+        and that they're cut to fit before the deadline"""
+
+        whatsapp_provider = WhatsappProvider(
+            api_url="https://asd.com",
+            action_timeouts={"sendFile": {"read": 60}},
+        )
+
+        async_client_post.return_value = Response(
+            status_code=200, json={"sent": True, "id": "asd"}
+        )
+
+        await whatsapp_provider.send(
+            message_dto.MessageDTO(**message_dto.image_template)
+        )
+
+        timeout = async_client_post.call_args.kwargs["timeout"]
+
+        self.assertEqual(timeout.read, 60)
+        self.assertEqual(timeout.write, 15)
+
+        await whatsapp_provider.send(
+            message_dto.MessageDTO(**message_dto.image_template),
+            deadline=time.monotonic() + 2
+        )
+
+        timeout = async_client_post.call_args.kwargs["timeout"]
+
+        self.assertLessEqual(timeout.read, 2)
+        self.assertLessEqual(timeout.connect, 2)
+
+        await whatsapp_provider.close()
+
+    @mock.patch("httpx.AsyncClient.post")
+    async def test_stream_media(self, async_client_post: mock.MagicMock):
+        """Test function that checks that media bodies are streamed, unless
+        it's turned off, and that text bodies never are"""
+
+        async_client_post.return_value = Response(
+            status_code=200, json={"sent": True, "id": "asd"}
+        )
+
+        for stream_media in (True, False):
+            whatsapp_provider = WhatsappProvider(
+                api_url="https://asd.com", stream_media=stream_media
+            )
+
+            await whatsapp_provider.send(
+                message_dto.MessageDTO(**message_dto.image_template_base64)
+            )
+
+            kwargs = async_client_post.call_args.kwargs
+
+            self.assertEqual(
+                isinstance(kwargs.get("content"), StreamingJSONBody),
+                stream_media
+            )
+            self.assertEqual("json" in kwargs, not stream_media)
+
+            await whatsapp_provider.send(
+                message_dto.MessageDTO(**message_dto.text_template)
+            )
+
+            self.assertIn("json", async_client_post.call_args.kwargs)
+
+            await whatsapp_provider.close()
+
+    @mock.patch("httpx.AsyncClient.post")
+    async def test_deadline_exceeded(self, async_client_post: mock.MagicMock):
+        """Test function that checks that the provider gives up with an
+        HTTPException once the deadline passes"""
+
+        whatsapp_provider = WhatsappProvider(api_url="https://asd.com")
+
+        async def slow_post(*args, **kwargs):
+            await asyncio.sleep(10)
+
+        async_client_post.side_effect = slow_post
+
+        for deadline in (time.monotonic() - 1, time.monotonic() + 0.01):
+            async def get_exception_func():
+                await whatsapp_provider.send(
+                    message_dto.MessageDTO(**message_dto.text_template),
+                    deadline=deadline  # pylint: disable=cell-var-from-loop
+                )
+
+            exc = await help_functions.get_exception_async(
+                HTTPException,
+                get_exception_func
+            )
+
+            self.assertIs(exc, errors.DeadlineExceededError)
+
+        self.assertEqual(async_client_post.call_count, 1)
+
+        await whatsapp_provider.close()
+
+    @mock.patch("logging.Logger.warning")
+    @mock.patch("httpx.AsyncClient.request")
+    async def test_warm_up(
+        self,
+        async_client_request: mock.MagicMock,
+        logger_warning: mock.MagicMock
+    ):
+        """Test function that checks that the warm-up opens as many
+        connections as the pool keeps alive, and that the provider is only
+        warm once it's over, even if it failed"""
+
+        whatsapp_provider = WhatsappProvider(
+            api_url="https://asd.com",
+            limits=httpx.Limits(max_keepalive_connections=2),
+            warm_up_connections=3,
+        )
+
+        self.assertFalse(whatsapp_provider.is_warm())
+        self.assertEqual(
+            whatsapp_provider.get_warm_up_stats(),
+            WarmUpStats(state="pending", target=2, warmed=0, elapsed=None)
+        )
+
+        whatsapp_provider.start_warm_up()
+
+        # pylint: disable-next=protected-access
+        await cast(asyncio.Future, whatsapp_provider._warm_up_task)
+
+        self.assertTrue(whatsapp_provider.is_warm())
+        self.assertEqual(
+            whatsapp_provider.get_warm_up_stats(),
+            WarmUpStats(state="done", target=2, warmed=2, elapsed=mock.ANY)
+        )
+        self.assertEqual(async_client_request.call_count, 2)
+
+        async_client_request.side_effect = httpx.ConnectError("")
+
+        await whatsapp_provider.warm_up()
+
+        self.assertTrue(whatsapp_provider.is_warm())
+        self.assertEqual(
+            whatsapp_provider.get_warm_up_stats(),
+            WarmUpStats(state="failed", target=2, warmed=0, elapsed=mock.ANY)
+        )
+        self.assertEqual(logger_warning.call_count, 1)
+
+        await whatsapp_provider.close()
+
+    async def test_pooled_client_lifecycle(self):
+        """Test function that checks that the provider reuses one pooled
+        client until it's closed, and that it's created again on demand"""
+
+        whatsapp_provider = WhatsappProvider(api_url="https://asd.com")
+
+        self.assertIs(whatsapp_provider.get_pool_stats(), None)
+
+        whatsapp_provider.start()
+
+        client = whatsapp_provider.client
+
+        self.assertIs(whatsapp_provider.client, client)
+        self.assertEqual(whatsapp_provider.get_pool_stats().requests, 0)
+
+        await whatsapp_provider.close()
+
+        self.assertTrue(client.is_closed)
+        self.assertIs(whatsapp_provider.get_pool_stats(), None)
+
+        self.assertIsNot(whatsapp_provider.client, client)
+
+        await whatsapp_provider.close()
+
+    @mock.patch("logging.Logger.warning")
+    async def test_http2_fallback_without_h2(
+        self, logger_warning: mock.MagicMock
+    ):
+        """Test function that checks that the provider falls back to
+        HTTP/1.1 and warns about it when the 'h2' package is missing"""
+
+        whatsapp_provider = WhatsappProvider(
+            api_url="https://asd.com", http2=True
+        )
+
+        with mock.patch(
+            "src.whatsapp_provider.whatsapp_provider.is_http2_available",
+            return_value=False
+        ), mock.patch(
+            "src.whatsapp_provider.whatsapp_provider.PooledTransport"
+        ) as pooled_transport:
+            whatsapp_provider.start()
+
+        self.assertFalse(pooled_transport.call_args.kwargs["http2"])
+        self.assertEqual(logger_warning.call_count, 1)
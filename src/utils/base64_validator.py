@@ -0,0 +1,90 @@
+"""Module that contains a linear-time validator of base64 data URIs, it
+accepts exactly the same strings the base64 patterns of type_aliases match
+
+Matching those patterns takes the regex engine several backtracking passes
+over up to 150,000 characters, on the event loop, and invalid inputs are its
+worst case. This validator parses the data URI header once and checks the
+base64 alphabet and padding with binascii instead
+
+Usage:
+    from src.utils.base64_validator import is_base64_data_uri
+
+    if not is_base64_data_uri(value, "image"):
+        # Code here
+
+        pass
+"""
+
+import binascii
+import re
+from typing import Optional
+
+
+SEPARATOR = ";base64,"
+
+# The patterns' alphabet, \d matches any Unicode digit and so does this one.
+# It's only used for the (odd) strings binascii can't take
+ALPHABET = re.compile(r"[A-Za-z\d+/]*")
+
+MEDIA_TYPE = re.compile(r"\w+")
+
+
+def is_base64(value: str) -> bool:
+    """Function that tells whether a string is made of groups of four base64
+    characters, the last of which can be padded"""
+
+    if len(value) % 4:
+        return False
+
+    padding = 2 if value.endswith("==") else 1 if value.endswith("=") else 0
+    data = value[:len(value) - padding]
+
+    if "=" in data:
+        return False
+
+    if not value.isascii():
+        return ALPHABET.fullmatch(data) is not None
+
+    # binascii skips the characters out of the alphabet, so if there are any
+    # fewer bytes than expected are decoded, or it fails
+    try:
+        decoded = binascii.a2b_base64(value)
+
+    except binascii.Error:
+        return False
+
+    return len(decoded) == len(value) // 4 * 3 - padding
+
+
+def is_base64_data_uri(value: str, media_type: Optional[str] = None) -> bool:
+    """Function that tells whether a string is a base64 data URI such as
+    'data:image/png;base64,iVBO...', of the given media type (e.g. 'image')
+    or of any of them if it's None"""
+
+    # Just like the patterns' $, a newline is allowed at the very end
+    if value.endswith("\n"):
+        value = value[:-1]
+
+    if not value.startswith("data:"):
+        return False
+
+    slash = value.find("/", 5)
+
+    if slash == -1:
+        return False
+
+    if media_type is None:
+        if MEDIA_TYPE.fullmatch(value, 5, slash) is None:
+            return False
+
+    elif value[5:slash] != media_type:
+        return False
+
+    # The data can't have the separator in it, so it starts after the last
+    # one, and the subtype (and parameters) must come before it
+    separator = value.rfind(SEPARATOR, slash + 1)
+
+    if separator <= slash + 1 or "\n" in value[slash + 1:separator]:
+        return False
+
+    return is_base64(value[separator + len(SEPARATOR):])
@@ -0,0 +1,366 @@
+"""Module that contains the circuit breakers that stop sending requests to
+an upstream that keeps failing, so they fail fast instead of waiting for
+a timeout each
+
+A breaker starts closed and records the outcome of the last requests in a
+sliding window. It trips open once enough of them failed or were too slow.
+While open, requests are rejected straight away. After a while it goes
+half-open, where a few probes are let through (at most one per probe
+interval): the breaker closes again once enough of them succeed, and a
+single failed probe opens it again
+
+Each request let through gets a permit of the state the breaker was in, and
+its outcome is only recorded if the breaker is still in that state when the
+request finishes. Requests that were in flight when it tripped, or when it
+closed again, don't count as probes nor reopen it
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import (
+    AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+)
+
+from fastapi.exceptions import HTTPException
+
+from src.utils import errors
+from src.utils.concurrency_limiter import Sample
+from src.utils.lru import LRUCache
+
+
+# Instances that haven't sent anything for this long lose their breaker
+INSTANCE_BREAKER_TTL = 600.0
+
+MAX_INSTANCE_BREAKERS = 10000
+
+
+class CircuitState(str, Enum):
+    """Enum class that represents the states a circuit breaker can be in"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class BreakerStats:
+    """Dataclass that represents a snapshot of a circuit breaker"""
+
+    state: CircuitState
+    requests: int
+    error_rate: float
+    slow_rate: float
+    trips: int
+
+
+@dataclass(frozen=True)
+# pylint: disable-next=too-many-instance-attributes
+class BreakerSettings:
+    """Dataclass that represents the thresholds shared by the breakers"""
+
+    window_size: int = 20
+    min_requests: int = 10
+    error_rate: float = 0.5
+    slow_call_latency: float = 5.0
+    slow_call_rate: float = 0.8
+    open_duration: float = 30.0
+    probe_interval: float = 5.0
+    probe_successes: int = 2
+
+
+@dataclass(frozen=True)
+class Permit:
+    """Dataclass that represents a request let through by a breaker, in
+    which of its states (its generation) and whether as a half-open
+    probe"""
+
+    generation: int
+    probe: bool = False
+
+
+# pylint: disable-next=too-many-instance-attributes
+class CircuitBreaker:
+    """Class that tracks the outcomes of the requests to an upstream and
+    decides whether new ones are let through"""
+
+    def __init__(
+        self,
+        settings: BreakerSettings,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.settings = settings
+        self.clock = clock
+
+        self.state = CircuitState.CLOSED
+        self.trips = 0
+
+        # Changes every time the breaker trips or closes, so the outcomes
+        # of the requests let through before aren't recorded
+        self._generation = 0
+
+        # (failed, slow) outcome of each of the last requests
+        self._window: Deque[Tuple[bool, bool]] = deque(
+            maxlen=settings.window_size
+        )
+        self._failures = 0
+        self._slow_calls = 0
+
+        self._opened_at = 0.0
+        self._last_probe_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+
+    def _open(self):
+        self.state = CircuitState.OPEN
+        self.trips += 1
+
+        self._generation += 1
+        self._opened_at = self.clock()
+        self._probes = 0
+        self._probe_successes = 0
+
+    def _close(self):
+        self.state = CircuitState.CLOSED
+
+        self._generation += 1
+
+        self._window.clear()
+        self._failures = 0
+        self._slow_calls = 0
+
+    def is_open(self) -> bool:
+        """Method that returns whether the breaker is rejecting every
+        request, without taking a half-open probe"""
+
+        return (
+            self.state is CircuitState.OPEN
+            and self.clock() - self._opened_at < self.settings.open_duration
+        )
+
+    def allow(self) -> Optional[Permit]:
+        """Method that returns the permit of a request if it can be sent,
+        taking a probe if the breaker is half-open, or None otherwise"""
+
+        if self.state is CircuitState.CLOSED:
+            return Permit(self._generation)
+
+        if self.is_open():
+            return None
+
+        if self.state is CircuitState.OPEN:
+            self.state = CircuitState.HALF_OPEN
+            self._probe_successes = 0
+
+        now = self.clock()
+
+        if (
+            self._probes
+            or now - self._last_probe_at < self.settings.probe_interval
+        ):
+            return None
+
+        self._probes += 1
+        self._last_probe_at = now
+
+        return Permit(self._generation, probe=True)
+
+    def cancel(self, permit: Permit):
+        """Method that gives back the probe of a permit whose request wasn't
+        sent"""
+
+        if (
+            permit.probe
+            and permit.generation == self._generation
+            and self._probes
+        ):
+            self._probes -= 1
+            self._last_probe_at = 0.0
+
+    def record(self, latency: float, failed: bool, permit: Permit):
+        """Method that records the outcome of a request that was let
+        through, tripping or closing the breaker if it must. Outcomes of
+        requests let through in a state the breaker already left are
+        ignored"""
+
+        if permit.generation != self._generation:
+            return
+
+        slow = latency > self.settings.slow_call_latency
+
+        if permit.probe:
+            self._probes = max(0, self._probes - 1)
+
+            if failed or slow:
+                self._open()
+
+                return
+
+            self._probe_successes += 1
+
+            if self._probe_successes >= self.settings.probe_successes:
+                self._close()
+
+            return
+
+        if len(self._window) == self._window.maxlen:
+            old_failed, old_slow = self._window[0]
+
+            self._failures -= old_failed
+            self._slow_calls -= old_slow
+
+        self._window.append((failed, slow))
+        self._failures += failed
+        self._slow_calls += slow
+
+        requests = len(self._window)
+
+        if requests < self.settings.min_requests:
+            return
+
+        if (
+            self._failures / requests >= self.settings.error_rate
+            or self._slow_calls / requests >= self.settings.slow_call_rate
+        ):
+            self._open()
+
+    def get_stats(self) -> BreakerStats:
+        """Method that takes a snapshot of the breaker"""
+
+        requests = len(self._window)
+
+        return BreakerStats(
+            state=(
+                CircuitState.HALF_OPEN
+                if self.state is CircuitState.OPEN and not self.is_open()
+                else self.state
+            ),
+            requests=requests,
+            error_rate=round(self._failures / requests, 4) if requests else 0,
+            slow_rate=round(self._slow_calls / requests, 4) if requests else 0,
+            trips=self.trips,
+        )
+
+
+class CircuitBreakers:
+    """Class that holds a breaker per upstream host and per instance, a
+    request is only sent if both of them let it through"""
+
+    def __init__(
+        self,
+        settings: BreakerSettings,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.settings = settings
+        self.clock = clock
+
+        self.hosts: Dict[str, CircuitBreaker] = {}
+        self.instances: LRUCache[str, CircuitBreaker] = LRUCache(
+            maxsize=MAX_INSTANCE_BREAKERS, ttl=INSTANCE_BREAKER_TTL
+        )
+
+    def _get_breakers(
+        self, host: str, instance: str
+    ) -> List[Tuple[CircuitBreaker, HTTPException]]:
+        host_breaker = self.hosts.get(host)
+
+        if host_breaker is None:
+            host_breaker = CircuitBreaker(self.settings, self.clock)
+
+            self.hosts[host] = host_breaker
+
+        instance_breaker = self.instances.get(instance)
+
+        if instance_breaker is None:
+            instance_breaker = CircuitBreaker(self.settings, self.clock)
+
+            self.instances.put(instance, instance_breaker)
+
+        return [
+            (host_breaker, errors.HostCircuitOpenError),
+            (instance_breaker, errors.InstanceCircuitOpenError),
+        ]
+
+    def check(self, host: str, instance: str):
+        """Method that raises the error of the first open breaker of the
+        host or the instance, without taking any probe. It's meant to fail
+        fast before queueing a request"""
+
+        for breaker, error in self._get_breakers(host, instance):
+            if breaker.is_open():
+                raise error
+
+    @asynccontextmanager
+    async def guard(self, host: str, instance: str) -> AsyncIterator[Sample]:
+        """Async context manager that lets the request through if both
+        breakers allow it, and records its outcome on them. The request
+        counts as failed if an exception is raised while sending it or if
+        the yielded sample is marked as dropped. HTTPExceptions raised from
+        within are this service's own and aren't recorded, and neither are
+        requests cancelled because their caller gave up
+
+        It raises errors.HostCircuitOpenError or
+        errors.InstanceCircuitOpenError if a breaker is rejecting requests"""
+
+        allowed: List[Tuple[CircuitBreaker, Permit]] = []
+
+        for breaker, error in self._get_breakers(host, instance):
+            permit = breaker.allow()
+
+            if permit is None:
+                for allowed_breaker, allowed_permit in allowed:
+                    allowed_breaker.cancel(allowed_permit)
+
+                raise error
+
+            allowed.append((breaker, permit))
+
+        started = self.clock()
+        sample = Sample()
+
+        try:
+            yield sample
+
+        except (HTTPException, asyncio.CancelledError):
+            for breaker, permit in allowed:
+                breaker.cancel(permit)
+
+            raise
+
+        except BaseException:
+            sample.dropped = True
+
+            self._record(allowed, started, sample)
+
+            raise
+
+        self._record(allowed, started, sample)
+
+    def _record(
+        self,
+        allowed: List[Tuple[CircuitBreaker, Permit]],
+        started: float,
+        sample: Sample,
+    ):
+        latency = self.clock() - started
+
+        for breaker, permit in allowed:
+            breaker.record(latency, sample.dropped, permit)
+
+    def get_stats(self) -> Dict[str, Dict[str, BreakerStats]]:
+        """Method that takes a snapshot of every breaker, by host and by
+        instance"""
+
+        return {
+            "hosts": {
+                host: breaker.get_stats()
+                for host, breaker in self.hosts.items()
+            },
+            "instances": {
+                instance: breaker.get_stats()
+                for instance, breaker in self.instances.items()
+            },
+        }
@@ -0,0 +1,287 @@
+"""Module that contains the adaptive concurrency limiters that bound how many
+requests can be in flight to an upstream at the same time
+
+The limit of each limiter follows AIMD (additive increase, multiplicative
+decrease): it grows by one while the latency of the requests holds steady
+and the limit is actually being used, and it's cut by a ratio whenever the
+latency goes past a tolerance of its baseline or a request is dropped
+(timed out or overloaded)
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional
+
+from src.utils import errors
+from src.utils.lru import LRUCache
+
+
+# How much the baseline latency moves towards a slower sample, so the
+# baseline follows a lasting change of the upstream's latency, but slowly
+BASELINE_SMOOTHING = 0.01
+
+# Instances that haven't sent anything for this long lose their limiter
+INSTANCE_LIMITER_TTL = 600.0
+
+MAX_INSTANCE_LIMITERS = 10000
+
+
+# pylint: disable-next=too-few-public-methods
+class Sample:
+    """Class that represents the outcome of a request sent while holding
+    a slot, it can be marked as dropped when the upstream says it's
+    overloaded"""
+
+    def __init__(self):
+        self.dropped = False
+
+
+@dataclass(frozen=True)
+class LimiterStats:
+    """Dataclass that represents a snapshot of a limiter"""
+
+    limit: int
+    in_flight: int
+    waiting: int
+    baseline_latency: Optional[float]
+    drops: int
+
+
+# pylint: disable-next=too-many-instance-attributes
+class AIMDLimiter:
+    """Class that limits how many requests are in flight at the same time,
+    adapting the limit to the latency of the samples it's fed"""
+
+    def __init__(
+        self,
+        initial_limit: int,
+        max_limit: int,
+        min_limit: int = 1,
+        backoff_ratio: float = 0.9,
+        latency_tolerance: float = 2.0,
+    ):
+        # pylint: disable=too-many-arguments
+
+        self.limit = float(initial_limit)
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+
+        self.in_flight = 0
+        self.drops = 0
+        self.baseline_latency: Optional[float] = None
+
+        # Futures are created on demand instead of using asyncio primitives,
+        # so the limiter isn't bound to the event loop it was created in
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    def _has_room(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _wake_waiters(self):
+        while self._waiters and self._has_room():
+            waiter = self._waiters.popleft()
+
+            if waiter.done():
+                continue
+
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """Coroutine that takes a slot, waiting up to timeout seconds for
+        one to be released. It raises asyncio.TimeoutError if none was"""
+
+        if self._has_room() and not self._waiters:
+            self.in_flight += 1
+
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+
+        self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right as the wait ended
+                self.release()
+
+            else:
+                waiter.cancel()
+
+            raise
+
+    def release(self):
+        """Method that gives a slot back, handing it to the next waiter if
+        the limit allows it"""
+
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    def on_sample(self, latency: float, dropped: bool = False):
+        """Method that adapts the limit basing on the latency of a finished
+        request, or on the request having been dropped"""
+
+        too_slow = (
+            self.baseline_latency is not None
+            and latency > self.baseline_latency * self.latency_tolerance
+        )
+
+        if self.baseline_latency is None or latency < self.baseline_latency:
+            self.baseline_latency = latency
+
+        elif not dropped:
+            self.baseline_latency += (
+                latency - self.baseline_latency
+            ) * BASELINE_SMOOTHING
+
+        if dropped or too_slow:
+            self.drops += int(dropped)
+            self.limit = max(
+                float(self.min_limit), self.limit * self.backoff_ratio
+            )
+
+        elif self.in_flight * 2 >= self.limit:
+            self.limit = min(float(self.max_limit), self.limit + 1)
+
+        self._wake_waiters()
+
+    def get_stats(self) -> LimiterStats:
+        """Method that takes a snapshot of the limiter"""
+
+        return LimiterStats(
+            limit=int(self.limit),
+            in_flight=self.in_flight,
+            waiting=len([w for w in self._waiters if not w.done()]),
+            baseline_latency=(
+                round(self.baseline_latency, 6)
+                if self.baseline_latency is not None else None
+            ),
+            drops=self.drops,
+        )
+
+
+# pylint: disable-next=too-many-instance-attributes
+class ConcurrencyLimiters:
+    """Class that holds a limiter per upstream host and per instance, a
+    request must take a slot of both of them before being sent"""
+
+    def __init__(
+        self,
+        host_limit: int,
+        host_max_limit: int,
+        instance_limit: int,
+        instance_max_limit: int,
+        acquire_timeout: float,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        # pylint: disable=too-many-arguments
+
+        self.host_limit = host_limit
+        self.host_max_limit = host_max_limit
+        self.instance_limit = instance_limit
+        self.instance_max_limit = instance_max_limit
+        self.acquire_timeout = acquire_timeout
+        self.clock = clock
+
+        self.hosts: Dict[str, AIMDLimiter] = {}
+        self.instances: LRUCache[str, AIMDLimiter] = LRUCache(
+            maxsize=MAX_INSTANCE_LIMITERS, ttl=INSTANCE_LIMITER_TTL
+        )
+
+    def _get_limiters(self, host: str, instance: str) -> List[AIMDLimiter]:
+        host_limiter = self.hosts.get(host)
+
+        if host_limiter is None:
+            host_limiter = AIMDLimiter(self.host_limit, self.host_max_limit)
+
+            self.hosts[host] = host_limiter
+
+        instance_limiter = self.instances.get(instance)
+
+        if instance_limiter is None:
+            instance_limiter = AIMDLimiter(
+                self.instance_limit, self.instance_max_limit
+            )
+
+            self.instances.put(instance, instance_limiter)
+
+        # The instance's slot is taken first, so a busy instance waits
+        # without holding a slot of the host
+        return [instance_limiter, host_limiter]
+
+    @asynccontextmanager
+    async def limit(self, host: str, instance: str) -> AsyncIterator[Sample]:
+        """Async context manager that holds a slot of the host and of the
+        instance while the request is sent, feeding its latency back to
+        their limiters. The request counts as dropped if an exception is
+        raised while sending it (timeouts, connection errors), other than
+        being cancelled, or if the yielded sample is marked as dropped
+
+        It raises errors.UpstreamOverloadedError if no slot was released
+        within the acquire timeout"""
+
+        deadline = self.clock() + self.acquire_timeout
+        acquired: List[AIMDLimiter] = []
+
+        try:
+            for limiter in self._get_limiters(host, instance):
+                await limiter.acquire(max(0.0, deadline - self.clock()))
+
+                acquired.append(limiter)
+
+        # The slots already taken are given back however the wait ends, a
+        # cancelled wait included (e.g. the request's deadline passed)
+        except BaseException as exception:
+            for limiter in acquired:
+                limiter.release()
+
+            if isinstance(exception, asyncio.TimeoutError):
+                raise errors.UpstreamOverloadedError from exception
+
+            raise
+
+        started = self.clock()
+        sample = Sample()
+
+        try:
+            yield sample
+
+        except asyncio.CancelledError:
+            # The caller gave up (e.g. its deadline passed), which says
+            # nothing about the upstream
+            raise
+
+        except BaseException:
+            sample.dropped = True
+
+            raise
+
+        finally:
+            latency = self.clock() - started
+
+            for limiter in acquired:
+                limiter.release()
+                limiter.on_sample(latency, sample.dropped)
+
+    def get_stats(self) -> Dict[str, Dict[str, LimiterStats]]:
+        """Method that takes a snapshot of every limiter, by host and by
+        instance"""
+
+        return {
+            "hosts": {
+                host: limiter.get_stats()
+                for host, limiter in self.hosts.items()
+            },
+            "instances": {
+                instance: limiter.get_stats()
+                for instance, limiter in self.instances.items()
+            },
+        }
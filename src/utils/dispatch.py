@@ -0,0 +1,102 @@
+"""Module that contains the dispatch tables, which route each kind of message
+to the action of a provider that sends it
+
+The kind of a message is told by the field validation left set, and each
+provider registers a table with a route for every kind: the action, the
+template of the URL it's sent to and the function that builds the request.
+Sending a message is then a lookup, nothing is worked out per request
+
+Usage:
+    from src.utils.dispatch import (
+        Route, get_message_kind, register_dispatch_table
+    )
+
+    register_dispatch_table("provider", {
+        MessageKind.TEXT: Route(
+            "sendText", "{api_url}/{instance}/sendText?token={token}", build
+        ),
+        ...
+    })
+
+    route = get_dispatch_table("provider")[get_message_kind(message)]
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Union, cast
+
+from src.schemas.message_dto import MESSAGE_KINDS, MessageDTO, MessageKind
+from src.schemas.upload_dto import UploadDTO
+from src.utils import errors
+
+
+Message = Union[MessageDTO, UploadDTO]
+
+
+@dataclass(frozen=True)
+class Route:
+    """Dataclass that represents where a kind of message is sent to and
+    how its request is built
+
+    The URL template is formatted with the API URL, the instance and the
+    token of the message, and the builder gets the message along with its
+    kind"""
+
+    action: str
+    url_template: str
+    build: Callable[[Message, MessageKind], Any]
+    url_format: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # The template is turned into a printf-style one once, which is
+        # formatted faster than str.format formats it
+        object.__setattr__(
+            self,
+            "url_format",
+            self.url_template.replace("%", "%%").format(
+                api_url="%(api_url)s",
+                instance="%(instance)s",
+                token="%(token)s",
+            ),
+        )
+
+    def make_url(self, api_url: str, instance: str, token: str) -> str:
+        """Method that makes the URL a message is sent to"""
+
+        return self.url_format % {
+            "api_url": api_url, "instance": instance, "token": token
+        }
+
+
+DispatchTable = Mapping[MessageKind, Route]
+
+dispatch_tables: Dict[str, DispatchTable] = {}
+
+
+def get_message_kind(message: Message) -> MessageKind:
+    """Function that gets the kind of a validated message, uploads are of
+    the kind of media they were validated as"""
+
+    # Validation sets the kind of uploads to a MessageKind as well
+    return cast(MessageKind, message.kind)
+
+
+def register_dispatch_table(provider: str, table: DispatchTable):
+    """Function that registers the dispatch table of a provider, replacing
+    the one it had. It raises errors.IncompleteDispatchTableError if any
+    kind of message has no route"""
+
+    missing = [kind.value for kind in MESSAGE_KINDS if kind not in table]
+
+    if missing:
+        raise errors.IncompleteDispatchTableError(
+            provider=provider, kinds=", ".join(missing)
+        )
+
+    dispatch_tables[provider] = dict(table)
+
+
+def get_dispatch_table(provider: str) -> DispatchTable:
+    """Function that gets the dispatch table a provider registered, it
+    raises KeyError if there's none"""
+
+    return dispatch_tables[provider]
@@ -0,0 +1,192 @@
+"""Module that contains a DNS cache that keeps the addresses a host resolves
+to for as long as the TTL of its records says
+
+Concurrent lookups of a host that isn't cached share the same query. If a
+lookup fails once its entry has expired, the stale addresses keep being
+used until the resolver answers again, so a hiccup of the resolver doesn't
+take the upstream down with it
+
+dnspython reads neither the hosts file nor nsswitch, so the hosts it finds
+nothing about are looked up through the system's resolver (getaddrinfo)
+before giving up, which resolves localhost and the aliases of the hosts
+file
+"""
+
+import asyncio
+import ipaddress
+import socket
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
+
+
+# Records with a shorter TTL (or none) are kept this long anyways, so a
+# zero TTL doesn't make every connection wait for a query
+MIN_TTL = 1.0
+
+# The system's resolver doesn't tell the TTL of what it resolves, so those
+# addresses are kept this long
+SYSTEM_TTL = 60.0
+
+
+@dataclass(frozen=True)
+class DNSStats:
+    """Dataclass that represents a snapshot of the DNS cache's counters"""
+
+    hosts: Dict[str, List[str]]
+    hits: int
+    misses: int
+    stale_hits: int
+    failures: int
+
+
+@dataclass(frozen=True)
+class DNSEntry:
+    """Dataclass that represents the addresses of a host and when they
+    expire"""
+
+    addresses: List[str]
+    expires_at: float
+
+
+def is_ip_address(host: str) -> bool:
+    """Function that tells whether a host is an IP address already, which
+    doesn't need to be resolved"""
+
+    try:
+        ipaddress.ip_address(host)
+
+    except ValueError:
+        return False
+
+    return True
+
+
+# pylint: disable-next=too-many-instance-attributes
+class DNSCache:
+    """Class that resolves hosts through DNS, caching their addresses for
+    as long as their TTL"""
+
+    def __init__(
+        self,
+        resolver: Optional[dns.asyncresolver.Resolver] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # The resolver reads the system's configuration, so it's only
+        # created once it's needed
+        self._resolver = resolver
+        self.clock = clock
+
+        self._entries: Dict[str, DNSEntry] = {}
+        self._pending: Dict[str, "asyncio.Future[List[str]]"] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.failures = 0
+
+    async def _query(self, host: str) -> Tuple[List[str], float]:
+        try:
+            return await self._query_dns(host)
+
+        except dns.exception.DNSException:
+            return await self._query_system(host)
+
+    async def _query_dns(self, host: str) -> Tuple[List[str], float]:
+        if self._resolver is None:
+            self._resolver = dns.asyncresolver.Resolver()
+
+        for rdtype in ("A", "AAAA"):
+            try:
+                answer = await self._resolver.resolve(host, rdtype)
+
+            except dns.resolver.NoAnswer:
+                continue
+
+            ttl = answer.rrset.ttl if answer.rrset is not None else 0
+
+            return [record.to_text() for record in answer], ttl
+
+        raise dns.resolver.NoAnswer
+
+    @staticmethod
+    async def _query_system(host: str) -> Tuple[List[str], float]:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, None, type=socket.SOCK_STREAM
+        )
+
+        # Each address comes once per family it's got, in the order the
+        # system prefers them
+        addresses = list(dict.fromkeys(str(info[4][0]) for info in infos))
+
+        return addresses, SYSTEM_TTL
+
+    async def _refresh(self, host: str) -> List[str]:
+        try:
+            addresses, ttl = await self._query(host)
+
+        except (dns.exception.DNSException, OSError) as exception:
+            self.failures += 1
+
+            entry = self._entries.get(host)
+
+            if entry is None:
+                raise OSError(f"Could not resolve {host}") from exception
+
+            self.stale_hits += 1
+
+            return entry.addresses
+
+        self._entries[host] = DNSEntry(
+            addresses, self.clock() + max(float(ttl), MIN_TTL)
+        )
+
+        return addresses
+
+    async def resolve(self, host: str) -> List[str]:
+        """Coroutine that returns the addresses of a host, querying them
+        only if they aren't cached or have expired
+
+        It raises OSError if the host can't be resolved and there are no
+        stale addresses of it"""
+
+        if is_ip_address(host):
+            return [host]
+
+        entry = self._entries.get(host)
+
+        if entry is not None and entry.expires_at > self.clock():
+            self.hits += 1
+
+            return entry.addresses
+
+        self.misses += 1
+
+        pending = self._pending.get(host)
+
+        if pending is None:
+            pending = asyncio.ensure_future(self._refresh(host))
+
+            self._pending[host] = pending
+            pending.add_done_callback(
+                lambda _: self._pending.pop(host, None)
+            )
+
+        return await asyncio.shield(pending)
+
+    def get_stats(self) -> DNSStats:
+        """Method that takes a snapshot of the cache's counters"""
+
+        return DNSStats(
+            hosts={
+                host: entry.addresses for host, entry in self._entries.items()
+            },
+            hits=self.hits,
+            misses=self.misses,
+            stale_hits=self.stale_hits,
+            failures=self.failures,
+        )
@@ -57,6 +57,34 @@ class AtLeastOneOfThemError(FormattedError):
 At least ONE of these values {at_least} must be properly set, got: {values}"
 
 
+# pylint: disable-next=missing-class-docstring
+class BodyTooLargeError(FormattedError):
+    msg_template = "\
+Request body is larger than the {limit} bytes allowed for {content_type} \
+requests"
+
+
+# pylint: disable-next=missing-class-docstring
+class RecordTooLargeError(FormattedError):
+    msg_template = "Record is larger than the {limit} bytes allowed"
+
+
+# pylint: disable-next=missing-class-docstring
+class FileTooLargeError(FormattedError):
+    msg_template = "File is larger than the {limit} bytes allowed"
+
+
+# pylint: disable-next=missing-class-docstring
+class BadMimetypeForKindError(FormattedError):
+    msg_template = "Files of mimetype {mimetype} can't be sent as {kind}"
+
+
+# pylint: disable-next=missing-class-docstring
+class IncompleteDispatchTableError(FormattedError):
+    msg_template = "\
+Dispatch table of provider '{provider}' has no route for {kinds}"
+
+
 BadProdVariableError = ValueError(
     "PROD variable can only be either 'True' or 'False'"
 )
@@ -65,12 +93,83 @@ BadFilenameNotRecognizedError = ValueError(
     "Filename extracted from base-64/http URL asset not recognized"
 )
 
+BadMimetypeNotRecognizedError = ValueError(
+    "Mimetype of the uploaded file not recognized from its content"
+)
+
+FormBodyParseError = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="There was an error parsing the multipart/form-data body",
+)
+
 ConnectionTimeoutError = HTTPException(
     status_code=status.HTTP_504_GATEWAY_TIMEOUT,
     detail="\
 Tried to make POST request to Chat API, but received a connection time out",
 )
 
+DeadlineExceededError = HTTPException(
+    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+    detail="\
+The deadline of the request passed before Chat API responded",
+)
+
+UpstreamConnectionError = HTTPException(
+    status_code=status.HTTP_502_BAD_GATEWAY,
+    detail="\
+Tried to make POST request to Chat API, but the connection failed",
+)
+
+BadUpstreamResponseError = HTTPException(
+    status_code=status.HTTP_502_BAD_GATEWAY,
+    detail="\
+Chat API responded something that isn't a JSON object",
+)
+
+UpstreamOverloadedError = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="\
+Too many requests in flight to Chat API, no slot was released in time",
+)
+
+HostCircuitOpenError = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="\
+Chat API is failing, messages are rejected until it recovers",
+)
+
+InstanceCircuitOpenError = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="\
+This Chat API instance is failing, messages to it are rejected until it \
+recovers",
+)
+
+RateLimitedError = HTTPException(
+    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+    detail="\
+Too many messages queued for this instance, try again later",
+)
+
+UnexpectedSendError = HTTPException(
+    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+    detail="\
+Unexpected error while sending the message, details in the microservice's \
+logs",
+)
+
+JobQueueFullError = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="\
+Too many messages queued to be sent in the background, try again later",
+)
+
+JobNotFoundError = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail="\
+There's no message with that job id, or its result has already expired",
+)
+
 
 @dataclass(frozen=True)
 class Error:
@@ -0,0 +1,60 @@
+"""Module that contains the index of the file extension of every mimetype,
+the filenames of base64 media are derived from it
+
+mimetypes.guess_extension reads the mime databases of the host the first
+time it's called, so the same mimetype could get another extension, or
+none, depending on the image the service runs on. The index is a snapshot
+of what it guessed with the /etc/mime.types of Debian's media-types package,
+it ships with the service and is loaded once
+
+Usage:
+    from src.utils.extensions import guess_extension
+
+    guess_extension("image/jpeg")  # ".jpg"
+
+To regenerate the index from the mime databases of the current host:
+    $ python -m src.utils.extensions > src/utils/mimetype_extensions
+"""
+
+import mimetypes
+from pathlib import Path
+from typing import Dict, Optional
+
+
+INDEX_PATH = Path(__file__).parent / "mimetype_extensions"
+
+
+def load_index(path: Path) -> Dict[str, str]:
+    """Function that loads an index made of lines with a mimetype and its
+    extension, separated by whitespace"""
+
+    with open(str(path), "r", encoding="utf-8") as file:
+        return dict(line.split() for line in file if line.strip())
+
+
+extensions = load_index(INDEX_PATH)
+
+
+def guess_extension(mimetype: str) -> Optional[str]:
+    """Function that returns the extension of a mimetype, leading dot
+    included, or None if it isn't a known mimetype"""
+
+    return extensions.get(mimetype.lower())
+
+
+def main():
+    """Function that prints an index of every mimetype the host knows"""
+
+    mimetypes.init()
+
+    for mimetype in sorted({
+        mimetype.lower() for mimetype in mimetypes.types_map.values()
+    }):
+        extension = mimetypes.guess_extension(mimetype)
+
+        if extension:
+            print(mimetype, extension)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Module that contains the JSON encoding and decoding the dispatcher does
+on every request, backed by orjson if it's installed
+
+orjson parses Chat API's responses straight from their bytes and makes the
+dispatcher's responses without going through str first. If it isn't
+installed, the standard library is used instead, making the same bytes
+Starlette's JSONResponse makes
+
+Usage:
+    from src.utils.fast_json import FastJSONResponse
+
+    return FastJSONResponse({"success": True}, status.HTTP_200_OK)
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+def is_orjson_available() -> bool:
+    """Function that tells whether the optional 'orjson' package is
+    installed"""
+
+    return orjson is not None
+
+
+def loads(content: bytes) -> Any:
+    """Function that parses a JSON document from its bytes"""
+
+    if orjson is not None:
+        # pylint: disable-next=no-member
+        return orjson.loads(content)
+
+    return json.loads(content)
+
+
+def dumps(content: Any) -> bytes:
+    """Function that encodes a JSON document as compact UTF-8 bytes"""
+
+    if orjson is not None:
+        # pylint: disable-next=no-member
+        return orjson.dumps(content)
+
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Class that acts as a JSONResponse whose content is encoded by
+    fast_json.dumps, it's the response class of every endpoint and
+    exception handler of the dispatcher"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
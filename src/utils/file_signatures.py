@@ -0,0 +1,173 @@
+"""Module that contains the detection of the mimetype of a file from its
+first bytes, the signatures (or magic bytes) of its format
+
+Only the formats WhatsApp takes as media are known, and ZIP archives are
+looked into, as Office and OpenDocument files are ZIP archives too
+
+Usage:
+    from src.utils.file_signatures import SNIFF_SIZE, detect_mimetype
+
+    mimetype = detect_mimetype(file.read(SNIFF_SIZE))
+"""
+
+import struct
+from typing import Iterator, Optional, Tuple
+
+
+# Bytes read from the start of a file to detect its mimetype, enough to
+# reach the first entries of an Office file
+SNIFF_SIZE = 8192
+
+# Mimetype of the formats told by a prefix of their first bytes
+PREFIXES: Tuple[Tuple[bytes, str], ...] = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"%PDF-", "application/pdf"),
+    (b"ID3", "audio/mpeg"),
+    (b"fLaC", "audio/flac"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/x-ole-storage"),
+)
+
+# Mimetype of the formats in a RIFF container, by their form type
+RIFF_TYPES = {
+    b"WEBP": "image/webp",
+    b"WAVE": "audio/x-wav",
+    b"AVI ": "video/x-msvideo",
+}
+
+# Mimetype of the formats in an ISO media container, by their major brand,
+# video/mp4 for the rest of them
+FTYP_BRANDS = {
+    b"M4A ": "audio/mp4",
+    b"M4B ": "audio/mp4",
+    b"qt  ": "video/quicktime",
+    b"heic": "image/heic",
+    b"heix": "image/heic",
+    b"mif1": "image/heic",
+}
+
+# Mimetype of Office files, by the folder their first entries are in
+OFFICE_FOLDERS = {
+    b"word/":
+        "application/vnd.openxmlformats-officedocument.wordprocessingml"
+        ".document",
+    b"xl/":
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    b"ppt/":
+        "application/vnd.openxmlformats-officedocument.presentationml"
+        ".presentation",
+}
+
+# Mimetypes of containers that can't be told apart from their first bytes,
+# so the one the client declared is trusted over them
+CONTAINERS = ("application/zip", "application/x-ole-storage")
+
+
+def get_zip_entries(header: bytes) -> Iterator[Tuple[bytes, bytes]]:
+    """Function that yields the name and the stored data of the entries of
+    a ZIP archive that are whole in its first bytes, until one whose size
+    isn't in its local header"""
+
+    offset = 0
+
+    while header.startswith(b"PK\x03\x04", offset):
+        if offset + 30 > len(header):
+            return
+
+        flags, = struct.unpack_from("<H", header, offset + 6)
+        size, = struct.unpack_from("<I", header, offset + 18)
+        name_length, extra_length = struct.unpack_from(
+            "<HH", header, offset + 26
+        )
+
+        name_end = offset + 30 + name_length
+        data_start = name_end + extra_length
+
+        yield header[offset + 30:name_end], header[
+            data_start:data_start + size
+        ]
+
+        # The sizes come after the data when this flag is set
+        if flags & 0x08:
+            return
+
+        offset = data_start + size
+
+
+def detect_zip_mimetype(header: bytes) -> str:
+    """Function that detects the mimetype of an OpenDocument or Office file
+    from its first entries, or returns the one of ZIP archives"""
+
+    for name, data in get_zip_entries(header):
+        # OpenDocument files start with their mimetype, stored as it is
+        if name == b"mimetype" and data.isascii() and b"/" in data:
+            return data.decode("ascii").strip()
+
+        for folder, mimetype in OFFICE_FOLDERS.items():
+            if name.startswith(folder):
+                return mimetype
+
+    return "application/zip"
+
+
+def detect_mpeg_audio_mimetype(header: bytes) -> Optional[str]:
+    """Function that detects MP3 and AAC (ADTS) files from their frame
+    sync, whose layer tells them apart"""
+
+    if len(header) < 2 or header[0] != 0xFF or header[1] & 0xF0 != 0xF0:
+        return None
+
+    return "audio/aac" if header[1] & 0x06 == 0 else "audio/mpeg"
+
+
+def detect_signature(header: bytes) -> Optional[str]:
+    """Function that detects the mimetype of a file from its first bytes,
+    or returns None if its format isn't known"""
+
+    # pylint: disable=too-many-return-statements
+
+    for prefix, mimetype in PREFIXES:
+        if header.startswith(prefix):
+            return mimetype
+
+    if header.startswith(b"RIFF"):
+        return RIFF_TYPES.get(header[8:12])
+
+    if header[4:8] == b"ftyp":
+        return FTYP_BRANDS.get(header[8:12], "video/mp4")
+
+    if header.startswith(b"\x1aE\xdf\xa3"):
+        return "video/webm" if b"webm" in header[:64] else "video/x-matroska"
+
+    if header.startswith(b"OggS"):
+        return "video/ogg" if b"theora" in header[:64] else "audio/ogg"
+
+    if header.startswith(b"PK\x03\x04"):
+        return detect_zip_mimetype(header)
+
+    return detect_mpeg_audio_mimetype(header)
+
+
+def detect_mimetype(
+    header: bytes, declared: Optional[str] = None
+) -> Optional[str]:
+    """Function that detects the mimetype of a file from its first bytes,
+    or returns None if its format isn't known, whatever the client declared
+
+    The mimetype the client declared for it is only taken if it's a
+    container that could be several formats, e.g. a ZIP archive could be a
+    .zip or an .apk"""
+
+    detected = detect_signature(header)
+
+    if declared:
+        declared = declared.partition(";")[0].strip().lower()
+
+    if declared and detected in CONTAINERS:
+        return declared
+
+    return detected
@@ -0,0 +1,237 @@
+"""Module that contains the bounded queue of jobs that are accepted right
+away and done in the background by a pool of workers
+
+A job is queued and gets an id the caller can look its result up with
+later, instead of waiting for it. Only as many jobs as the size of the
+queue can wait, past it they're rejected so a caller that submits faster
+than the workers can keep up is told to slow down instead of piling jobs up
+in memory. The results are kept for a while after the job is done, however
+often they're looked up, and the least recently looked up ones are dropped
+past the size of the results
+
+Usage:
+    from src.utils.job_queue import JobQueue
+
+    job_queue = JobQueue(handle, maxsize=1000, workers=10)
+
+    job_queue.start()
+
+    job_id = job_queue.submit(payload)
+
+    status, result = job_queue.get(job_id)
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from typing import (
+    Any, Awaitable, Callable, Dict, List, Literal, Optional, Tuple
+)
+
+from src.utils import errors
+from src.utils.logger import logger
+from src.utils.lru import LRUCache
+from src.utils.type_aliases import JsonDict
+
+
+JobStatus = Literal["queued", "running", "done"]
+
+
+@dataclass(frozen=True)
+# pylint: disable-next=too-many-instance-attributes
+class JobQueueStats:
+    """Dataclass that represents a snapshot of the job queue's counters"""
+
+    maxsize: int
+    workers: int
+    queued: int
+    running: int
+    results: int
+    accepted: int
+    rejected: int
+    done: int
+
+
+# pylint: disable-next=too-many-instance-attributes
+class JobQueue:
+    """Class that queues jobs to be handled by a pool of workers, and keeps
+    their results to be looked up by their id
+
+    handle takes the payload of a job and returns its result, it shouldn't
+    raise, but if it does the job is done with failed_result. discard takes
+    the payloads of the jobs still queued when the workers are stopped, so
+    whatever they hold is released"""
+
+    def __init__(
+        self,
+        handle: Callable[[Any], Awaitable[JsonDict]],
+        maxsize: int,
+        workers: int,
+        results_size: int = 10000,
+        results_ttl: Optional[float] = None,
+        failed_result: Optional[JsonDict] = None,
+        discard: Optional[Callable[[Any], Awaitable[None]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # pylint: disable=too-many-arguments
+
+        self.handle = handle
+        self.maxsize = maxsize
+        self.workers = workers
+        self.results_ttl = results_ttl
+        self.failed_result = failed_result or {}
+        self.discard = discard
+        self.clock = clock
+
+        # The queue is only created once the workers start, so it's bound
+        # to the event loop that runs them
+        self._queue: Optional["asyncio.Queue[Tuple[str, Any]]"] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._pending: Dict[str, JobStatus] = {}
+        # Results expire results_ttl seconds after their job is done, not
+        # after they're last looked up, so polling doesn't keep them
+        self._results: LRUCache[str, Tuple[float, JsonDict]] = LRUCache(
+            results_size, clock=clock
+        )
+
+        self.accepted = 0
+        self.rejected = 0
+        self.done = 0
+
+    def start(self):
+        """Method that starts the workers, if they aren't already"""
+
+        if self._tasks:
+            return
+
+        self._queue = asyncio.Queue(self.maxsize)
+        self._tasks = [
+            asyncio.ensure_future(self._work()) for _ in range(self.workers)
+        ]
+
+    async def _work(self):
+        assert self._queue is not None
+
+        while True:
+            job_id, payload = await self._queue.get()
+            self._pending[job_id] = "running"
+
+            try:
+                result = await self.handle(payload)
+
+            # A job that fails is still done, so it doesn't stay running
+            # forever and the worker keeps going
+            # pylint: disable-next=broad-except
+            except Exception:
+                logger.exception("job %s failed", job_id)
+
+                result = self.failed_result
+
+            del self._pending[job_id]
+
+            expires_at = (
+                self.clock() + self.results_ttl
+                if self.results_ttl is not None else float("inf")
+            )
+
+            self._results.put(job_id, (expires_at, result))
+            self.done += 1
+
+            self._queue.task_done()
+
+    def submit(self, payload: Any) -> str:
+        """Method that queues a job and returns its id. It raises
+        errors.JobQueueFullError if the queue is full"""
+
+        if self._queue is None:
+            self.start()
+
+        assert self._queue is not None
+
+        job_id = uuid.uuid4().hex
+
+        try:
+            self._queue.put_nowait((job_id, payload))
+
+        except asyncio.QueueFull as error:
+            self.rejected += 1
+
+            raise errors.JobQueueFullError from error
+
+        self._pending[job_id] = "queued"
+        self.accepted += 1
+
+        return job_id
+
+    def get(self, job_id: str) -> Tuple[Optional[JobStatus], JsonDict]:
+        """Method that returns the status of a job and its result once it's
+        done, the status is None if there's no job with that id or its
+        result was already dropped"""
+
+        status = self._pending.get(job_id)
+
+        if status is not None:
+            return status, {}
+
+        entry = self._results.get(job_id)
+
+        if entry is None:
+            return None, {}
+
+        expires_at, result = entry
+
+        if expires_at <= self.clock():
+            self._results.pop(job_id)
+
+            return None, {}
+
+        return "done", result
+
+    async def close(self, timeout: float):
+        """Coroutine that waits up to timeout seconds for the queued jobs to
+        be done, and then stops the workers. The payloads of the jobs that
+        were still queued are handed to discard"""
+
+        if self._queue is not None and self._pending:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "%d jobs were still queued when the workers stopped",
+                    len(self._pending),
+                )
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        while self._queue is not None and not self._queue.empty():
+            _, payload = self._queue.get_nowait()
+
+            if self.discard is not None:
+                await self.discard(payload)
+
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+
+    def get_stats(self) -> JobQueueStats:
+        """Method that takes a snapshot of the job queue"""
+
+        running = sum(
+            status == "running" for status in self._pending.values()
+        )
+
+        return JobQueueStats(
+            maxsize=self.maxsize,
+            workers=self.workers,
+            queued=len(self._pending) - running,
+            running=running,
+            results=len(self._results),
+            accepted=self.accepted,
+            rejected=self.rejected,
+            done=self.done,
+        )
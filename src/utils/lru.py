@@ -0,0 +1,169 @@
+"""Module that contains a bounded LRU cache whose entries can also expire
+after being idle for a while
+
+Usage:
+    from src.utils.lru import LRUCache
+
+    cache: LRUCache[str, int] = LRUCache(maxsize=2, ttl=60)
+
+    cache.put("asd", 1)
+
+    if cache.get("asd") is None:
+        # Code here
+
+        pass
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Callable, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+)
+
+
+TKey = TypeVar("TKey", bound=Hashable)
+TValue = TypeVar("TValue")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Dataclass that represents a snapshot of the cache's counters"""
+
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+
+class LRUCache(Generic[TKey, TValue]):
+    """Class that holds up to maxsize entries, dropping the least recently
+    used one when a new entry doesn't fit, and dropping every entry that
+    hasn't been used for ttl seconds (if a ttl is set)
+
+    on_evict is called with the key and the value of every dropped entry,
+    both evicted and expired ones"""
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[TKey, TValue], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        # Entries are kept from the least to the most recently used one,
+        # along with the time they were last used at
+        self._entries: "OrderedDict[TKey, Tuple[TValue, float]]" = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: TKey) -> bool:
+        return key in self._entries
+
+    def _is_expired(self, used_at: float, now: float) -> bool:
+        return self.ttl is not None and now - used_at >= self.ttl
+
+    def _drop(self, key: TKey):
+        value, _ = self._entries.pop(key)
+
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def get(self, key: TKey) -> Optional[TValue]:
+        """Method that returns the value of the key marking it as the most
+        recently used one, or None if it's not there or has expired"""
+
+        entry = self._entries.get(key)
+        now = self.clock()
+
+        if entry is not None and self._is_expired(entry[1], now):
+            self.expirations += 1
+            self._drop(key)
+
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+
+            return None
+
+        self.hits += 1
+        self._entries[key] = (entry[0], now)
+        self._entries.move_to_end(key)
+
+        return entry[0]
+
+    def put(self, key: TKey, value: TValue):
+        """Method that sets the value of the key as the most recently used
+        one, evicting the least recently used entries that don't fit"""
+
+        self._entries[key] = (value, self.clock())
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self.evictions += 1
+            self._drop(next(iter(self._entries)))
+
+    def pop(self, key: TKey) -> Optional[TValue]:
+        """Method that removes the key without counting it as an eviction,
+        and returns its value or None if it wasn't there"""
+
+        entry = self._entries.pop(key, None)
+
+        return entry[0] if entry is not None else None
+
+    def expire(self) -> int:
+        """Method that drops every entry that has been idle for ttl seconds
+        and returns how many of them were dropped
+
+        Since entries are kept in order of use, it stops at the first one
+        that hasn't expired"""
+
+        now = self.clock()
+        expired = 0
+
+        while self._entries:
+            key, (_, used_at) = next(iter(self._entries.items()))
+
+            if not self._is_expired(used_at, now):
+                break
+
+            self.expirations += 1
+            expired += 1
+            self._drop(key)
+
+        return expired
+
+    def items(self) -> Iterator[Tuple[TKey, TValue]]:
+        """Method that iterates over the keys and values, from the least to
+        the most recently used one, without touching their order"""
+
+        for key, (value, _) in list(self._entries.items()):
+            yield key, value
+
+    def get_stats(self) -> CacheStats:
+        """Method that takes a snapshot of the counters of the cache"""
+
+        return CacheStats(
+            size=len(self._entries),
+            maxsize=self.maxsize,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+        )
@@ -0,0 +1,128 @@
+"""Module that contains the cache of the base64 media that have already been
+validated, keyed by a hash of their content
+
+Campaigns send the same file to thousands of phones, so once a file has
+passed validation, the next messages with it skip validation altogether,
+and reuse the mimetype and filename derived from it. The key is a SHA-256 of
+the content, which costs a fraction of validating it and, unlike a faster
+non-cryptographic hash, can't be made to collide with a file that was valid
+
+Usage:
+    from src.utils.media_cache import MediaCache, MediaInfo
+
+    cache = MediaCache(maxsize=1024)
+
+    media = cache.wrap("image", value)
+
+    if media.info is None:
+        # Validate it, then
+
+        cache.put(media, MediaInfo("image", "image/png", "noname.png"))
+"""
+
+import hashlib
+import sys
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from src.utils.lru import LRUCache
+
+
+# The media type the media was validated as, e.g. image, and the hash of it
+MediaKey = Tuple[Optional[str], bytes]
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """Dataclass that represents what was derived from a valid base64 media
+    while validating it"""
+
+    kind: Optional[str]
+    mimetype: str
+    filename: Optional[str]
+
+
+@dataclass(frozen=True)
+class MediaCacheStats:
+    """Dataclass that represents a snapshot of the media cache, its memory
+    is an estimate of the bytes its entries take"""
+
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+    memory: int
+
+
+class MediaValue(str):
+    """Class that acts as a base64 media string that carries its cache key,
+    and what the cache knows about it if it was already validated"""
+
+    key: MediaKey
+    info: Optional[MediaInfo]
+
+
+def get_entry_size(key: MediaKey, info: MediaInfo) -> int:
+    """Function that estimates the bytes an entry of the cache takes"""
+
+    return sum(
+        sys.getsizeof(part)
+        for part in (key, *key, info, info.mimetype, info.filename)
+        if part is not None
+    )
+
+
+class MediaCache:
+    """Class that holds up to maxsize validated media, dropping the least
+    recently used one when a new one doesn't fit"""
+
+    def __init__(self, maxsize: int):
+        self._cache: LRUCache[MediaKey, MediaInfo] = LRUCache(
+            maxsize, on_evict=self._on_evict
+        )
+
+        self.memory = 0
+
+    def _on_evict(self, key: MediaKey, info: MediaInfo):
+        self.memory -= get_entry_size(key, info)
+
+    def wrap(self, kind: Optional[str], value: str) -> MediaValue:
+        """Method that hashes a base64 media that's about to be validated as
+        the given kind, and wraps it along with what the cache knows about
+        it, if anything"""
+
+        media = MediaValue(value)
+
+        media.key = (kind, hashlib.sha256(value.encode("utf-8")).digest())
+        media.info = self._cache.get(media.key)
+
+        return media
+
+    def put(self, media: MediaValue, info: MediaInfo):
+        """Method that caches what was derived from a media once it's been
+        validated"""
+
+        if media.key not in self._cache:
+            self.memory += get_entry_size(media.key, info)
+
+        self._cache.put(media.key, info)
+
+        media.info = info
+
+    def get_stats(self) -> MediaCacheStats:
+        """Method that takes a snapshot of the cache"""
+
+        stats = self._cache.get_stats()
+        lookups = stats.hits + stats.misses
+
+        return MediaCacheStats(
+            size=stats.size,
+            maxsize=stats.maxsize,
+            hits=stats.hits,
+            misses=stats.misses,
+            evictions=stats.evictions,
+            hit_ratio=stats.hits / lookups if lookups else 0.0,
+            memory=self.memory,
+        )
@@ -1,9 +1,11 @@
 """Module that contains the Provider abstract base class"""
 
 from abc import ABC, abstractmethod
+from typing import Optional, Union
 
 from src.utils.type_aliases import JsonDict
 from src.schemas.message_dto import MessageDTO
+from src.schemas.upload_dto import UploadDTO
 
 
 # This is an abstract base class, the dispatcher only uses a send method
@@ -15,6 +17,11 @@ class Provider(ABC):
     what methods there must be in them"""
 
     @abstractmethod
-    async def send(self, msg: MessageDTO) -> JsonDict:
+    async def send(
+        self,
+        msg: Union[MessageDTO, UploadDTO],
+        deadline: Optional[float] = None,
+    ) -> JsonDict:
         """Class method that makes a POST request to whatever service
-        the provider is implemented for"""
+        the provider is implemented for, giving up once the deadline (in
+        time.monotonic() seconds) passes"""
@@ -0,0 +1,179 @@
+"""Module that contains the token-bucket rate limiter that paces the
+requests sent to each Chat API instance
+
+Requests over the rate aren't rejected straight away, they wait in a bounded
+queue for their turn. Each request reserves a token as soon as it arrives,
+even if the bucket is empty, so the waits are handed out in arrival order
+without any task having to wake the queue up. A request is only rejected if
+the queue is full or its wait would be longer than the maximum wait
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from src.utils import errors
+from src.utils.lru import LRUCache
+
+
+MAX_BUCKETS = 10000
+
+# Buckets that haven't been used for this long are dropped, they'd be full
+# by then anyways
+BUCKET_TTL = 600.0
+
+
+@dataclass(frozen=True)
+class RateLimiterStats:
+    """Dataclass that represents a snapshot of the rate limiter's
+    counters"""
+
+    buckets: int
+    queued: int
+    admitted: int
+    delayed: int
+    rejected: int
+    total_wait: float
+    max_wait: float
+
+
+class TokenBucket:
+    """Class that holds up to burst tokens, refilled at rate tokens per
+    second. Its tokens go below zero while requests are queued"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+
+        self.tokens = float(burst)
+        self.queued = 0
+        self._updated_at = clock()
+
+    def _refill(self):
+        now = self.clock()
+
+        self.tokens = min(
+            float(self.burst),
+            self.tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def reserve(self) -> float:
+        """Method that takes a token and returns how many seconds must be
+        waited until it's actually available"""
+
+        self._refill()
+
+        self.tokens -= 1
+
+        return max(0.0, -self.tokens / self.rate)
+
+    def cancel(self):
+        """Method that gives back a token that was reserved but won't be
+        used"""
+
+        self.tokens += 1
+
+
+class RateLimiter:
+    """Class that holds a token bucket per key (an instance or a token) and
+    makes requests wait for their turn"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        queue_size: int,
+        max_wait: float,
+        key_by: str = "instance",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # pylint: disable=too-many-arguments
+
+        self.rate = rate
+        self.burst = burst
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.key_by = key_by
+        self.clock = clock
+
+        self.admitted = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.longest_wait = 0.0
+
+        self.buckets: LRUCache[str, TokenBucket] = LRUCache(
+            maxsize=MAX_BUCKETS, ttl=BUCKET_TTL, clock=clock
+        )
+
+    def _get_bucket(self, key: str) -> TokenBucket:
+        bucket = self.buckets.get(key)
+
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst, self.clock)
+
+            self.buckets.put(key, bucket)
+
+        return bucket
+
+    async def wait(self, key: str, max_wait: Optional[float] = None) -> float:
+        """Coroutine that waits until the key's bucket lets the request
+        through, and returns how many seconds it waited
+
+        It raises errors.RateLimitedError if the queue of the key is full
+        or the wait would be longer than max_wait (defaults to the limiter's
+        maximum wait)"""
+
+        if max_wait is None:
+            max_wait = self.max_wait
+
+        bucket = self._get_bucket(key)
+        wait = bucket.reserve()
+
+        if wait and (bucket.queued >= self.queue_size or wait > max_wait):
+            bucket.cancel()
+            self.rejected += 1
+
+            raise errors.RateLimitedError
+
+        if wait:
+            self.delayed += 1
+            bucket.queued += 1
+
+            try:
+                await asyncio.sleep(wait)
+
+            except asyncio.CancelledError:
+                bucket.cancel()
+
+                raise
+
+            finally:
+                bucket.queued -= 1
+
+        self.admitted += 1
+        self.total_wait += wait
+        self.longest_wait = max(self.longest_wait, wait)
+
+        return wait
+
+    def get_stats(self) -> RateLimiterStats:
+        """Method that takes a snapshot of the counters of the limiter"""
+
+        return RateLimiterStats(
+            buckets=len(self.buckets),
+            queued=sum(bucket.queued for _, bucket in self.buckets.items()),
+            admitted=self.admitted,
+            delayed=self.delayed,
+            rejected=self.rejected,
+            total_wait=round(self.total_wait, 6),
+            max_wait=round(self.longest_wait, 6),
+        )
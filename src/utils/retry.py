@@ -0,0 +1,199 @@
+"""Module that contains the retry policy used when a request to an upstream
+fails in a way that's safe to retry
+
+Retries wait an exponential backoff with full jitter, so the clients that
+failed together don't come back together. They also draw from a retry
+budget shared by every request: retries can only be a share of the
+requests sent lately, so they can't multiply the load of an upstream that's
+already struggling
+"""
+
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Deque, List, Optional
+
+
+# Width in seconds of the window the retry budget looks back on
+BUDGET_WINDOW = 10
+
+
+@dataclass(frozen=True)
+class RetryStats:
+    """Dataclass that represents a snapshot of the retry counters"""
+
+    requests: int
+    retries: int
+    exhausted: int
+    over_budget: int
+    budget_left: int
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Function that parses the value of a Retry-After header, either in
+    seconds or as an HTTP date, into how many seconds must be waited. None
+    is returned if the value is missing or not valid"""
+
+    if not value:
+        return None
+
+    value = value.strip()
+
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryBudget:
+    """Class that allows retries as long as they don't go past a ratio of
+    the requests sent within the last BUDGET_WINDOW seconds. min_retries
+    retries are always allowed within the window, so a quiet upstream can
+    still be retried"""
+
+    def __init__(
+        self,
+        ratio: float,
+        min_retries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.clock = clock
+
+        # A [second, requests, retries] bucket per second of the window
+        self._buckets: Deque[List[int]] = deque()
+
+        self.requests = 0
+        self.retries = 0
+
+    def _get_bucket(self) -> List[int]:
+        now = int(self.clock())
+
+        while self._buckets and self._buckets[0][0] <= now - BUDGET_WINDOW:
+            self._buckets.popleft()
+
+        if not self._buckets or self._buckets[-1][0] != now:
+            self._buckets.append([now, 0, 0])
+
+        return self._buckets[-1]
+
+    def get_left(self) -> int:
+        """Method that returns how many retries the budget allows right
+        now"""
+
+        self._get_bucket()
+
+        requests = sum(bucket[1] for bucket in self._buckets)
+        retries = sum(bucket[2] for bucket in self._buckets)
+
+        return max(0, int(self.min_retries + requests * self.ratio) - retries)
+
+    def on_request(self):
+        """Method that records a request (not a retry of it), which adds to
+        the budget"""
+
+        self._get_bucket()[1] += 1
+        self.requests += 1
+
+    def try_retry(self) -> bool:
+        """Method that takes a retry from the budget, it returns False if
+        the budget is spent"""
+
+        if not self.get_left():
+            return False
+
+        self._get_bucket()[2] += 1
+        self.retries += 1
+
+        return True
+
+
+class RetryPolicy:
+    """Class that decides whether a failed attempt is retried and how long
+    to wait before doing it"""
+
+    def __init__(
+        self,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        budget: RetryBudget,
+        rng: Callable[[], float] = random.random,
+    ):
+        # pylint: disable=too-many-arguments
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.rng = rng
+
+        self.exhausted = 0
+        self.over_budget = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Method that returns the delay before retrying the given attempt
+        (starting at 1): a random time up to an exponential cap"""
+
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+        return self.rng() * cap
+
+    def get_delay(
+        self,
+        attempt: int,
+        retry_after: Optional[float] = None,
+        time_left: Optional[float] = None,
+    ) -> Optional[float]:
+        """Method that returns how long to wait before retrying the given
+        attempt, or None if it mustn't be retried: no attempts left, the
+        budget is spent, or the wait would be longer than max_delay or than
+        the time_left before the caller's deadline
+
+        retry_after (seconds asked by the upstream) is honored instead of
+        the backoff when given"""
+
+        if attempt >= self.max_attempts:
+            self.exhausted += 1
+
+            return None
+
+        delay = retry_after if retry_after is not None else (
+            self.backoff(attempt)
+        )
+
+        if delay > self.max_delay or (
+            time_left is not None and delay >= time_left
+        ):
+            return None
+
+        if not self.budget.try_retry():
+            self.over_budget += 1
+
+            return None
+
+        return delay
+
+    def get_stats(self) -> RetryStats:
+        """Method that takes a snapshot of the retry counters"""
+
+        return RetryStats(
+            requests=self.budget.requests,
+            retries=self.budget.retries,
+            exhausted=self.exhausted,
+            over_budget=self.over_budget,
+            budget_left=self.budget.get_left(),
+        )
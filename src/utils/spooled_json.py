@@ -0,0 +1,381 @@
+"""Module that contains the parser of JSON bodies spooled to a file, which
+leaves their long string values in the file
+
+A large base64 media would otherwise be in memory as the raw body, as the
+str it's parsed into and as the copies made of it before it's sent. Bodies
+over the spool threshold are received into a temporary file instead, and
+their flat JSON object is parsed a chunk at a time: short values are loaded
+and strings longer than the threshold are SpooledString, which only know
+where they are in the file. They're validated and sent reading the file a
+chunk at a time
+
+Only strings that are in the file exactly as they're sent are spooled, the
+ones with escapes or characters json.dumps escapes aren't. The parser gives
+up on anything but a flat object, so the body is parsed whole then and gets
+the very same errors
+
+Usage:
+    from src.utils.spooled_json import spool_stream, parse_spooled_object
+
+    file = await spool_stream(request.stream(), threshold)
+    data = parse_spooled_object(file, threshold)
+
+    if data is None:
+        # Parse the whole body
+
+        pass
+"""
+
+import re
+import tempfile
+from typing import (
+    Any, AsyncIterable, AsyncIterator, IO, Iterator, List, Optional
+)
+
+from starlette.datastructures import UploadFile
+
+from src.utils import fast_json
+from src.utils.base64_validator import (
+    SEPARATOR, is_base64, is_base64_data_uri
+)
+from src.utils.type_aliases import JsonDict
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Characters of the start of a spooled string kept in memory, enough for
+# the header of a data URI
+HEADER_SIZE = 256
+
+# Longest number, boolean or null taken, longer ones are left to the parser
+MAX_TOKEN_SIZE = 64
+
+# Characters of a JSON string that are sent as they are, the ones json.dumps
+# doesn't escape (with ensure_ascii on)
+SAFE_BYTES = bytes(byte for byte in range(0x20, 0x7F) if byte not in b'"\\')
+
+WHITESPACE = b" \t\n\r"
+
+TOKEN_END = re.compile(rb"[\s,}\]]")
+
+STRING_END = re.compile(rb'["\\]')
+
+# Returned by the reader for the values it doesn't take, None is a value
+INVALID = object()
+
+
+class SpooledString:
+    """Class that acts as a long string value of a spooled JSON body,
+    which stays in the body's file and is read from it a chunk at a time.
+    It's JSON-safe, made of printable ASCII characters"""
+
+    def __init__(
+        self, file: UploadFile, start: int, length: int, header: str
+    ):
+        self.file = file
+        self.start = start
+        self.length = length
+        self.header = header
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __repr__(self) -> str:
+        return (
+            f"SpooledString(header={self.header[:25]!r}, "
+            f"length={self.length})"
+        )
+
+    def iter_text(
+        self, start: int = 0, chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[str]:
+        """Method that yields the string from the given index on, a chunk
+        at a time"""
+
+        file = self.file.file
+
+        for position in range(start, self.length, chunk_size):
+            file.seek(self.start + position)
+
+            yield file.read(min(chunk_size, self.length - position)).decode(
+                "ascii"
+            )
+
+    async def iter_chunks(self, chunk_size: int) -> AsyncIterator[bytes]:
+        """Coroutine that yields the string encoded, a chunk at a time, as
+        a StreamingJSONBody sends it. Reads are off the event loop once
+        the file is on disk"""
+
+        for position in range(0, self.length, chunk_size):
+            await self.file.seek(self.start + position)
+
+            yield await self.file.read(  # type: ignore
+                min(chunk_size, self.length - position)
+            )
+
+
+def is_spooled_base64_data_uri(
+    value: SpooledString, media_type: Optional[str] = None
+) -> bool:
+    """Function that tells whether a spooled string is a base64 data URI of
+    the given media type, reading its data a chunk at a time
+
+    It only accepts strings is_base64_data_uri accepts, but not all of
+    them: the data must start right after the first separator, within the
+    header"""
+
+    separator = value.header.find(SEPARATOR)
+
+    if separator == -1:
+        return False
+
+    data_start = separator + len(SEPARATOR)
+
+    if not is_base64_data_uri(value.header[:data_start], media_type):
+        return False
+
+    if (len(value) - data_start) % 4:
+        return False
+
+    # Chunks are made of groups of four characters, only the last one can
+    # be padded
+    position = data_start
+
+    for chunk in value.iter_text(data_start, CHUNK_SIZE):
+        position += len(chunk)
+
+        if not is_base64(chunk) or (
+            chunk.endswith("=") and position < len(value)
+        ):
+            return False
+
+    return True
+
+
+async def spool_stream(
+    stream: AsyncIterable[bytes], threshold: int
+) -> UploadFile:
+    """Coroutine that writes a body to a spool file as it's received, the
+    file rolls over to disk once the body is larger than the threshold"""
+
+    # It's closed by whoever takes the message, once it's sent
+    # pylint: disable-next=consider-using-with
+    spool = tempfile.SpooledTemporaryFile(max_size=threshold)
+    file = UploadFile("body", spool)
+
+    async for chunk in stream:
+        await file.write(chunk)
+
+    return file
+
+
+class JSONReader:
+    """Class that reads the values of a flat JSON object from a file, a
+    chunk at a time"""
+
+    def __init__(self, file: IO[bytes], chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+
+        self.buffer = b""
+        self.position = 0
+        # Where the buffer starts in the file
+        self.offset = 0
+
+    def fill(self) -> bool:
+        """Method that reads the next chunk of the file, dropping what was
+        already read. It returns False at the end of the file"""
+
+        chunk = self.file.read(self.chunk_size)
+
+        self.offset += self.position
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+        return bool(chunk)
+
+    def peek(self) -> Optional[int]:
+        """Method that skips whitespace and returns the next character, or
+        None at the end of the file"""
+
+        while True:
+            while (
+                self.position < len(self.buffer) and
+                self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+
+            if not self.fill():
+                return None
+
+    def expect(self, character: bytes) -> bool:
+        """Method that skips whitespace and reads the given character if
+        it's the next one"""
+
+        if self.peek() != ord(character):
+            return False
+
+        self.position += 1
+
+        return True
+
+    def read_token(self) -> Any:
+        """Method that reads a number, a boolean or null"""
+
+        while True:
+            match = TOKEN_END.search(self.buffer, self.position)
+
+            if (
+                match is not None or
+                len(self.buffer) - self.position > MAX_TOKEN_SIZE or
+                not self.fill()
+            ):
+                break
+
+        end = match.start() if match is not None else len(self.buffer)
+        token = self.buffer[self.position:end]
+
+        if not token or len(token) > MAX_TOKEN_SIZE:
+            return INVALID
+
+        self.position = end
+
+        try:
+            return fast_json.loads(token)
+
+        except ValueError:
+            return INVALID
+
+    def read_string(self, file: UploadFile, threshold: int) -> Any:
+        """Method that reads a string, it's spooled if it's longer than the
+        threshold (in bytes of the file)"""
+
+        # pylint: disable=too-many-branches,too-many-return-statements
+
+        self.position += 1
+
+        start = self.offset + self.position
+        parts: List[bytes] = []
+        header = b""
+        length = 0
+        escaped = False
+        spooled = False
+
+        while True:
+            match = STRING_END.search(self.buffer, self.position)
+            end = match.start() if match is not None else len(self.buffer)
+            part = self.buffer[self.position:end]
+
+            length += len(part)
+            self.position = end
+
+            if not spooled and length > threshold:
+                if escaped:
+                    return INVALID
+
+                spooled = True
+                part = b"".join((*parts, part))
+
+                parts.clear()
+
+            if not spooled:
+                parts.append(part)
+
+            elif part.translate(None, SAFE_BYTES):
+                return INVALID
+
+            elif len(header) < HEADER_SIZE:
+                header = (header + part)[:HEADER_SIZE]
+
+            if match is None:
+                if not self.fill():
+                    return INVALID
+
+                continue
+
+            if self.buffer[end] == ord('"'):
+                self.position += 1
+
+                break
+
+            # An escape, both of its characters are taken as they are
+            if spooled or (
+                end + 1 >= len(self.buffer) and not self.fill()
+            ):
+                return INVALID
+
+            escaped = True
+            length += 2
+            parts.append(self.buffer[self.position:self.position + 2])
+
+            self.position += 2
+
+        if spooled:
+            return SpooledString(file, start, length, header.decode("ascii"))
+
+        try:
+            return fast_json.loads(b'"%s"' % b"".join(parts))
+
+        except ValueError:
+            return INVALID
+
+    def read_value(self, file: UploadFile, threshold: int) -> Any:
+        """Method that reads a value that isn't an object or an array"""
+
+        character = self.peek()
+
+        if character == ord('"'):
+            return self.read_string(file, threshold)
+
+        if character is None or character in b"{[":
+            return INVALID
+
+        return self.read_token()
+
+
+def parse_spooled_object(
+    file: UploadFile, threshold: int
+) -> Optional[JsonDict]:
+    """Function that parses the flat JSON object in a spool file, leaving
+    its strings longer than the threshold in it. It returns None if the
+    body isn't a flat JSON object, or has strings it can't spool"""
+
+    # pylint: disable=too-many-return-statements
+
+    file.file.seek(0)
+
+    reader = JSONReader(file.file)
+    data: JsonDict = {}
+
+    if not reader.expect(b"{"):
+        return None
+
+    if reader.expect(b"}"):
+        return data if reader.peek() is None else None
+
+    while True:
+        if reader.peek() != ord('"'):
+            return None
+
+        key = reader.read_string(file, threshold)
+
+        if not isinstance(key, str) or not reader.expect(b":"):
+            return None
+
+        value = reader.read_value(file, threshold)
+
+        if value is INVALID:
+            return None
+
+        data[key] = value
+
+        if reader.expect(b","):
+            continue
+
+        if reader.expect(b"}") and reader.peek() is None:
+            return data
+
+        return None
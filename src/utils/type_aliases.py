@@ -4,11 +4,16 @@ etc"""
 # pylint: disable=too-few-public-methods
 
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Pattern
 from pathlib import Path
 
 # pylint: disable-next=no-name-in-module
 from pydantic import ConstrainedStr
+# pylint: disable-next=no-name-in-module
+from pydantic.errors import StrRegexError
+
+from src.utils.base64_validator import is_base64_data_uri
+from src.utils.media_cache import MediaValue
 
 
 # Base 64 patterns are strict, but in reality you can
@@ -64,11 +69,34 @@ class Phone(ConstrainedStr):
 
 class Base64(NonEmpty):
     """Type for schema classes base64 string fields, contains base regex
-    pattern"""
+    pattern
+
+    Values are checked by is_base64_data_uri instead of the regex, which
+    matches the same strings in linear time. The regex is kept for the
+    OpenAPI schema and the error
+
+    Media the media cache already validated as this type (or as any other,
+    if this one takes every media type) aren't checked again"""
 
     strict = True
     max_length = 150000
-    regex = re.compile(base_64_pattern_file)
+    regex: Pattern[str] = re.compile(base_64_pattern_file)
+    media_type: Optional[str] = None
+
+    @classmethod
+    def validate(cls, value: str) -> str:
+        """Method that checks that the value is a base64 data URI of the
+        media type, unless the media cache already validated it"""
+
+        info = value.info if isinstance(value, MediaValue) else None
+
+        if info is not None and cls.media_type in (None, info.kind):
+            return value
+
+        if not is_base64_data_uri(value, cls.media_type):
+            raise StrRegexError(pattern=cls.regex.pattern)
+
+        return value
 
 
 class Base64Audio(Base64):
@@ -77,6 +105,7 @@ class Base64Audio(Base64):
 
     max_length = 10000
     regex = re.compile(base_64_pattern_audio)
+    media_type = "audio"
 
 
 class Base64Image(Base64):
@@ -84,6 +113,7 @@ class Base64Image(Base64):
     mimetype regex pattern"""
 
     regex = re.compile(base_64_pattern_image)
+    media_type = "image"
 
 
 class Base64Video(Base64):
@@ -91,6 +121,7 @@ class Base64Video(Base64):
     mimetype regex pattern"""
 
     regex = re.compile(base_64_pattern_video)
+    media_type = "video"
 
 
 class Base64Document(Base64):
@@ -98,6 +129,7 @@ class Base64Document(Base64):
     mimetype regex pattern"""
 
     regex = re.compile(base_64_pattern_document)
+    media_type = "application"
 
 
 class MessageBody(NonEmpty):
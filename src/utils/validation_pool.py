@@ -0,0 +1,186 @@
+"""Module that contains the pool large payloads are validated in, so their
+validation doesn't block the event loop
+
+Payloads up to a size threshold are validated inline, since handing them to
+a worker costs more than validating them. Larger ones go to a thread pool,
+or to a process pool so they're validated in parallel with the event loop
+instead of taking turns with it for the GIL, and the function they're
+validated with must be picklable then. Payloads that can't leave the
+process (e.g. open files) go to a thread pool of the same size even then
+
+Usage:
+    from src.utils.validation_pool import ValidationPool
+
+    pool = ValidationPool(threshold=32768, workers=4, executor="thread")
+
+    message = await pool.run(parse_message, body, len(body))
+"""
+
+import asyncio
+import time
+from concurrent.futures import (
+    Executor, ProcessPoolExecutor, ThreadPoolExecutor
+)
+from dataclasses import dataclass
+from typing import Callable, Literal, Optional, Tuple, TypeVar
+
+
+TPayload = TypeVar("TPayload")
+TResult = TypeVar("TResult")
+
+ExecutorKind = Literal["thread", "process"]
+
+
+@dataclass(frozen=True)
+# pylint: disable-next=too-many-instance-attributes
+class ValidationStats:
+    """Dataclass that represents a snapshot of the validation pool
+
+    queued is how many of the in-flight validations are waiting for a free
+    worker, and the queue waits are in seconds"""
+
+    executor: str
+    workers: int
+    threshold: int
+    inline: int
+    offloaded: int
+    in_flight: int
+    queued: int
+    peak_queued: int
+    avg_queue_wait: float
+    max_queue_wait: float
+
+
+def run_timed(
+    func: Callable[[TPayload], TResult], payload: TPayload
+) -> Tuple[float, TResult]:
+    """Function that runs in a worker, returning when it started along with
+    the result. time.monotonic() is system-wide, so it can be compared
+    across processes"""
+
+    return time.monotonic(), func(payload)
+
+
+# pylint: disable-next=too-many-instance-attributes
+class ValidationPool:
+    """Class that validates payloads inline or in a pool of workers,
+    depending on their size"""
+
+    def __init__(
+        self,
+        threshold: int,
+        workers: int,
+        executor: ExecutorKind = "thread",
+    ):
+        self.threshold = threshold
+        self.workers = workers
+        self.executor_kind = executor
+
+        # It's only created once a payload is offloaded, so importing the
+        # pool doesn't start any threads or processes
+        self._executor: Optional[Executor] = None
+        self._thread_executor: Optional[Executor] = None
+
+        self.inline = 0
+        self.offloaded = 0
+        self.in_flight = 0
+        self.peak_queued = 0
+        self.timed = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+
+    def _get_executor(self, picklable: bool = True) -> Executor:
+        if self.executor_kind == "process" and not picklable:
+            if self._thread_executor is None:
+                self._thread_executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="validation"
+                )
+
+            return self._thread_executor
+
+        if self._executor is None:
+            self._executor = (
+                ProcessPoolExecutor(self.workers)
+                if self.executor_kind == "process"
+                else ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="validation"
+                )
+            )
+
+        return self._executor
+
+    def get_queued(self) -> int:
+        """Method that returns how many offloaded validations are waiting
+        for a free worker"""
+
+        return max(0, self.in_flight - self.workers)
+
+    async def run(
+        self,
+        func: Callable[[TPayload], TResult],
+        payload: TPayload,
+        size: int,
+        picklable: bool = True,
+    ) -> TResult:
+        """Coroutine that validates a payload of the given size (e.g. its
+        bytes) with a function, in a worker if it's larger than the
+        threshold, and returns what the function returns. Payloads that
+        aren't picklable, or whose result isn't, are validated in a thread
+        whatever the executor"""
+
+        if size <= self.threshold:
+            self.inline += 1
+
+            return func(payload)
+
+        self.offloaded += 1
+        self.in_flight += 1
+        self.peak_queued = max(self.peak_queued, self.get_queued())
+
+        submitted_at = time.monotonic()
+
+        try:
+            started_at, result = await asyncio.get_running_loop(
+            ).run_in_executor(
+                self._get_executor(picklable), run_timed, func, payload
+            )
+
+        finally:
+            self.in_flight -= 1
+
+        queue_wait = max(0.0, started_at - submitted_at)
+
+        self.timed += 1
+        self.total_queue_wait += queue_wait
+        self.max_queue_wait = max(self.max_queue_wait, queue_wait)
+
+        return result
+
+    def close(self):
+        """Method that shuts the workers down, without waiting for the
+        validations they're running"""
+
+        for executor in (self._executor, self._thread_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+        self._executor = None
+        self._thread_executor = None
+
+    def get_stats(self) -> ValidationStats:
+        """Method that takes a snapshot of the pool"""
+
+        return ValidationStats(
+            executor=self.executor_kind,
+            workers=self.workers,
+            threshold=self.threshold,
+            inline=self.inline,
+            offloaded=self.offloaded,
+            in_flight=self.in_flight,
+            queued=self.get_queued(),
+            peak_queued=self.peak_queued,
+            avg_queue_wait=(
+                self.total_queue_wait / self.timed if self.timed else 0.0
+            ),
+            max_queue_wait=self.max_queue_wait,
+        )
@@ -1,7 +1,79 @@
 """Module that contains the provider constructed from WhatsappProvider"""
 
+import httpx
+
 from src.env_variables import env_variables
+from src.utils.circuit_breaker import BreakerSettings, CircuitBreakers
+from src.utils.concurrency_limiter import ConcurrencyLimiters
+from src.utils.dns_cache import DNSCache
+from src.utils.rate_limiter import RateLimiter
+from src.utils.retry import RetryBudget, RetryPolicy
 from .whatsapp_provider import WhatsappProvider
 
 
-provider = WhatsappProvider(api_url=env_variables.API_URL)
+rate_limit = env_variables.RATE_LIMIT_PER_SECOND
+
+provider = WhatsappProvider(
+    api_url=env_variables.API_URL,
+    limits=httpx.Limits(
+        max_connections=env_variables.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=env_variables.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=env_variables.HTTP_KEEPALIVE_EXPIRY,
+    ),
+    http2=env_variables.HTTP2,
+    timeout=httpx.Timeout(
+        connect=env_variables.HTTP_CONNECT_TIMEOUT,
+        read=env_variables.HTTP_READ_TIMEOUT,
+        write=env_variables.HTTP_WRITE_TIMEOUT,
+        pool=env_variables.HTTP_POOL_TIMEOUT,
+    ),
+    action_timeouts=env_variables.ACTION_TIMEOUTS,
+    dns_cache=DNSCache() if env_variables.DNS_CACHE else None,
+    warm_up_connections=env_variables.WARM_UP_CONNECTIONS,
+    warm_up_timeout=env_variables.WARM_UP_TIMEOUT,
+    stream_media=env_variables.STREAM_MEDIA,
+    instance_limits=httpx.Limits(
+        max_connections=env_variables.INSTANCE_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=(
+            env_variables.INSTANCE_POOL_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        keepalive_expiry=env_variables.HTTP_KEEPALIVE_EXPIRY,
+    ) if env_variables.INSTANCE_POOLS else None,
+    max_instance_clients=env_variables.INSTANCE_POOL_MAX_CLIENTS,
+    instance_idle_ttl=env_variables.INSTANCE_POOL_IDLE_TTL,
+    limiters=ConcurrencyLimiters(
+        host_limit=env_variables.HOST_CONCURRENCY_LIMIT,
+        host_max_limit=env_variables.HOST_CONCURRENCY_MAX_LIMIT,
+        instance_limit=env_variables.INSTANCE_CONCURRENCY_LIMIT,
+        instance_max_limit=env_variables.INSTANCE_CONCURRENCY_MAX_LIMIT,
+        acquire_timeout=env_variables.CONCURRENCY_ACQUIRE_TIMEOUT,
+    ) if env_variables.CONCURRENCY_LIMITS else None,
+    rate_limiter=RateLimiter(
+        rate=rate_limit,
+        burst=env_variables.RATE_LIMIT_BURST,
+        queue_size=env_variables.RATE_LIMIT_QUEUE_SIZE,
+        max_wait=env_variables.RATE_LIMIT_MAX_WAIT,
+        key_by=env_variables.RATE_LIMIT_KEY,
+    ) if rate_limit else None,
+    retry_policy=RetryPolicy(
+        max_attempts=env_variables.RETRY_MAX_ATTEMPTS,
+        base_delay=env_variables.RETRY_BASE_DELAY,
+        max_delay=env_variables.RETRY_MAX_DELAY,
+        budget=RetryBudget(
+            ratio=env_variables.RETRY_BUDGET_RATIO,
+            min_retries=env_variables.RETRY_BUDGET_MIN_RETRIES,
+        ),
+    ),
+    breakers=CircuitBreakers(
+        BreakerSettings(
+            window_size=env_variables.CIRCUIT_WINDOW_SIZE,
+            min_requests=env_variables.CIRCUIT_MIN_REQUESTS,
+            error_rate=env_variables.CIRCUIT_ERROR_RATE,
+            slow_call_latency=env_variables.CIRCUIT_SLOW_CALL_LATENCY,
+            slow_call_rate=env_variables.CIRCUIT_SLOW_CALL_RATE,
+            open_duration=env_variables.CIRCUIT_OPEN_DURATION,
+            probe_interval=env_variables.CIRCUIT_PROBE_INTERVAL,
+            probe_successes=env_variables.CIRCUIT_PROBE_SUCCESSES,
+        )
+    ) if env_variables.CIRCUIT_BREAKERS else None,
+)
@@ -1,7 +1,10 @@
 # pylint: disable=too-few-public-methods
 
 """Module that contains the schema classes to elaborate
-requests for Chat API"""
+requests for Chat API
+
+They describe the bodies of the requests, which are sent as the outbound
+messages of the outbound module, without being validated again"""
 
 from typing import Union
 
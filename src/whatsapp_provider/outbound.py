@@ -0,0 +1,146 @@
+"""Module that contains the outbound messages, the requests sent to Chat API
+made out of a validated message
+
+The message was already validated as a MessageDTO (or UploadDTO), so they
+aren't validated again as the Chat API schemas would, which ran the phone,
+text and base64 regexes over the whole media a second time. They only hold
+the values of the message, the media string is never copied, and they're
+turned into the flat JSON object sent, in the order of the Chat API
+schemas' fields
+
+Each kind of message is routed to its action by CHAT_API_TABLE, the
+dispatch table WhatsappProvider registers
+
+Usage:
+    from src.whatsapp_provider.outbound import get_outbound_message
+
+    json_data = get_outbound_message(message).to_json()
+"""
+
+from dataclasses import dataclass, fields
+from typing import Any, Callable, NewType, Optional, Union, cast
+
+from src.schemas.message_dto import MessageKind
+from src.schemas.upload_dto import UploadDTO
+from src.utils.dispatch import (
+    DispatchTable,
+    Message,
+    Route,
+    get_message_kind,
+    register_dispatch_table,
+)
+from src.utils.type_aliases import JsonDict
+from .streaming import Base64File, ChunkedValue
+
+
+Action = NewType("Action", str)
+
+SEND_MESSAGE = Action("sendMessage")
+SEND_FILE = Action("sendFile")
+SEND_AUDIO = Action("sendPTT")
+
+# The base64 of a media, or a value read from a file as it's sent
+Media = Union[str, ChunkedValue]
+
+
+@dataclass(frozen=True)
+class OutboundMessage:
+    """Dataclass that represents a request to Chat API, the route of its
+    message's kind tells the action it's sent to"""
+
+    __slots__ = ("phone",)
+
+    phone: str
+
+    def to_json(self) -> JsonDict:
+        """Method that returns the body of the request, the values aren't
+        copied"""
+
+        return {
+            field.name: getattr(self, field.name) for field in fields(self)
+        }
+
+
+@dataclass(frozen=True)
+class SendMessage(OutboundMessage):
+    """Dataclass that represents a /sendMessage request"""
+
+    __slots__ = ("body",)
+
+    body: str
+
+
+@dataclass(frozen=True)
+class SendFile(OutboundMessage):
+    """Dataclass that represents a /sendFile request"""
+
+    __slots__ = ("filename", "body")
+
+    filename: Optional[str]
+    body: Media
+
+
+@dataclass(frozen=True)
+class SendAudio(OutboundMessage):
+    """Dataclass that represents a /sendPTT request"""
+
+    __slots__ = ("audio",)
+
+    audio: Media
+
+
+def get_media(message: Message, kind: MessageKind) -> Media:
+    """Function that gets the media of a message, the file of an upload is
+    encoded to base64 as it's sent"""
+
+    if isinstance(message, UploadDTO):
+        return Base64File(message.file, cast(str, message.mimetype))
+
+    return cast(Media, getattr(message, kind.value))
+
+
+def build_send_message(message: Message, kind: MessageKind) -> SendMessage:
+    """Function that builds the /sendMessage request of a text message"""
+
+    return SendMessage(message.phone, cast(str, getattr(message, kind.value)))
+
+
+def build_send_file(message: Message, kind: MessageKind) -> SendFile:
+    """Function that builds the /sendFile request of an image, a video or a
+    document"""
+
+    return SendFile(message.phone, message.filename, get_media(message, kind))
+
+
+def build_send_audio(message: Message, kind: MessageKind) -> SendAudio:
+    """Function that builds the /sendPTT request of an audio"""
+
+    return SendAudio(message.phone, get_media(message, kind))
+
+
+def make_route(action: Action, build: Callable[..., Any]) -> Route:
+    """Function that makes the route of an action of Chat API"""
+
+    return Route(
+        action, f"{{api_url}}/{{instance}}/{action}?token={{token}}", build
+    )
+
+
+CHAT_API_TABLE: DispatchTable = {
+    MessageKind.TEXT: make_route(SEND_MESSAGE, build_send_message),
+    MessageKind.IMAGE: make_route(SEND_FILE, build_send_file),
+    MessageKind.VIDEO: make_route(SEND_FILE, build_send_file),
+    MessageKind.DOCUMENT: make_route(SEND_FILE, build_send_file),
+    MessageKind.AUDIO: make_route(SEND_AUDIO, build_send_audio),
+}
+
+register_dispatch_table("whatsapp", CHAT_API_TABLE)
+
+
+def get_outbound_message(message: Message) -> OutboundMessage:
+    """Function that gets the outbound message of a validated MessageDTO
+    (or UploadDTO)"""
+
+    kind = get_message_kind(message)
+
+    return CHAT_API_TABLE[kind].build(message, kind)
@@ -0,0 +1,352 @@
+"""Module that contains the pooled transport used by WhatsappProvider's
+long-lived client, along with the statistics it collects
+
+The transport counts every request it sends and every connection the
+underlying connection pool opens, so the reuse rate of the pool can be
+checked in production through /management/metrics. It also counts the HTTP
+version every response came with, which tells whether Chat API negotiated
+HTTP/2 or the pool fell back to HTTP/1.1
+
+The keyed client pool holds one of those clients per Chat API instance, so a
+few busy instances can't take every connection of a single shared pool. It's
+bounded by an LRU cache whose idle entries expire, closing their sockets
+
+The caching DNS backend makes the pool resolve Chat API's host through a
+DNS cache instead of on every new connection
+"""
+
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from importlib.util import find_spec
+from ssl import SSLContext
+from typing import (
+    Any, Set, Dict, Callable, List, AsyncIterator, Optional, Mapping
+)
+
+import anyio
+import anyio.abc
+import httpx
+from anyio.streams.tls import TLSStream
+from httpcore import ConnectError, ConnectTimeout
+from httpcore._backends.anyio import AnyIOBackend, SocketStream
+from httpcore._backends.base import AsyncSocketStream
+from httpcore._exceptions import map_exceptions
+
+from src.utils.dns_cache import DNSCache
+from src.utils.lru import LRUCache
+
+
+def is_http2_available() -> bool:
+    """Function that tells whether the optional 'h2' package httpx needs
+    for HTTP/2 is installed"""
+
+    return find_spec("h2") is not None
+
+
+class CachingDNSBackend(AnyIOBackend):
+    """Class that acts as the httpcore backend of the pool, it resolves
+    hosts through a DNS cache and connects to the first of their addresses
+    that accepts the connection"""
+
+    def __init__(self, dns_cache: DNSCache):
+        super().__init__()
+
+        self.dns_cache = dns_cache
+
+    async def open_tcp_stream(
+        self,
+        hostname: bytes,
+        port: int,
+        ssl_context: Optional[SSLContext],
+        timeout: Mapping[str, Optional[float]],
+        *,
+        local_address: Optional[str],
+    ) -> AsyncSocketStream:
+        # Same as AnyIOBackend's, but connecting to a cached address. TLS
+        # still checks the certificate against the hostname
+        unicode_host = hostname.decode("utf-8")
+        exc_map = {
+            TimeoutError: ConnectTimeout,
+            OSError: ConnectError,
+            anyio.BrokenResourceError: ConnectError,
+        }
+
+        with map_exceptions(exc_map):
+            with anyio.fail_after(timeout.get("connect")):
+                addresses = await self.dns_cache.resolve(unicode_host)
+                stream = await self._connect(addresses, port, local_address)
+
+                if ssl_context:
+                    stream = await TLSStream.wrap(
+                        stream,
+                        hostname=unicode_host,
+                        ssl_context=ssl_context,
+                        standard_compatible=False,
+                    )
+
+        return SocketStream(stream=stream)
+
+    @staticmethod
+    async def _connect(
+        addresses: List[str], port: int, local_address: Optional[str]
+    ) -> anyio.abc.ByteStream:
+        error: Optional[OSError] = None
+
+        for address in addresses:
+            try:
+                return await anyio.connect_tcp(
+                    address, port, local_host=local_address
+                )
+
+            except OSError as exception:
+                error = exception
+
+        raise error or OSError("No addresses to connect to")
+
+
+@dataclass(frozen=True)
+class WarmUpStats:
+    """Dataclass that represents the progress of the warm-up of the pool"""
+
+    state: str
+    target: int
+    warmed: int
+    elapsed: Optional[float]
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Dataclass that represents a snapshot of the pool's statistics"""
+
+    requests: int
+    connections_opened: int
+    open_connections: int
+    idle_connections: int
+    reuse_rate: float
+    http_versions: Dict[str, int]
+
+
+class PooledTransport(httpx.AsyncHTTPTransport):
+    """Class that acts as the transport of WhatsappProvider's client, it
+    keeps track of how many requests went through the pool and how many
+    connections had to be opened for them"""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+
+        self.requests = 0
+        self.connections_opened = 0
+        self.http_versions: Dict[str, int] = {}
+
+        # Connections are held weakly, once the pool drops them they're gone
+        # from here as well, so this never grows past the pool's size
+        self._seen_connections: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+    def _get_connections(self) -> Set[Any]:
+        # httpcore doesn't expose the connections of the pool publicly
+        # pylint: disable-next=protected-access
+        return self._pool._get_all_connections()  # type: ignore
+
+    def _track_connections(self):
+        for connection in self._get_connections():
+            if connection in self._seen_connections:
+                continue
+
+            self._seen_connections.add(connection)
+            self.connections_opened += 1
+
+    async def handle_async_request(
+        self, request: httpx.Request
+    ) -> httpx.Response:
+        response = await super().handle_async_request(request)
+
+        http_version = response.extensions.get("http_version", b"")
+
+        if isinstance(http_version, bytes):
+            http_version = http_version.decode("ascii")
+
+        self.requests += 1
+        self.http_versions[http_version] = (
+            self.http_versions.get(http_version, 0) + 1
+        )
+        self._track_connections()
+
+        return response
+
+    def get_stats(self) -> PoolStats:
+        """Method that takes a snapshot of the statistics of the pool
+
+        The reuse rate is the share of requests that were sent through an
+        already open connection"""
+
+        connections = self._get_connections()
+
+        reuse_rate = 0.0
+
+        if self.requests:
+            reuse_rate = max(
+                0.0, 1 - self.connections_opened / self.requests
+            )
+
+        return PoolStats(
+            requests=self.requests,
+            connections_opened=self.connections_opened,
+            open_connections=len(connections),
+            idle_connections=len(
+                [
+                    connection for connection in connections
+                    if connection.is_idle()
+                ]
+            ),
+            reuse_rate=round(reuse_rate, 4),
+            http_versions=dict(self.http_versions),
+        )
+
+
+@dataclass(frozen=True)
+# pylint: disable-next=too-many-instance-attributes
+class KeyedPoolStats:
+    """Dataclass that represents a snapshot of the keyed pool's counters"""
+
+    clients: int
+    max_clients: int
+    leased_clients: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    requests: int
+    connections_opened: int
+    open_connections: int
+
+
+# pylint: disable-next=too-few-public-methods
+class KeyedClient:
+    """Class that holds a client of the keyed pool along with how many
+    sends are using it, so it's only closed once all of them are done"""
+
+    def __init__(self, client: httpx.AsyncClient, transport: PooledTransport):
+        self.client = client
+        self.transport = transport
+        self.leases = 0
+        self.evicted = False
+
+
+class KeyedClientPool:
+    """Class that holds one pooled client per key (a Chat API instance),
+    creating them on demand and closing the least recently used ones past
+    max_clients, as well as the ones that have been idle for idle_ttl
+    seconds"""
+
+    def __init__(
+        self,
+        make_transport: Callable[[], PooledTransport],
+        max_clients: int,
+        idle_ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.make_transport = make_transport
+
+        self._clients: LRUCache[str, KeyedClient] = LRUCache(
+            maxsize=max_clients,
+            ttl=idle_ttl,
+            on_evict=self._on_evict,
+            clock=clock,
+        )
+        self._to_close: List[KeyedClient] = []
+
+    def _on_evict(self, _: str, keyed_client: KeyedClient):
+        keyed_client.evicted = True
+
+        if not keyed_client.leases:
+            self._to_close.append(keyed_client)
+
+    async def _close_evicted(self):
+        to_close, self._to_close = self._to_close, []
+
+        for keyed_client in to_close:
+            await keyed_client.client.aclose()
+
+    @asynccontextmanager
+    async def lease(self, key: str) -> AsyncIterator[httpx.AsyncClient]:
+        """Async context manager that lends the client of the key, it's
+        created if there's none, and it's kept open while it's leased even
+        if it gets evicted meanwhile"""
+
+        self._clients.expire()
+
+        keyed_client = self._clients.get(key)
+
+        if keyed_client is None:
+            transport = self.make_transport()
+            keyed_client = KeyedClient(
+                httpx.AsyncClient(transport=transport), transport
+            )
+
+            self._clients.put(key, keyed_client)
+
+        # It's leased before anything is awaited, so it can't be evicted
+        # and closed by another lease meanwhile
+        keyed_client.leases += 1
+
+        try:
+            await self._close_evicted()
+
+            yield keyed_client.client
+
+        finally:
+            keyed_client.leases -= 1
+
+            if keyed_client.evicted and not keyed_client.leases:
+                await keyed_client.client.aclose()
+
+    async def close(self):
+        """Method that closes every client of the pool"""
+
+        to_close = self._to_close
+
+        for key, keyed_client in self._clients.items():
+            self._clients.pop(key)
+            to_close.append(keyed_client)
+
+        for keyed_client in to_close:
+            await keyed_client.client.aclose()
+
+        self._to_close = []
+
+    def get_stats(self) -> KeyedPoolStats:
+        """Method that takes a snapshot of the counters of the pool, the
+        pool statistics of every client are added up"""
+
+        cache_stats = self._clients.get_stats()
+        keyed_clients = [
+            keyed_client for _, keyed_client in self._clients.items()
+        ]
+        pool_stats = [
+            keyed_client.transport.get_stats()
+            for keyed_client in keyed_clients
+        ]
+
+        return KeyedPoolStats(
+            clients=cache_stats.size,
+            max_clients=cache_stats.maxsize,
+            leased_clients=len(
+                [
+                    keyed_client for keyed_client in keyed_clients
+                    if keyed_client.leases
+                ]
+            ),
+            hits=cache_stats.hits,
+            misses=cache_stats.misses,
+            evictions=cache_stats.evictions,
+            expirations=cache_stats.expirations,
+            requests=sum(stats.requests for stats in pool_stats),
+            connections_opened=sum(
+                stats.connections_opened for stats in pool_stats
+            ),
+            open_connections=sum(
+                stats.open_connections for stats in pool_stats
+            ),
+        )
@@ -0,0 +1,195 @@
+"""Module that contains the streaming JSON body used to send media to Chat
+API
+
+Letting httpx encode a /sendFile or /sendPTT request makes a whole str copy
+of the JSON document and then a whole bytes copy of it, for each message,
+before a single byte is sent. The streaming body writes the JSON object as
+it's sent instead, copying its long string values (the base64 of the media)
+a chunk at a time, and works its Content-Length out beforehand without
+encoding them
+
+Values read from a file as they're sent, such as uploaded files encoded
+to base64 or the long strings of a spooled body, are never whole in memory
+
+The bytes sent are exactly the ones json.dumps would have made
+"""
+
+import base64
+import json
+import os
+from typing import (
+    AsyncIterator, Dict, Iterator, List, Protocol, Union, cast,
+    runtime_checkable
+)
+
+from starlette.datastructures import UploadFile
+
+from src.utils.type_aliases import JsonDict
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+def is_json_safe(value: str) -> bool:
+    """Function that tells whether a string has none of the characters
+    json.dumps escapes (with ensure_ascii on), so it can be sent as it is.
+    It's made of str methods, since it goes through the whole media"""
+
+    return (
+        value.isascii() and
+        value.isprintable() and
+        '"' not in value and
+        "\\" not in value
+    )
+
+
+def escape_chunks(value: str, chunk_size: int) -> Iterator[bytes]:
+    """Function that yields a string encoded as the inside of a JSON
+    string, a chunk at a time. Escaping is done by character, so escaping
+    every chunk on its own makes the same bytes as escaping the whole of
+    it"""
+
+    is_safe = is_json_safe(value)
+
+    for start in range(0, len(value), chunk_size):
+        chunk = value[start:start + chunk_size]
+
+        if is_safe:
+            yield chunk.encode("ascii")
+
+        else:
+            yield json.dumps(chunk)[1:-1].encode("ascii")
+
+
+@runtime_checkable
+class ChunkedValue(Protocol):
+    """Class that acts as the interface of the string values that are read
+    from a file as they're sent, they must be JSON-safe"""
+
+    def __len__(self) -> int:
+        ...
+
+    def iter_chunks(self, chunk_size: int) -> AsyncIterator[bytes]:
+        """Method that yields the string, encoded, a chunk at a time"""
+
+
+class Base64File:
+    """Class that acts as the base64 data URI of an uploaded file, as a
+    value of a StreamingJSONBody, without reading the file until it's
+    sent"""
+
+    def __init__(self, file: UploadFile, mimetype: str):
+        self.file = file
+        self.mimetype = mimetype
+        self.prefix = f"data:{mimetype};base64,".encode("ascii")
+
+        # The spool file is at its end once it's been written
+        file.file.seek(0, os.SEEK_END)
+
+        self.size = file.file.tell()
+
+    def __len__(self) -> int:
+        return len(self.prefix) + (self.size + 2) // 3 * 4
+
+    def __repr__(self) -> str:
+        return f"Base64File(mimetype={self.mimetype!r}, size={self.size})"
+
+    async def iter_chunks(self, chunk_size: int) -> AsyncIterator[bytes]:
+        """Coroutine that yields the data URI a chunk at a time, reading
+        the file from its start. Every chunk but the last one encodes a
+        multiple of 3 bytes, so they make the same base64 the whole file
+        does"""
+
+        await self.file.seek(0)
+
+        yield self.prefix
+
+        while True:
+            data = await self.file.read(max(3, chunk_size // 4 * 3))
+
+            if not data:
+                return
+
+            yield base64.b64encode(cast(bytes, data))
+
+
+class StreamingJSONBody:
+    """Class that acts as the body of a request whose content is a flat
+    JSON object, encoding it chunk by chunk as it's sent. It can be sent
+    more than once, e.g. when the request is retried
+
+    Its values can be ChunkedValue, which are sent as JSON strings"""
+
+    def __init__(self, data: JsonDict, chunk_size: int = CHUNK_SIZE):
+        self.data = data
+        self.chunk_size = chunk_size
+
+        self.content_length = sum(
+            len(part) if isinstance(part, (bytes, ChunkedValue))
+            else self._get_length(part)
+            for part in self._get_parts()
+        )
+
+    def _get_parts(self) -> Iterator[Union[bytes, str, ChunkedValue]]:
+        # Long strings are left as they are, to be escaped chunk by chunk
+        yield b"{"
+
+        for index, (key, value) in enumerate(self.data.items()):
+            separator = ", " if index else ""
+
+            yield f"{separator}{json.dumps(key)}: ".encode("ascii")
+
+            if isinstance(value, ChunkedValue) or (
+                isinstance(value, str) and len(value) > self.chunk_size
+            ):
+                yield b'"'
+                yield value
+                yield b'"'
+
+            else:
+                yield json.dumps(value).encode("ascii")
+
+        yield b"}"
+
+    def _get_length(self, value: str) -> int:
+        if is_json_safe(value):
+            return len(value)
+
+        return sum(
+            len(chunk) for chunk in escape_chunks(value, self.chunk_size)
+        )
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Property that returns the headers that describe the body"""
+
+        return {
+            "Content-Type": "application/json",
+            "Content-Length": str(self.content_length),
+        }
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        # The small parts around long strings are joined, so they don't
+        # take a write each
+        pending: List[bytes] = []
+
+        for part in self._get_parts():
+            if isinstance(part, bytes):
+                pending.append(part)
+
+                continue
+
+            yield b"".join(pending)
+
+            pending.clear()
+
+            if isinstance(part, ChunkedValue):
+                async for chunk in part.iter_chunks(self.chunk_size):
+                    yield chunk
+
+                continue
+
+            for chunk in escape_chunks(part, self.chunk_size):
+                yield chunk
+
+        yield b"".join(pending)
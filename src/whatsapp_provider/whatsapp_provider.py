@@ -2,80 +2,106 @@
 
 The WhatsappProvider class is a class that inherits from an abstract
 base class Provider whose instance sends a request to the Chat API
-provider basing from a MessageDTO instance
+provider basing from a MessageDTO (or UploadDTO) instance
 """
 
-from typing import NewType, Dict, Type, cast, Tuple
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import (
+    Dict,
+    cast,
+    Tuple,
+    Optional,
+    AsyncIterator,
+    Mapping,
+    Union,
+)
 from urllib.parse import unquote
 
 import httpx
 
-# pylint: disable-next=no-name-in-module
-from pydantic import BaseModel
-
 from src.utils.type_aliases import JsonDict
 from src.schemas.message_dto import MessageDTO
+from src.schemas.upload_dto import UploadDTO
 from src.utils.provider import Provider
 from src.utils.logger import logger
 from src.utils import errors
-from .chat_api_request_schemas import (
-    SendFileSchema, SendMessageSchema, SendAudioSchema
+from src.utils import fast_json
+from src.utils.circuit_breaker import BreakerStats, CircuitBreakers
+from src.utils.dispatch import (
+    DispatchTable, get_dispatch_table, get_message_kind
+)
+from src.utils.dns_cache import DNSCache, DNSStats
+from src.utils.concurrency_limiter import (
+    ConcurrencyLimiters, LimiterStats, Sample
+)
+from src.utils.rate_limiter import RateLimiter, RateLimiterStats
+from src.utils.retry import RetryPolicy, RetryStats, parse_retry_after
+from .outbound import SEND_AUDIO, SEND_FILE
+from .streaming import ChunkedValue, StreamingJSONBody
+from .pool import (
+    PooledTransport,
+    PoolStats,
+    KeyedClientPool,
+    KeyedPoolStats,
+    CachingDNSBackend,
+    WarmUpStats,
+    is_http2_available,
 )
-
-
-Action = NewType("Action", str)
-
-SEND_MESSAGE = Action("sendMessage")
-SEND_FILE = Action("sendFile")
-SEND_AUDIO = Action("sendPTT")
 
 
 ERROR_CONTACT_DEVELOPERS = "\
 Error! Details in the microservice's logs. Must fix"
 
+# Status codes Chat API answers with when it can't keep up, they're fed back
+# to the concurrency limiters as dropped requests
+OVERLOAD_STATUS_CODES = (429, 503)
 
-def get_schema_name(schema: Type[BaseModel]) -> str:
-    """Helper function that gets the name of a schema
-    from a schema class"""
+# Errors raised before any byte of the request reached Chat API, so the
+# message can't have been sent and retrying it is safe
+RETRYABLE_ERRORS = (
+    httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout
+)
 
-    return cast(str, schema.schema()["title"])
+# Actions whose bodies carry media, they're streamed instead of being
+# encoded whole in memory
+STREAMED_ACTIONS = (SEND_FILE, SEND_AUDIO)
 
+# Seconds each phase of a request to Chat API may take, unless overridden
+# for its action
+DEFAULT_TIMEOUT = httpx.Timeout(connect=5.0, read=15.0, write=15.0, pool=5.0)
 
-SCHEMA_ACTION_MAP: Dict[str, Action] = {
-    get_schema_name(SendFileSchema): SEND_FILE,
-    get_schema_name(SendMessageSchema): SEND_MESSAGE,
-    get_schema_name(SendAudioSchema): SEND_AUDIO,
-}
 
+def get_time_left(deadline: Optional[float]) -> Optional[float]:
+    """Helper function that gets the seconds left until a deadline (in
+    time.monotonic() seconds), None if there's no deadline. It raises
+    errors.DeadlineExceededError if the deadline already passed"""
 
-def get_action_from_schema(schema: Type[BaseModel]) -> Action:
-    """Helper function that gets an action basing on the
-    schema class passed in"""
+    if deadline is None:
+        return None
 
-    return SCHEMA_ACTION_MAP[get_schema_name(schema)]
+    time_left = deadline - time.monotonic()
 
+    if time_left <= 0:
+        raise errors.DeadlineExceededError
 
-def get_chat_api_schema(message: MessageDTO) -> BaseModel:
-    """Helper function that gets a Chat API proper schema
-    basing on a MessageDTO schema instance"""
+    return time_left
 
-    media_source = (
-        message.image or
-        message.video or
-        message.document
-    )
 
-    if media_source:
-        return SendFileSchema(
-            phone=message.phone,
-            body=media_source,
-            filename=message.filename,
-        )
+def cap_timeout(
+    timeout: httpx.Timeout, time_left: Optional[float]
+) -> httpx.Timeout:
+    """Helper function that caps every phase of a timeout to the time left
+    until the caller's deadline"""
 
-    if message.text:
-        return SendMessageSchema(phone=message.phone, body=message.text)
+    if time_left is None:
+        return timeout
 
-    return SendAudioSchema(phone=message.phone, audio=message.audio)
+    return httpx.Timeout(**{
+        phase: time_left if value is None else min(value, time_left)
+        for phase, value in timeout.as_dict().items()
+    })
 
 
 def shorten_values(
@@ -89,7 +115,8 @@ def shorten_values(
     and returns it"""
 
     for msg_body in values:
-        if dict_data.get(msg_body) is None:
+        # Values read from files aren't strings, they're logged as their repr
+        if not isinstance(dict_data.get(msg_body), str):
             continue
 
         if len(dict_data[msg_body]) <= no_chars:
@@ -100,52 +127,593 @@ def shorten_values(
     return dict_data
 
 
-# pylint: disable-next=too-few-public-methods
+# pylint: disable-next=too-few-public-methods,too-many-instance-attributes
 class WhatsappProvider(Provider):
     """Class that acts as a provider that represents Chat API"""
 
-    def __init__(self, api_url: str):
+    def __init__(
+        self,
+        api_url: str,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+        instance_limits: Optional[httpx.Limits] = None,
+        max_instance_clients: int = 1000,
+        instance_idle_ttl: float = 60.0,
+        limiters: Optional[ConcurrencyLimiters] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breakers: Optional[CircuitBreakers] = None,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+        action_timeouts: Optional[Mapping[str, Mapping[str, float]]] = None,
+        dns_cache: Optional[DNSCache] = None,
+        warm_up_connections: int = 0,
+        warm_up_timeout: float = 10.0,
+        stream_media: bool = True,
+        dispatch_table: Optional[DispatchTable] = None,
+    ):
+        # pylint: disable=too-many-arguments,too-many-locals
+
         # Exception is thrown if not unquoted
         self.api_url = unquote(api_url, "utf-8")
+        self.api_host = httpx.URL(self.api_url).host
+
+        # Each kind of message is sent as the table routes it, Chat API's
+        # actions unless another table is given
+        self.dispatch_table = dispatch_table or get_dispatch_table("whatsapp")
+
+        # In-flight requests are only bounded if limiters are set, and
+        # they're only paced if a rate limiter is set
+        self.limiters = limiters
+        self.rate_limiter = rate_limiter
+
+        # Failed sends are only retried if a retry policy is set, and they
+        # only trip circuits if breakers are set
+        self.retry_policy = retry_policy
+        self.breakers = breakers
+
+        # Actions may override some phases of the default timeout, sending
+        # files takes longer than sending text
+        self.timeout = timeout
+        self.action_timeouts = {
+            action: httpx.Timeout(**{**timeout.as_dict(), **overrides})
+            for action, overrides in (action_timeouts or {}).items()
+        }
+
+        self.stream_media = stream_media
+
+        self.limits = limits or httpx.Limits()
+        self.http2 = http2
+
+        # Instances get a client of their own only if instance_limits is set
+        self.instance_limits = instance_limits
+        self.max_instance_clients = max_instance_clients
+        self.instance_idle_ttl = instance_idle_ttl
+
+        # Chat API's host is resolved on every new connection unless a DNS
+        # cache is set, and the pool only warms up if it's told how many
+        # connections to open
+        self.dns_cache = dns_cache
+        self.warm_up_connections = warm_up_connections
+        self.warm_up_timeout = warm_up_timeout
+
+        self._warm_up_state = "pending"
+        self._warmed = 0
+        self._warm_up_elapsed: Optional[float] = None
+        self._warm_up_task: Optional["asyncio.Future[None]"] = None
+
+        self._transport: Optional[PooledTransport] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._instance_pool: Optional[KeyedClientPool] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Property that returns the long-lived pooled client, it's created
+        on the spot in case the startup hook didn't run"""
+
+        if self._client is None or self._client.is_closed:
+            self.start()
+
+        return cast(httpx.AsyncClient, self._client)
+
+    def start(self):
+        """Method that creates the pooled client, it's meant to be called
+        from the startup hook of the app
+
+        With HTTP/2 on, concurrent sends are multiplexed over the pool's
+        connections. HTTP/1.1 is still offered through ALPN, so the pool
+        falls back to it whenever Chat API doesn't negotiate h2"""
+
+        http2 = self.http2 and is_http2_available()
+
+        if self.http2 and not http2:
+            logger.warning(
+                "HTTP/2 is on but the 'h2' package is not installed, "
+                "falling back to HTTP/1.1"
+            )
+
+        backend = (
+            CachingDNSBackend(self.dns_cache)
+            if self.dns_cache is not None else "auto"
+        )
+
+        self._transport = PooledTransport(
+            limits=self.limits, http1=True, http2=http2, backend=backend
+        )
+        self._client = httpx.AsyncClient(transport=self._transport)
+
+        if self.instance_limits is not None:
+            instance_limits = self.instance_limits
+
+            self._instance_pool = KeyedClientPool(
+                make_transport=lambda: PooledTransport(
+                    limits=instance_limits,
+                    http1=True,
+                    http2=http2,
+                    backend=backend,
+                ),
+                max_clients=self.max_instance_clients,
+                idle_ttl=self.instance_idle_ttl,
+            )
+
+    def start_warm_up(self):
+        """Method that starts warming the pool up in the background, it's
+        meant to be called from the startup hook of the app, right after
+        start. It does nothing if no warm-up connections were asked for"""
+
+        if self.warm_up_connections and self._warm_up_task is None:
+            self._warm_up_task = asyncio.ensure_future(self.warm_up())
+
+    async def _open_connection(self):
+        # Any response will do, it leaves a kept-alive connection behind
+        await self.client.request("HEAD", self.api_url)
+
+        self._warmed += 1
+
+    async def warm_up(self):
+        """Coroutine that resolves Chat API's host and opens the warm-up
+        connections concurrently, so the first messages don't pay for DNS,
+        TCP and TLS. It never raises, a failed warm-up just leaves the pool
+        cold
+
+        Only as many connections as the pool keeps alive are opened"""
+
+        started = time.monotonic()
+        target = self._get_warm_up_target()
+
+        self._warm_up_state = "running"
+        self._warmed = 0
+
+        try:
+            if self.dns_cache is not None:
+                await self.dns_cache.resolve(self.api_host)
+
+            results = await asyncio.wait_for(
+                asyncio.gather(
+                    *(self._open_connection() for _ in range(target)),
+                    return_exceptions=True
+                ),
+                self.warm_up_timeout
+            )
+
+            failures = [
+                result for result in results
+                if isinstance(result, Exception)
+            ]
+
+            if failures and not self._warmed:
+                raise failures[0]
+
+        except (asyncio.TimeoutError, httpx.HTTPError, OSError) as exception:
+            self._warm_up_state = "failed"
+
+            logger.warning(
+                "warm-up of the pool failed with %d/%d connections: %r",
+                self._warmed,
+                target,
+                exception
+            )
+
+        else:
+            self._warm_up_state = "done"
+
+        self._warm_up_elapsed = round(time.monotonic() - started, 6)
+
+    def _get_warm_up_target(self) -> int:
+        max_keepalive = self.limits.max_keepalive_connections
+
+        if max_keepalive is None:
+            return self.warm_up_connections
+
+        return min(self.warm_up_connections, max_keepalive)
+
+    def get_warm_up_stats(self) -> Optional[WarmUpStats]:
+        """Method that returns the progress of the warm-up, None if it's
+        off"""
+
+        if not self.warm_up_connections:
+            return None
+
+        return WarmUpStats(
+            state=self._warm_up_state,
+            target=self._get_warm_up_target(),
+            warmed=self._warmed,
+            elapsed=self._warm_up_elapsed,
+        )
+
+    def is_warm(self) -> bool:
+        """Method that tells whether the warm-up is over (or off), even if
+        it failed, so the app can report itself healthy"""
+
+        return (
+            not self.warm_up_connections
+            or self._warm_up_state in ("done", "failed")
+        )
+
+    def get_dns_stats(self) -> Optional[DNSStats]:
+        """Method that returns the counters of the DNS cache, None if it's
+        off"""
+
+        if self.dns_cache is None:
+            return None
+
+        return self.dns_cache.get_stats()
+
+    async def close(self):
+        """Method that closes the pooled client along with every connection
+        of it, it's meant to be called from the shutdown hook of the app"""
+
+        if self._warm_up_task is not None:
+            self._warm_up_task.cancel()
+            self._warm_up_task = None
+
+        if self._client is not None:
+            await self._client.aclose()
+
+        if self._instance_pool is not None:
+            await self._instance_pool.close()
 
-    def _make_url(self, action: Action, instance: str, token: str) -> str:
-        url = f"{self.api_url}/{instance}/{action}?token={token}"
+        self._client = None
+        self._transport = None
+        self._instance_pool = None
 
-        return url
+    def get_pool_stats(self) -> Optional[PoolStats]:
+        """Method that returns the live statistics of the pool, None if
+        the pooled client hasn't been created yet"""
 
-    async def send(self, msg: MessageDTO) -> JsonDict:
+        if self._transport is None:
+            return None
+
+        return self._transport.get_stats()
+
+    def get_instance_pool_stats(self) -> Optional[KeyedPoolStats]:
+        """Method that returns the counters of the per-instance clients,
+        None if they're off or haven't been created yet"""
+
+        if self._instance_pool is None:
+            return None
+
+        return self._instance_pool.get_stats()
+
+    def get_limiter_stats(
+        self
+    ) -> Optional[Dict[str, Dict[str, LimiterStats]]]:
+        """Method that returns the current limits of the concurrency
+        limiters by host and by instance, None if they're off"""
+
+        if self.limiters is None:
+            return None
+
+        return self.limiters.get_stats()
+
+    def get_rate_limiter_stats(self) -> Optional[RateLimiterStats]:
+        """Method that returns the counters of the rate limiter, None if
+        it's off"""
+
+        if self.rate_limiter is None:
+            return None
+
+        return self.rate_limiter.get_stats()
+
+    def get_retry_stats(self) -> Optional[RetryStats]:
+        """Method that returns the counters of the retries, None if they're
+        off"""
+
+        if self.retry_policy is None:
+            return None
+
+        return self.retry_policy.get_stats()
+
+    def get_breaker_stats(
+        self
+    ) -> Optional[Dict[str, Dict[str, BreakerStats]]]:
+        """Method that returns the state of the circuit breakers by host and
+        by instance, None if they're off"""
+
+        if self.breakers is None:
+            return None
+
+        return self.breakers.get_stats()
+
+    def _check_circuits(self, instance: str):
+        if self.breakers is not None:
+            self.breakers.check(self.api_host, instance)
+
+    @asynccontextmanager
+    async def _guard(self, instance: str) -> AsyncIterator[Sample]:
+        if self.breakers is None:
+            yield Sample()
+
+            return
+
+        async with self.breakers.guard(self.api_host, instance) as outcome:
+            yield outcome
+
+    async def _wait_turn(
+        self, msg: Union[MessageDTO, UploadDTO], deadline: Optional[float]
+    ) -> float:
+        if self.rate_limiter is None:
+            return 0.0
+
+        time_left = get_time_left(deadline)
+
+        return await self.rate_limiter.wait(
+            getattr(msg, self.rate_limiter.key_by),
+            max_wait=(
+                min(self.rate_limiter.max_wait, time_left)
+                if time_left is not None else None
+            ),
+        )
+
+    @asynccontextmanager
+    async def _limit(self, instance: str) -> AsyncIterator[Sample]:
+        if self.limiters is None:
+            yield Sample()
+
+            return
+
+        async with self.limiters.limit(self.api_host, instance) as sample:
+            yield sample
+
+    @asynccontextmanager
+    async def _lease_client(
+        self, instance: str
+    ) -> AsyncIterator[httpx.AsyncClient]:
+        client = self.client
+
+        if self._instance_pool is None:
+            yield client
+
+            return
+
+        async with self._instance_pool.lease(instance) as instance_client:
+            yield instance_client
+
+    async def _post(
+        self,
+        url: str,
+        body: Union[JsonDict, StreamingJSONBody],
+        instance: str,
+        timeout: httpx.Timeout,
+    ) -> httpx.Response:
+        async with self._guard(instance) as outcome, \
+                self._limit(instance) as sample, \
+                self._lease_client(instance) as client:
+            if isinstance(body, StreamingJSONBody):
+                http_response = await client.post(
+                    url=url,
+                    content=body,
+                    headers=body.headers,
+                    timeout=timeout,
+                )
+
+            else:
+                http_response = await client.post(
+                    url=url, json=body, timeout=timeout
+                )
+
+            status_code = http_response.status_code
+
+            sample.dropped = status_code in OVERLOAD_STATUS_CODES
+            outcome.dropped = sample.dropped or status_code >= 500
+
+        return http_response
+
+    def _get_retry_delay(
+        self,
+        attempt: int,
+        deadline: Optional[float],
+        http_response: Optional[httpx.Response] = None,
+    ) -> Optional[float]:
+        if self.retry_policy is None:
+            return None
+
+        time_left = (
+            deadline - time.monotonic() if deadline is not None else None
+        )
+
+        if http_response is None:
+            return self.retry_policy.get_delay(attempt, time_left=time_left)
+
+        # Chat API may have started processing an overloaded request, it's
+        # only retried when it explicitly asks for it through Retry-After
+        retry_after = parse_retry_after(
+            http_response.headers.get("Retry-After")
+        )
+
+        if (
+            http_response.status_code not in OVERLOAD_STATUS_CODES
+            or retry_after is None
+        ):
+            return None
+
+        return self.retry_policy.get_delay(attempt, retry_after, time_left)
+
+    async def _post_with_retries(
+        self,
+        url: str,
+        body: Union[JsonDict, StreamingJSONBody],
+        msg: Union[MessageDTO, UploadDTO],
+        timeout: httpx.Timeout,
+        deadline: Optional[float],
+    ) -> Tuple[httpx.Response, int]:
+        # pylint: disable=too-many-arguments
+
+        if self.retry_policy is not None:
+            self.retry_policy.budget.on_request()
+
+        attempt = 1
+
+        while True:
+            # Retries take their turn as well, so they don't burst past the
+            # rate limit into a struggling upstream. The first attempt's was
+            # already taken
+            if attempt > 1:
+                await self._wait_turn(msg, deadline)
+
+            time_left = get_time_left(deadline)
+
+            try:
+                # Nothing keeps going once the caller's deadline passes,
+                # waiting for a slot or a connection included
+                http_response = await asyncio.wait_for(
+                    self._post(
+                        url,
+                        body,
+                        msg.instance,
+                        cap_timeout(timeout, time_left),
+                    ),
+                    time_left
+                )
+
+            except RETRYABLE_ERRORS as exception:
+                delay = self._get_retry_delay(attempt, deadline)
+
+                if delay is None:
+                    raise
+
+                reason = repr(exception)
+
+            else:
+                delay = self._get_retry_delay(
+                    attempt, deadline, http_response
+                )
+
+                if delay is None:
+                    return http_response, attempt - 1
+
+                reason = f"status code {http_response.status_code}"
+
+            logger.warning(
+                "attempt %d to Chat API failed (%s), retrying in %.3fs",
+                attempt,
+                reason,
+                delay
+            )
+
+            await asyncio.sleep(delay)
+
+            attempt += 1
+
+    def _encode_body(
+        self, action: str, json_data: JsonDict
+    ) -> Union[JsonDict, StreamingJSONBody]:
+        # Values read from files can only be streamed, they're never read
+        # whole
+        if action in STREAMED_ACTIONS and (
+            self.stream_media or any(
+                isinstance(value, ChunkedValue)
+                for value in json_data.values()
+            )
+        ):
+            return StreamingJSONBody(json_data)
+
+        return json_data
+
+    async def send(
+        self,
+        msg: Union[MessageDTO, UploadDTO],
+        deadline: Optional[float] = None,
+    ) -> JsonDict:
         """Class method that sends a POST request to Chat API
-        basing from a MessageDTO schema instance"""
+        basing from a MessageDTO (or UploadDTO) schema instance
 
-        schema = get_chat_api_schema(msg)
+        If a deadline (in time.monotonic() seconds) is given, the queueing,
+        the timeouts and the retries are cut to fit before it, and
+        errors.DeadlineExceededError is raised once it passes"""
 
-        action = get_action_from_schema(type(schema))
+        kind = get_message_kind(msg)
+        route = self.dispatch_table[kind]
 
-        url = self._make_url(action, msg.instance, msg.token)
+        url = route.make_url(self.api_url, msg.instance, msg.token)
 
-        json_data = schema.dict()
+        json_data = route.build(msg, kind).to_json()
+
+        self._check_circuits(msg.instance)
+
+        queue_wait = await self._wait_turn(msg, deadline)
 
         logger.info(
-            "sending message: %s",
+            "sending message (queued for %.3fs): %s",
+            queue_wait,
             shorten_values({**json_data}, ("body", "audio"))
         )
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = (await client.post(url=url, json=json_data)).json()
+        try:
+            http_response, retries = await self._post_with_retries(
+                url,
+                self._encode_body(route.action, json_data),
+                msg,
+                self.action_timeouts.get(route.action, self.timeout),
+                deadline,
+            )
+
+        except asyncio.TimeoutError as exception:
+            raise errors.DeadlineExceededError from exception
+
+        except httpx.ConnectTimeout as exception:
+            raise errors.ConnectionTimeoutError from exception
+
+        except httpx.TransportError as exception:
+            raise errors.UpstreamConnectionError from exception
+
+        # A gateway in front of Chat API may respond an HTML error page
+        # instead
+        try:
+            response = fast_json.loads(http_response.content)
 
-            except httpx.ConnectTimeout as exception:
-                raise errors.ConnectionTimeoutError from exception
+        except ValueError as exception:
+            logger.error(
+                "Chat API responded a body that isn't JSON (status %d): %r",
+                http_response.status_code,
+                http_response.content[:200],
+            )
+
+            raise errors.BadUpstreamResponseError from exception
+
+        if not isinstance(response, dict):
+            logger.error(
+                "Chat API responded a JSON that isn't an object: %r",
+                response,
+            )
+
+            raise errors.BadUpstreamResponseError
 
         logger.info(
-            "response got from Chat API: %s",
+            "response got from Chat API (retries: %d): %s",
+            retries,
             response
         )
 
+        # It's made as SentMessageResponseSchema says, since it isn't
+        # validated again before being responded
+        error_message = response.get("error") or response.get("message")
+        message_id = response.get("id")
+
         schema_compliant_data = {
-            "success": response.get("sent", False),
-            "errorMessage": response.get("error") or response.get("message"),
-            "id": response.get("id")
+            "success": bool(response.get("sent", False)),
+            "errorMessage":
+                str(error_message) if error_message is not None else None,
+            "id": str(message_id) if message_id is not None else None,
         }
 
         if schema_compliant_data["success"]:
@@ -167,7 +735,7 @@ Contact the developers!\
             schema_compliant_data["errorMessage"] = ERROR_CONTACT_DEVELOPERS
 
         logger.info(
-            "final response from dispatcher before schema validation: %s",
+            "final response from dispatcher: %s",
             schema_compliant_data
         )
 